@@ -3,9 +3,12 @@
 """Module to evaluate actions, templates and conditions."""
 from ontask.action.evaluate.action import (
     action_condition_evaluation,
-    evaluate_action, evaluate_row_action_out, get_action_evaluation_context,
-    get_row_values,
+    evaluate_action, evaluate_action_iter, evaluate_row_action_out,
+    get_action_evaluation_context, get_row_values,
+)
+from ontask.action.evaluate.plan import (
+    ActionEvaluationPlan, RubricEvaluationPlan, render_rubric_criteria,
 )
 from ontask.action.evaluate.template import (
-    ACTION_CONTEXT_VAR, TR_ITEM, VIZ_NUMBER_CONTEXT_VAR, render_action_template,
-    render_rubric_criteria)
+    ACTION_CONTEXT_VAR, TR_ITEM, VIZ_NUMBER_CONTEXT_VAR, clear_template_cache,
+    get_template, render_action_template, translate_names)
@@ -4,12 +4,18 @@
 
 - evaluate_action: Evaluates the content of an action
 
+- evaluate_action_iter: Iterator evaluating the content of an action row by
+  row
+
 - evaluate_row_action_out: Evaluates an action text for a single row of the
   table
 
 """
 from datetime import datetime
-from typing import Dict, List, Mapping, Optional, Tuple, Union
+import itertools
+from typing import (
+    Collection, Dict, Iterator, List, Mapping, Optional, Tuple, Union,
+)
 
 from django.conf import settings
 from django.template import TemplateSyntaxError
@@ -18,8 +24,12 @@ from django.utils.translation import ugettext_lazy as _
 
 import ontask
 from ontask import models
-from ontask.action.evaluate.template import render_action_template
-from ontask.dataops import formula, pandas, sql
+from ontask.action.evaluate import parallel
+from ontask.action.evaluate.plan import ActionEvaluationPlan
+from ontask.action.evaluate.template import (
+    render_action_template, translate_names,
+)
+from ontask.dataops import pandas, sql
 
 
 def _render_tuple_result(
@@ -33,9 +43,9 @@ def _render_tuple_result(
     Render the content in the action, render the extra string if given, and
     add the value of the column_name. All this with the values in the context
     :param action: Action object
-    :param context: Dictionary with name: value
+    :param context: Dictionary with name: value (names already translated)
     :param extra_string: Optional string to render
-    :param column_name: Column name to include its value
+    :param column_name: Translated column name to include its value
     :return: [action content render, extra string rendered (optional),
               column value (optional)]
     """
@@ -44,11 +54,15 @@ def _render_tuple_result(
         action.text_content,
         context,
         action,
+        translated=True,
     )]
 
     # If there is extra message, render with context and append
     if extra_string:
-        partial_result.append(render_action_template(extra_string, context))
+        partial_result.append(render_action_template(
+            extra_string,
+            context,
+            translated=True))
 
     # If column_name was given (and it exists), add as third component
     if column_name and column_name in context:
@@ -67,33 +81,21 @@ def action_condition_evaluation(
     :param row_values: dictionary with (name: value) pairs for one row
     :return: Dictionary condition_name: True/False or None if anomaly
     """
-    condition_eval = {}
-    conditions = action.conditions.filter(is_filter=False).values(
-        'name', 'is_filter', 'formula',
-    )
-    for condition in conditions:
-        # Evaluate the condition
-        try:
-            condition_eval[condition['name']] = formula.evaluate(
-                condition['formula'],
-                formula.EVAL_EXP,
-                row_values)
-        except ontask.OnTaskException:
-            # Something went wrong evaluating a condition. Stop.
-            return None
-    return condition_eval
+    return ActionEvaluationPlan(action).evaluate_conditions(row_values)
 
 
 def get_action_evaluation_context(
     action: models.Action,
     row_values: Dict,
     condition_eval: Mapping = None,
+    plan: Optional[ActionEvaluationPlan] = None,
 ) -> Optional[Dict]:
     """Create a dictionary with name:value to evaluate action content.
 
     :param action: Action object for which the dictionary is needed
     :param row_values: Dictionary with col_name, col_value
     :param condition_eval: Dictionary with the condition evaluations
+    :param plan: Evaluation plan for the action (created if not given)
     :return: Dictionary with context values or None if there is an anomaly
     """
     # If no row values are given, there is nothing to do here.
@@ -101,52 +103,156 @@ def get_action_evaluation_context(
         # No rows satisfy the given condition
         return None
 
-    if not condition_eval:
-        # Step 1: Evaluate all the conditions
-        condition_eval = {}
-        conditions = action.conditions.filter(is_filter=False).values(
-            'name', 'is_filter', 'formula',
+    if condition_eval:
+        # Conditions already evaluated, combine with values and attributes
+        return dict(
+            dict(row_values, **condition_eval),
+            **action.workflow.attributes,
         )
-        for condition in conditions:
-            # Evaluate the condition
-            try:
-                condition_eval[condition['name']] = formula.evaluate(
-                    condition['formula'],
-                    formula.EVAL_EXP,
-                    row_values)
-            except ontask.OnTaskException:
-                # Something went wrong evaluating a condition. Stop.
-                return None
-
-    # Create the context with the attributes, the evaluation of the
-    # conditions and the values of the columns.
-    return dict(
-        dict(row_values, **condition_eval),
-        **action.workflow.attributes,
+
+    if plan is None:
+        plan = ActionEvaluationPlan(action)
+
+    return plan.get_context(row_values)
+
+
+def _get_row_contexts(
+    action: models.Action,
+    plan: ActionEvaluationPlan,
+    column_name: str = None,
+    exclude_values: Collection[str] = None,
+) -> Iterator[Dict]:
+    """Get the context for each row selected by the action (generator).
+
+    :param action: Action being evaluated
+    :param plan: Evaluation plan of the action
+    :param column_name: Column with the values to exclude
+    :param exclude_values: Values in the column to exclude (any container)
+    :return: Iterator over the contexts
+    """
+    # Each row is checked against the values, use a set
+    exclude_values = set(exclude_values or [])
+    rows = plan.get_rows(itersize=settings.EXECUTE_ACTION_ITERSIZE)
+    n_rows = 0
+    try:
+        for row in rows:
+            n_rows += 1
+            if exclude_values and str(row[column_name]) in exclude_values:
+                # Skip the row with the col_name in exclude values
+                continue
+
+            # Create the context with the attributes, the evaluation of the
+            # conditions and the values of the columns.
+            yield plan.get_db_row_context(row)
+    finally:
+        rows.close()
+
+    if settings.DEBUG:
+        # Check that n_rows_selected (if not pending) is equal to the number
+        # of rows
+        action_filter = action.get_filter()
+        if (
+            action_filter
+            and action_filter.n_rows_selected >= 0
+            and action_filter.n_rows_selected != n_rows
+        ):
+            raise ontask.OnTaskException('Inconsistent n_rows_selected')
+
+
+# Parameters of the rendering in each process (see _init_render_process)
+_PROCESS_RENDER_ARGS = None
+
+
+def _init_render_process(
+    action: models.Action,
+    extra_string: str,
+    column_name: str,
+):
+    """Store the parameters to render the chunks in this process."""
+    global _PROCESS_RENDER_ARGS
+    _PROCESS_RENDER_ARGS = (action, extra_string, column_name)
+
+
+def _render_context_chunk(contexts: List[Dict]) -> List[List]:
+    """Render the action for a chunk of contexts (in a pool process)."""
+    action, extra_string, column_name = _PROCESS_RENDER_ARGS
+    return [
+        _render_tuple_result(action, context, extra_string, column_name)
+        for context in contexts]
+
+
+def _render_contexts_parallel(
+    action: models.Action,
+    contexts: Iterator[Dict],
+    extra_string: str,
+    column_name: str,
+    processes: int,
+) -> parallel.ClosingIterator:
+    """Render the contexts with a pool of processes.
+
+    The contexts are split in consecutive chunks (ranges of rows) rendered
+    by the processes. The results are returned in the order of the rows.
+
+    :param action: Action being evaluated
+    :param contexts: Iterator over the contexts (fetched lazily)
+    :param extra_string: An extra string to process
+    :param column_name: Column from where to extract the special value
+    :param processes: Number of processes
+    :return: Iterator over the rendered results (the processes are created
+    before returning and terminated when it is closed)
+    """
+    chunk_size = max(settings.EXECUTE_ACTION_ITERSIZE // processes, 1)
+    chunk_results = parallel.imap_ordered(
+        _render_context_chunk,
+        parallel.chunked(contexts, chunk_size),
+        processes,
+        initializer=_init_render_process,
+        initargs=(action, extra_string, column_name),
     )
+    return parallel.ClosingIterator(
+        itertools.chain.from_iterable(chunk_results),
+        chunk_results.close)
 
 
-def evaluate_action(
+def _update_progress(log_item: Optional[models.Log], n_rendered: int):
+    """Store the number of rows rendered in the log payload."""
+    if log_item:
+        log_item.payload['rows_rendered'] = n_rendered
+        log_item.save(update_fields=['payload'])
+
+
+def evaluate_action_iter(
     action: models.Action,
     extra_string: str = None,
     column_name: str = None,
-    exclude_values: List[str] = None,
-) -> List[List]:
-    """Evaluate the content in an action based on the values in the columns.
+    exclude_values: Collection[str] = None,
+    log_item: Optional[models.Log] = None,
+) -> parallel.ClosingIterator:
+    """Evaluate the content in an action for each row (iterator).
 
     Given an action object and an optional string:
     1) Access the attached workflow
-    2) Obtain the data from the appropriate data frame
+    2) Obtain the data from the appropriate data frame together with the
+       evaluation of the conditions (computed by the database). The rows are
+       fetched in batches of EXECUTE_ACTION_ITERSIZE with a server side cursor
     3) Loop over each data row and
-      3.1) Evaluate the conditions with respect to the values in the row
+      3.1) Take the evaluation of the conditions in the row
       3.2) Create a context with the result of evaluating the conditions,
            attributes and column names to values
       3.3) Run the template with the context
       3.4) Run the optional string argument with the template and the context
       3.5) Select the optional column_name
-    4) Return the resulting objects:
-       List of (HTMLs body, extra string, column name value)
-        or an error message
+      3.6) Yield the resulting object:
+           List of (HTMLs body, extra string, column name value)
+
+    The rows are rendered as the generator is consumed, so the memory
+    required does not depend on the number of rows. If
+    EXECUTE_ACTION_PROCESSES is larger than one, step 3.3 to 3.5 are executed
+    by a pool of processes over consecutive chunks of rows, and the results
+    are yielded in the same order. The processes are created by this call
+    (not when the first result is requested), so it must be invoked before
+    the caller starts any thread, and the result must be closed if it is not
+    exhausted (e.g. in a finally clause).
 
     :param action: Action object with pointers to conditions, filter,
                    workflow, etc.
@@ -154,37 +260,82 @@ def evaluate_action(
            subject line) with the same dictionary as the text in the action.
     :param column_name: Column from where to extract the special value (
            typically the email address) and include it in the result.
-    :param exclude_values: List of values in the column to exclude
-    :return: list of lists resulting from the evaluation of the action. Each
-             element in the list contains the HTML body, the extra string (if
+    :param exclude_values: Values in the column to exclude (any container)
+    :param log_item: Log in which to record the number of rows rendered
+    :return: Iterator over the lists resulting from the evaluation of the
+             action. Each element contains the HTML body, the extra string (if
              provided) and the column value.
     """
-    # Get the table data
-    rows = sql.get_rows(
-        action.workflow.get_data_frame_table_name(),
-        filter_formula=action.get_filter_formula())
-    list_of_renders = []
-    for row in rows:
-        if exclude_values and str(row[column_name]) in exclude_values:
-            # Skip the row with the col_name in exclude values
-            continue
-
-        # Step 4: Create the context with the attributes, the evaluation of the
-        # conditions and the values of the columns.
-        context = get_action_evaluation_context(action, row)
-
-        # Append result
-        list_of_renders.append(
-            _render_tuple_result(action, context, extra_string, column_name),
-        )
+    # Get the table data with the conditions evaluated by the database
+    plan = ActionEvaluationPlan(action)
+    contexts = _get_row_contexts(action, plan, column_name, exclude_values)
+
+    # The contexts have the names translated to template variables
+    if column_name:
+        column_name = translate_names([column_name])[0]
+
+    processes = settings.EXECUTE_ACTION_PROCESSES
+    if processes > 1:
+        results = _render_contexts_parallel(
+            action,
+            contexts,
+            extra_string,
+            column_name,
+            processes)
+    else:
+        results = (
+            _render_tuple_result(action, context, extra_string, column_name)
+            for context in contexts)
 
-    if settings.DEBUG:
-        # Check that n_rows_selected is equal to rows.rowcount
-        action_filter = action.get_filter()
-        if action_filter and action_filter.n_rows_selected != rows.rowcount:
-            raise ontask.OnTaskException('Inconsistent n_rows_selected')
+    return parallel.ClosingIterator(
+        _yield_with_progress(results, log_item),
+        results.close)
+
+
+def _yield_with_progress(
+    results: Iterator[List],
+    log_item: Optional[models.Log],
+) -> Iterator[List]:
+    """Yield the rendered results recording the progress in the log."""
+    n_rendered = 0
+    for rendered_result in results:
+        yield rendered_result
+        n_rendered += 1
+        if n_rendered % settings.EXECUTE_ACTION_ITERSIZE == 0:
+            _update_progress(log_item, n_rendered)
+    _update_progress(log_item, n_rendered)
+
+
+def evaluate_action(
+    action: models.Action,
+    extra_string: str = None,
+    column_name: str = None,
+    exclude_values: Collection[str] = None,
+) -> List[List]:
+    """Evaluate the content in an action based on the values in the columns.
+
+    See evaluate_action_iter for the description of the evaluation steps.
 
-    return list_of_renders
+    :param action: Action object with pointers to conditions, filter,
+                   workflow, etc.
+    :param extra_string: An extra string to process (something like the email
+           subject line) with the same dictionary as the text in the action.
+    :param column_name: Column from where to extract the special value (
+           typically the email address) and include it in the result.
+    :param exclude_values: Values in the column to exclude (any container)
+    :return: list of lists resulting from the evaluation of the action. Each
+             element in the list contains the HTML body, the extra string (if
+             provided) and the column value.
+    """
+    action_evals = evaluate_action_iter(
+        action,
+        extra_string=extra_string,
+        column_name=column_name,
+        exclude_values=exclude_values)
+    try:
+        return list(action_evals)
+    finally:
+        action_evals.close()
 
 
 def get_row_values(
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""Process a sequence of items in chunks with a pool of processes.
+
+The chunks are distributed among the processes as they are obtained from the
+sequence, and the results are returned in the same order as the chunks. Only
+a limited number of chunks are pending at any given time so that the memory
+required does not depend on the length of the sequence. The pool is
+terminated when the results are exhausted, when the iterator is closed, or
+when it is garbage collected.
+"""
+import collections
+import itertools
+import multiprocessing
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+import weakref
+
+from django import db
+
+
+def chunked(items: Iterable, chunk_size: int) -> Iterator[List]:
+    """Split the items in lists of (at most) chunk_size elements.
+
+    :param items: Iterable with the items
+    :param chunk_size: Maximum number of elements in each chunk
+    :return: Iterator over the lists
+    """
+    items = iter(items)
+    chunk = list(itertools.islice(items, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(items, chunk_size))
+
+
+def _close_iterator(iterator: Iterator, close_function: Optional[Callable]):
+    """Close the iterator (if it is a generator) and call close_function."""
+    try:
+        close = getattr(iterator, 'close', None)
+        if close:
+            close()
+    finally:
+        if close_function:
+            close_function()
+
+
+class ClosingIterator:
+    """Iterator that releases its resources once it is no longer used.
+
+    close_function is invoked (only once) when the items are exhausted, when
+    close is invoked, or when the object is garbage collected, whatever
+    happens first. Callers should invoke close in a finally clause.
+    """
+
+    def __init__(
+        self,
+        iterator: Iterable,
+        close_function: Optional[Callable] = None,
+    ):
+        """Store the iterator and register the function to release it."""
+        self._iterator = iter(iterator)
+        self._finalizer = weakref.finalize(
+            self,
+            _close_iterator,
+            self._iterator,
+            close_function)
+
+    def __iter__(self):
+        """Return the object itself."""
+        return self
+
+    def __next__(self):
+        """Return the next item, or release the resources if exhausted."""
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self):
+        """Release the resources (it can be invoked more than once)."""
+        self._finalizer()
+
+
+def imap_ordered(
+    function: Callable[[List], Any],
+    chunks: Iterable[List],
+    processes: int,
+    initializer: Optional[Callable] = None,
+    initargs: tuple = (),
+) -> ClosingIterator:
+    """Apply function to the chunks in a pool of processes.
+
+    The processes are created (with fork) when this function is called, not
+    when the first result is requested, so the caller must invoke it before
+    starting any thread (the locks held by other threads would be copied to
+    the processes). The DB connections are closed so that each process opens
+    its own. Thus, chunks is expected to be a generator that accesses the DB
+    lazily. The result must be closed if it is not exhausted.
+
+    :param function: Function applied to every chunk (in another process)
+    :param chunks: Iterable with the chunks to process
+    :param processes: Number of processes in the pool
+    :param initializer: Function to execute when each process starts
+    :param initargs: Arguments passed to the initializer
+    :return: Iterator over the results, in the same order as the chunks
+    (closing it terminates the processes)
+    """
+    db.connections.close_all()
+    context = multiprocessing.get_context('fork')
+    pool = context.Pool(processes, initializer, initargs)
+    return ClosingIterator(
+        _imap_pool(pool, function, chunks, processes),
+        pool.terminate)
+
+
+def _imap_pool(
+    pool,
+    function: Callable[[List], Any],
+    chunks: Iterable[List],
+    processes: int,
+) -> Iterator[Any]:
+    """Distribute the chunks in the pool and yield the results in order."""
+    pending = collections.deque()
+    for chunk in chunks:
+        pending.append(pool.apply_async(function, (chunk,)))
+        if len(pending) >= 2 * processes:
+            yield pending.popleft().get()
+
+    while pending:
+        yield pending.popleft().get()
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""Evaluation plan to render an action over multiple rows.
+
+The plan contains the elements of an action that are identical for all the
+rows in the table (conditions, workflow attributes and the translation of
+their names to template variables) so that they are obtained once per
+execution and not once per row.
+"""
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from django.utils import functional
+from django.utils.html import escape
+
+import ontask
+from ontask import models
+from ontask.action.evaluate.template import translate_names
+from ontask.dataops import formula, sql
+
+
+class ActionEvaluationPlan:
+    """Conditions and attributes of an action prepared for evaluation.
+
+    The conditions can be evaluated either in Python (compiled formulas,
+    used when rendering a single row) or by the database when the rows are
+    fetched (see get_select_query with condition_formulas).
+
+    @DynamicAttrs
+    """
+
+    def __init__(self, action: models.Action):
+        """Fetch the conditions and the attributes once.
+
+        :param action: Action to be evaluated
+        """
+        self.action = action
+        self.attributes = action.workflow.attributes
+        conditions = list(action.conditions.filter(
+            is_filter=False,
+        ).values_list('name', 'formula'))
+        self.condition_names = [cond_name for cond_name, __ in conditions]
+        self.condition_formulas = [
+            cond_formula for __, cond_formula in conditions]
+        # Columns in the rows obtained from the DB with the condition values
+        self.condition_columns = [
+            sql.CONDITION_COLUMN_NAME.format(idx)
+            for idx in range(len(conditions))]
+        # Translated names of the values in the rows (see get_db_row_context)
+        self.row_names = None
+
+    @functional.cached_property
+    def compiled_conditions(
+        self,
+    ) -> List[Tuple[str, formula.CompiledFormula]]:
+        """Compile the condition formulas the first time they are needed."""
+        return [
+            (cond_name, formula.compile_formula(cond_formula))
+            for cond_name, cond_formula in zip(
+                self.condition_names,
+                self.condition_formulas)
+        ]
+
+    def get_rows(self, itersize: Optional[int] = None):
+        """Get the rows selected by the action filter with the conditions.
+
+        The conditions are evaluated by the database and returned in
+        additional columns in each row (see get_db_row_context).
+
+        :param itersize: Rows to fetch at a time (server side cursor)
+        :return: Cursor with the rows
+        """
+        return sql.get_rows(
+            self.action.workflow.get_data_frame_table_name(),
+            filter_formula=self.action.get_filter_formula(),
+            condition_formulas=self.condition_formulas,
+            itersize=itersize)
+
+    def evaluate_conditions(
+        self,
+        row_values: Mapping,
+    ) -> Optional[Dict[str, bool]]:
+        """Calculate dictionary with condition_name: Boolean evaluations.
+
+        :param row_values: dictionary with (name: value) pairs for one row
+        :return: Dictionary condition_name: True/False or None if anomaly
+        """
+        condition_eval = {}
+        for cond_name, cond_function in self.compiled_conditions:
+            try:
+                condition_eval[cond_name] = cond_function(row_values)
+            except ontask.OnTaskException:
+                # Something went wrong evaluating a condition. Stop.
+                return None
+        return condition_eval
+
+    def get_context(self, row_values: Optional[Mapping]) -> Optional[Dict]:
+        """Create a dictionary with name:value to evaluate action content.
+
+        :param row_values: Dictionary with col_name, col_value
+        :return: Dictionary with context values or None if there is an anomaly
+        """
+        # If no row values are given, there is nothing to do here.
+        if row_values is None:
+            return None
+
+        condition_eval = self.evaluate_conditions(row_values)
+        if condition_eval is None:
+            return None
+
+        # Create the context with the attributes, the evaluation of the
+        # conditions and the values of the columns.
+        return dict(dict(row_values, **condition_eval), **self.attributes)
+
+    @functional.cached_property
+    def translated_attributes(self) -> Dict:
+        """Workflow attributes with the names translated."""
+        return dict(zip(
+            translate_names(list(self.attributes.keys())),
+            self.attributes.values()))
+
+    def _translate_row_names(self, row: Mapping) -> List[str]:
+        """Translate the names of the values in the rows of get_rows.
+
+        The values of the conditions are in their own columns, they are
+        renamed to the condition names.
+
+        :param row: Row with the column values and the condition columns
+        :return: List of translated names, one per value in the row
+        """
+        cond_names = dict(zip(self.condition_columns, self.condition_names))
+        names = [cond_names.get(name, name) for name in row.keys()]
+
+        # Translate all the names in the context at once to detect collisions
+        translated = translate_names(names + list(self.attributes.keys()))
+        return translated[:len(names)]
+
+    def get_db_row_context(self, row: Mapping) -> Dict:
+        """Create the context for a row obtained with get_rows.
+
+        The keys in the context are the names translated to template
+        variables (render it with translated=True). The names are translated
+        with the first row, and the context of each row is created with the
+        values in their positions.
+
+        :param row: Row with the column values and the condition columns
+        :return: Dictionary with context values
+        """
+        if self.row_names is None:
+            self.row_names = self._translate_row_names(row)
+
+        context = dict(zip(self.row_names, row))
+        context.update(self.translated_attributes)
+        return context
+
+
+class RubricEvaluationPlan:
+    """Feedback of the rubric cells of an action indexed for evaluation.
+
+    The cells are fetched once and indexed by (column id, position of the
+    level of attainment), and the categories of each criterion are mapped to
+    their positions.
+    """
+
+    def __init__(self, action: models.Action):
+        """Fetch the criteria and the cells once.
+
+        :param action: Rubric action to be evaluated
+        """
+        criteria = [
+            acc.column
+            for acc in action.column_condition_pair.select_related('column')]
+        # Name of each criterion in the template context
+        context_names = translate_names([
+            escape(criterion.name) for criterion in criteria])
+        self.criteria = [
+            (
+                criterion,
+                context_name,
+                {
+                    category: idx
+                    for idx, category in reversed(list(enumerate(
+                        criterion.categories)))},
+            )
+            for criterion, context_name in zip(criteria, context_names)]
+
+        self.feedback = {}
+        for cell in action.rubric_cells.all():
+            self.feedback.setdefault(
+                (cell.column_id, cell.loa_position),
+                cell.feedback_text)
+
+    def get_text_sources(self, context: Mapping) -> List[List]:
+        """Calculate the list of elements [criteria, feedback].
+
+        :param context: Template context with the values of the criteria
+        :return: List of [criterion name, feedback text]
+        """
+        text_sources = []
+        for criterion, context_name, positions in self.criteria:
+            c_value = context.get(context_name)
+            if not c_value:
+                # Skip criteria with no values
+                continue
+
+            if c_value not in positions:
+                raise ValueError(
+                    '{0!r} is not in the categories of {1}'.format(
+                        c_value,
+                        criterion.name))
+
+            feedback = self.feedback.get((criterion.id, positions[c_value]))
+            if feedback is None:
+                continue
+            text_sources.append([criterion.name, feedback])
+
+        return text_sources
+
+
+def render_rubric_criteria(action: models.Action, context: Dict) -> List[List]:
+    """Calculate the list of elements [criteria, feedback] for action.
+
+    The rubric plan is created the first time and stored in the action
+    object, so it is shared by all the rows evaluated with that object.
+
+    :param action: Action being manipulated (Rubric)
+    :param context: Dictionary with values
+    :return: List of HTML snippets, one per criteria.
+    """
+    rubric_plan = getattr(action, '_rubric_plan', None)
+    if rubric_plan is None:
+        rubric_plan = RubricEvaluationPlan(action)
+        action._rubric_plan = rubric_plan
+
+    return rubric_plan.get_text_sources(context)
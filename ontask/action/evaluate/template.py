@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 
 """Manipulate template text within OnTask and evaluat it s content."""
+from collections import OrderedDict
+import functools
 import re
 import string
-from typing import Callable, Dict, List, Mapping
+import threading
+from typing import Callable, List, Mapping, Optional, Sequence
 
 from django.template import Context, Template
-from django.utils.html import escape
 from django.utils.translation import ugettext_lazy as _
 
 from ontask import models
@@ -26,6 +28,16 @@ WHITE_SPACE_RES = [
 # Template prelude to load the ontask_tags
 _ONTASK_TEMPLATE_PRELUDE = '{% load ontask_tags %}'
 
+# Compiled templates (per process) indexed by action id, HTML flag and text.
+# The least recently used templates are discarded beyond the maximum size.
+TEMPLATE_CACHE_SIZE = 256
+_TEMPLATE_CACHE = OrderedDict()
+_TEMPLATE_CACHE_LOCK = threading.Lock()
+
+# Number of variable names (per process) for which the translation is kept.
+# The translation depends only on the name, so the entries never expire.
+TRANSLATE_CACHE_SIZE = 4096
+
 
 def make_xlat(*args, **kwds) -> Callable:
     """Apply multiple character substitutions.
@@ -129,6 +141,7 @@ def _change_unescape_vname(match) -> str:
     )
 
 
+@functools.lru_cache(maxsize=TRANSLATE_CACHE_SIZE)
 def _translate(varname: str) -> str:
     """Apply several translations to a variable name.
 
@@ -159,6 +172,29 @@ def _translate(varname: str) -> str:
     return TR_ITEM(varname)
 
 
+def translate_names(names: Sequence[str]) -> List[str]:
+    """Translate the variable names to use them as keys in the context.
+
+    The translations are memoized, so the names of the columns, conditions
+    and attributes are processed once and not once per row.
+
+    :param names: Names of the variables in the context
+    :return: List with the translated names (in the same order)
+    """
+    new_names = [_translate(name) for name in names]
+
+    # If the number of different names changes, we have a case of collision
+    # in the translation. Need to stop immediately.
+    assert len(set(names)) == len(set(new_names))
+
+    for reserved_name in [ACTION_CONTEXT_VAR, VIZ_NUMBER_CONTEXT_VAR]:
+        if reserved_name in new_names:
+            raise Exception(
+                _('Name {0} is reserved.').format(reserved_name))
+
+    return new_names
+
+
 def _clean_whitespace(template_text: str) -> str:
     """Remove whitespace before and after conditionals.
 
@@ -175,36 +211,83 @@ def _clean_whitespace(template_text: str) -> str:
     return template_text
 
 
-def render_rubric_criteria(action: models.Action, context: Dict) -> List[List]:
-    """Calculate the list of elements [criteria, feedback] for action.
+def _compile_template(template_text: str, unescape: bool) -> Template:
+    """Translate the variable names in the text and create the template.
 
-    :param action: Action being manipulated (Rubric)
-    :param context: Dictionary with values
-    :return: List of HTML snippets, one per criteria.
+    :param template_text: Text in the template to be rendered
+    :param unescape: The variable names in the text are HTML escaped
+    :return: Template object
     """
-    criteria = [acc.column for acc in action.column_condition_pair.all()]
-    cells = action.rubric_cells.all()
-    text_sources = []
+    # Apply the translation process to all variables that appear in the
+    # template text
+    new_template_text = template_text
+    for rexpr in models.VAR_USE_RES:
+        if unescape:
+            new_template_text = rexpr.sub(
+                _change_unescape_vname,
+                new_template_text)
+        else:
+            new_template_text = rexpr.sub(
+                _change_vname,
+                new_template_text)
 
-    for criterion in criteria:
-        c_value = context.get(_translate(escape(criterion.name)))
-        if not c_value:
-            # Skip criteria with no values
-            continue
+    # Remove pre-and post white space from the {% if %} and {% endif %}
+    # conditions (to reduce white space when using non HTML content.
+    new_template_text = _clean_whitespace(new_template_text)
 
-        value_idx = criterion.categories.index(c_value)
-        cell = cells.filter(column=criterion, loa_position=value_idx).first()
-        if not cell:
-            continue
-        text_sources.append([criterion.name, cell.feedback_text])
+    return Template(_ONTASK_TEMPLATE_PRELUDE + new_template_text)
 
-    return text_sources
+
+def get_template(
+    template_text: str,
+    action: Optional[models.Action] = None,
+) -> Template:
+    """Get the compiled template for the text (and action).
+
+    The template is compiled the first time and then taken from the cache.
+    The key includes the text itself (its hash is computed once per string),
+    so a modified text never returns a stale template.
+
+    :param template_text: Text in the template to be rendered
+    :param action: Action containing the text (if any)
+    :return: Template object
+    """
+    unescape = bool(action and action.has_html_text)
+    key = (action.id if action else None, unescape, template_text)
+    with _TEMPLATE_CACHE_LOCK:
+        template = _TEMPLATE_CACHE.get(key)
+        if template is not None:
+            _TEMPLATE_CACHE.move_to_end(key)
+            return template
+
+    template = _compile_template(template_text, unescape)
+    with _TEMPLATE_CACHE_LOCK:
+        _TEMPLATE_CACHE[key] = template
+        while len(_TEMPLATE_CACHE) > TEMPLATE_CACHE_SIZE:
+            _TEMPLATE_CACHE.popitem(last=False)
+    return template
+
+
+def clear_template_cache(action_id: Optional[int] = None):
+    """Remove the compiled templates of an action (or all of them).
+
+    :param action_id: Action ID, or None to empty the cache.
+    :return: Nothing
+    """
+    with _TEMPLATE_CACHE_LOCK:
+        if action_id is None:
+            _TEMPLATE_CACHE.clear()
+            return
+
+        for key in [key for key in _TEMPLATE_CACHE if key[0] == action_id]:
+            del _TEMPLATE_CACHE[key]
 
 
 def render_action_template(
     template_text: str,
     context_dict: Mapping,
     action: models.Action = None,
+    translated: bool = False,
 ) -> str:
     """Render a template using a given context.
 
@@ -241,51 +324,30 @@ def render_action_template(
 
     4) Execute the new template with the new dictionary and return the result.
 
+    Step 3 is skipped if the keys in the context are already translated (
+    see ActionEvaluationPlan.get_db_row_context).
+
     :param template_text: Text in the template to be rendered
     :param context_dict: Dictionary used by Jinja to evaluate the template
     :param action: Action object to insert in the context in case it is
     needed by any other custom template.
+    :param translated: The keys in context_dict are already translated
     :return: The rendered template
     """
-    # Steps 1 and 2. Apply the translation process to all variables that
-    # appear in the the template text
-    new_template_text = template_text
-    for rexpr in models.VAR_USE_RES:
-        if action and action.has_html_text:
-            new_template_text = rexpr.sub(
-                _change_unescape_vname,
-                new_template_text)
-        else:
-            new_template_text = rexpr.sub(
-                _change_vname,
-                new_template_text)
-
-    # Step 2.2 Remove pre-and post white space from the {% if %} and
-    # {% endif %} conditions (to reduce white space when using non HTML
-    # content.
-    new_template_text = _clean_whitespace(new_template_text)
+    # Steps 1 and 2. Translate the variables in the template (compiled once
+    # and then reused from the cache)
+    template = get_template(template_text, action)
 
     # Step 3. Apply the translation process to the context keys
-    new_context = {
-        _translate(key): str_val
-        for key, str_val in list(context_dict.items())
-    }
-
-    # If the number of elements in the two dictionaries is different, we have
-    #  a case of collision in the translation. Need to stop immediately.
-    assert len(context_dict) == len(new_context)
-
-    if ACTION_CONTEXT_VAR in new_context:
-        raise Exception(_('Name {0} is reserved.').format(ACTION_CONTEXT_VAR))
-    new_context[ACTION_CONTEXT_VAR] = action
+    if not translated:
+        context_dict = dict(zip(
+            translate_names(list(context_dict.keys())),
+            context_dict.values()))
 
-    if VIZ_NUMBER_CONTEXT_VAR in new_context:
-        raise Exception(_('Name {0} is reserved.').format(
-            VIZ_NUMBER_CONTEXT_VAR,
-        ))
-    new_context[VIZ_NUMBER_CONTEXT_VAR] = 0
+    # The additional variables are in their own layer of the context, so
+    # context_dict is not modified
+    context = Context(context_dict)
+    context.update({ACTION_CONTEXT_VAR: action, VIZ_NUMBER_CONTEXT_VAR: 0})
 
     # Step 4. Return the redering of the new elements
-    return Template(
-        _ONTASK_TEMPLATE_PRELUDE + new_template_text,
-    ).render(Context(new_context))
+    return template.render(context)
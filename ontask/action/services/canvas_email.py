@@ -21,7 +21,7 @@ import requests
 from rest_framework import status
 
 from ontask import models
-from ontask.action.evaluate import evaluate_action
+from ontask.action.evaluate import evaluate_action_iter
 from ontask.action.services.edit_manager import ActionOutEditManager
 from ontask.action.services.run_manager import ActionRunManager
 from ontask.core import SessionPayload, is_instructor
@@ -244,11 +244,6 @@ class ActionManagerCanvasEmail(ActionOutEditManager, ActionRunManager):
             log_item = action.log(user, self.log_event, **payload)
 
         item_column = action.workflow.columns.get(pk=payload['item_column'])
-        action_evals = evaluate_action(
-            action,
-            extra_string=payload['subject'],
-            column_name=item_column.name,
-            exclude_values=payload.get('exclude_values', []))
 
         # Get the oauth info
         target_url = payload['target_url']
@@ -283,6 +278,13 @@ class ActionManagerCanvasEmail(ActionOutEditManager, ActionRunManager):
         domain = oauth_info['domain_port']
         conversation_url = oauth_info['conversation_url'].format(domain)
         to_emails = []
+        # Evaluated once the execution can proceed (it may create processes)
+        action_evals = evaluate_action_iter(
+            action,
+            extra_string=payload['subject'],
+            column_name=item_column.name,
+            exclude_values=payload.get('exclude_values', []),
+            log_item=log_item)
         for msg_body, msg_subject, msg_to in action_evals:
             # JSON object to send. Taken from method.conversations.create in
             # https://canvas.instructure.com/doc/api/conversations.html
@@ -77,6 +77,8 @@ class ActionEditManager:
         form_filter: Optional[action_forms.FilterForm] = None,
     ) -> Dict:
         """Get the initial context to render the response."""
+        # Obtain the count of the filter if it is pending
+        selected_rows = action.get_rows_selected()
         filter_condition = action.get_filter()
         return {
             # Workflow elements
@@ -92,9 +94,7 @@ class ActionEditManager:
             'form': form,
             'form_filter': form_filter,
             'filter_condition': filter_condition,
-            'selected_rows':
-                filter_condition.n_rows_selected
-                if filter_condition else -1,
+            'selected_rows': selected_rows if filter_condition else -1,
             'is_email_list': (
                 action.action_type == models.Action.EMAIL_LIST
                 or action.action_type == models.Action.JSON_LIST),
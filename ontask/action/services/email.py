@@ -2,8 +2,8 @@
 
 """Send Email Messages with the rendered content in the action."""
 import datetime
-from time import sleep
-from typing import Dict, List, Optional, Union
+import functools
+from typing import Dict, Iterable, Iterator, List, Optional, Union
 
 from django.conf import settings
 from django.contrib.sites.models import Site
@@ -21,16 +21,14 @@ from ontask import (
     simplify_datetime_str,
 )
 from ontask.action.evaluate.action import (
-    evaluate_action,
-    evaluate_row_action_out, get_action_evaluation_context,
+    evaluate_action_iter, evaluate_row_action_out,
+    get_action_evaluation_context,
 )
+from ontask.action.services import email_delivery
 from ontask.action.services.edit_manager import ActionOutEditManager
 from ontask.action.services.run_manager import ActionRunManager
-from ontask.celery import get_task_logger
 from ontask.dataops import sql
 
-LOGGER = get_task_logger('celery_execution')
-
 
 def _send_confirmation_message(
     user,
@@ -200,18 +198,27 @@ def _create_single_message(
 def _create_messages(
     user,
     action: models.Action,
-    action_evals: List,
+    action_evals: Iterable[List],
     track_col_name: str,
     payload: Dict,
-) -> List[Union[EmailMessage, EmailMultiAlternatives]]:
+    log_buffer: models.LogBuffer,
+    log_item: Optional[models.Log] = None,
+) -> Iterator[Union[EmailMessage, EmailMultiAlternatives]]:
     """Create the email messages to send and the tracking ids.
 
+    The messages are created as the generator is consumed, and their logs
+    are added to the log buffer (stored in bulk). If LOGS_EMAIL_BODY is
+    False, the logs do not include the body of the message (nor the action
+    content), only a reference to the log of the execution.
+
     :param user: User that sends the message (encoded in the track-id)
     :param action: Action to process
-    :param action_evals: Action content already evaluated
+    :param action_evals: Action content already evaluated (or iterator)
     :param track_col_name: column name to track
     :param payload: Dictionary with the required fields
-    :return:
+    :param log_buffer: Buffer to store the logs of the messages
+    :param log_item: Log of the action execution (optional)
+    :return: Iterator over the messages
     """
     # Context to log the events (one per email)
     context = {
@@ -219,12 +226,14 @@ def _create_messages(
             datetime.datetime.now(pytz.timezone(settings.TIME_ZONE)),
         ),
     }
+    log_body = bool(ontask_settings.LOGS_EMAIL_BODY)
+    if log_item and not log_body:
+        context['run_log_id'] = log_item.id
 
     cc_email = _check_email_list(payload['cc_email'])
     bcc_email = _check_email_list(payload['bcc_email'])
 
     # Everything seemed to work to create the messages.
-    msgs = []
     column_to = action.workflow.columns.get(pk=payload['item_column']).name
     # for msg_body, msg_subject, msg_to in action_evals:
     for msg_body_sbj_to in action_evals:
@@ -257,52 +266,45 @@ def _create_messages(
             cc_email,
             bcc_email,
         )
-        msgs.append(msg)
 
         # Log the event
         context['subject'] = msg.subject
-        context['body'] = msg.body
+        if log_body:
+            context['body'] = msg.body
         context['from_email'] = msg.from_email
         context['to_email'] = msg.to[0]
         if track_str:
             context['track_id'] = track_str
-        action.log(user, models.Log.ACTION_EMAIL_SENT, **context)
+        action.log(
+            user,
+            models.Log.ACTION_EMAIL_SENT,
+            log_buffer=log_buffer,
+            with_content=log_body,
+            **context)
 
-    return msgs
+        yield msg
 
 
-def _deliver_msg_burst(
-    msgs: List[Union[EmailMessage, EmailMultiAlternatives]],
+def _store_checkpoint(
+    log_item: models.Log,
+    log_buffer: models.LogBuffer,
+    recipients: List[str],
 ):
-    """Deliver the messages in bursts.
+    """Record the recipients delivered and update the progress in the log.
+
+    The logs of the messages are stored first, so a recipient is never
+    recorded as delivered without its log (the run is resumed from here).
 
-    :param msgs: List of either EmailMessage or EmailMultiAlternatives
-    :return: Nothing.
+    :param log_item: Log of the action execution
+    :param log_buffer: Buffer with the logs of the messages created
+    :param recipients: Recipients of the messages delivered
+    :return: Nothing
     """
-    if not msgs:
-        # bypass trivial case, no list given
-        return
-
-    # Partition the list of emails into chunks as per the value of EMAIL_BURST
-    chunk_size = len(msgs)
-    wait_time = 0
-    if settings.EMAIL_BURST:
-        chunk_size = settings.EMAIL_BURST
-        wait_time = settings.EMAIL_BURST_PAUSE
-    msg_chunks = [
-        msgs[idx:idx + chunk_size]
-        for idx in range(0, len(msgs), chunk_size)
-    ]
-    for idx, msg_chunk in enumerate(msg_chunks):
-        # Mass mail!
-        mail.get_connection().send_messages(msg_chunk)
-
-        if idx != len(msg_chunks) - 1:
-            LOGGER.info(
-                'Email Burst (%s) reached. Waiting for %s secs',
-                str(len(msg_chunk)),
-                str(wait_time))
-            sleep(wait_time)
+    log_buffer.flush()
+    models.RunCheckpoint.objects.create(log=log_item, items=recipients)
+    log_item.payload['emails_sent'] = (
+        log_item.payload.get('emails_sent', 0) + len(recipients))
+    log_item.save(update_fields=['payload'])
 
 
 class ActionManagerEmail(ActionOutEditManager, ActionRunManager):
@@ -354,38 +356,77 @@ class ActionManagerEmail(ActionOutEditManager, ActionRunManager):
         :return: Nothing
         """
         item_column = action.workflow.columns.get(pk=payload['item_column'])
-        action_evals = evaluate_action(
-            action,
-            extra_string=payload['subject'],
-            column_name=item_column.name,
-            exclude_values=payload.get('exclude_values', []))
+
+        # If the execution is resumed, exclude the recipients delivered before
+        delivered_before = []
+        if log_item:
+            delivered_before = models.RunCheckpoint.get_items(log_item)
+            log_item.payload['emails_sent'] = len(delivered_before)
+            # Estimated: excluded values may not be in the selected rows
+            log_item.payload['emails_total'] = max(
+                action.get_rows_selected() - len(
+                    set(payload.get('exclude_values', []))),
+                len(delivered_before))
+            log_item.save()
+        exclude_values = set(payload.get('exclude_values', [])) | set(
+            delivered_before)
 
         track_col_name = ''
         if payload['track_read']:
-            track_col_name = _create_track_column(action)
+            track_col_name = log_item.payload.get('track_column')
+            if not track_col_name:
+                track_col_name = _create_track_column(action)
             # Get the log item payload to store the tracking column
             log_item.payload['track_column'] = track_col_name
             log_item.save()
 
-        msgs = _create_messages(
-            user,
+        # Rows are evaluated, turned into messages, logged and delivered as
+        # they are fetched from the DB
+        action_evals = evaluate_action_iter(
             action,
-            action_evals,
-            track_col_name,
-            payload,
-        )
-
-        _deliver_msg_burst(msgs)
+            extra_string=payload['subject'],
+            column_name=item_column.name,
+            exclude_values=exclude_values,
+            log_item=log_item)
+        bulk_size = int(ontask_settings.LOGS_BULK_SIZE)
+        try:
+            with models.LogBuffer(bulk_size) as log_buffer:
+                msgs = _create_messages(
+                    user,
+                    action,
+                    action_evals,
+                    track_col_name,
+                    payload,
+                    log_buffer,
+                    log_item,
+                )
+                recipients, failures = email_delivery.deliver_messages(
+                    msgs,
+                    checkpoint=(
+                        functools.partial(
+                            _store_checkpoint,
+                            log_item,
+                            log_buffer)
+                        if log_item else None))
+        finally:
+            action_evals.close()
+        recipients = delivered_before + recipients
+
+        if log_item:
+            # Record the result of the delivery
+            log_item.payload['emails_sent'] = len(recipients)
+            log_item.payload['emails_failed'] = failures
+            log_item.save()
 
         if payload['send_confirmation']:
             # Confirmation message requested
-            _send_confirmation_message(user, action, len(msgs))
+            _send_confirmation_message(user, action, len(recipients))
 
         action.last_executed_log = log_item
         action.save()
 
         # Update excluded items in payload
-        self._update_excluded_items(payload, [msg.to[0] for msg in msgs])
+        self._update_excluded_items(payload, recipients)
 
 
 class ActionManagerEmailList(ActionOutEditManager, ActionRunManager):
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""Deliver email messages with a set of threads and SMTP connections.
+
+Each sender thread keeps its own SMTP connection open for all the messages
+it sends (the connection is replaced only if it fails). The delivery rate
+is controlled by a token bucket defined by EMAIL_BURST and EMAIL_BURST_PAUSE,
+and the messages that fail are retried EMAIL_RETRIES times with an
+exponential backoff starting at EMAIL_RETRY_BACKOFF seconds.
+
+The messages are produced in the calling thread (they may require access to
+the database) and handed to the sender threads through a bounded queue. The
+recipients of the messages delivered are also passed to the checkpoint
+function in the calling thread, in batches of EMAIL_CHECKPOINT_SIZE.
+"""
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core import mail
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+
+LOGGER = get_task_logger('celery_execution')
+
+
+class TokenBucket:
+    """Limit the rate at which messages are sent.
+
+    The bucket holds up to capacity tokens and is refilled at a rate of
+    tokens per second. Every message takes a token, waiting if the bucket is
+    empty. The bucket is shared by all the sender threads.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """Create a full bucket.
+
+        :param rate: Number of tokens added per second
+        :param capacity: Maximum number of tokens (size of a burst)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.timestamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, waiting until it is available.
+
+        The token is reserved while holding the lock (the number of tokens
+        may become negative) and the wait takes place without it.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.timestamp) * self.rate)
+            self.timestamp = now
+            self.tokens -= 1
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait_time:
+            time.sleep(wait_time)
+
+
+def get_rate_limiter() -> Optional[TokenBucket]:
+    """Create the token bucket with EMAIL_BURST and EMAIL_BURST_PAUSE.
+
+    A burst of EMAIL_BURST messages is allowed every EMAIL_BURST_PAUSE
+    seconds.
+
+    :return: TokenBucket or None if there is no limit.
+    """
+    if not settings.EMAIL_BURST or not settings.EMAIL_BURST_PAUSE:
+        return None
+
+    return TokenBucket(
+        settings.EMAIL_BURST / settings.EMAIL_BURST_PAUSE,
+        settings.EMAIL_BURST)
+
+
+def _get_recipient(msg) -> str:
+    """Get the recipient of a message (empty if it has none)."""
+    try:
+        return msg.to[0]
+    except Exception:
+        return ''
+
+
+def _send_with_retries(
+    connection,
+    msg: Union[EmailMessage, EmailMultiAlternatives],
+) -> Tuple[object, Optional[str]]:
+    """Send a message retrying with exponential backoff.
+
+    :param connection: Open connection or None to open a new one
+    :param msg: Message to send
+    :return: (connection to reuse or None, error message or None)
+    """
+    error = None
+    for attempt in range(settings.EMAIL_RETRIES + 1):
+        if attempt:
+            time.sleep(settings.EMAIL_RETRY_BACKOFF * 2 ** (attempt - 1))
+
+        try:
+            if connection is None:
+                connection = mail.get_connection()
+                connection.open()
+
+            if connection.send_messages([msg]):
+                return connection, None
+            error = 'Message not sent'
+        except Exception as exc:
+            error = str(exc)
+            # Discard the connection, the next attempt opens a new one
+            try:
+                connection.close()
+            except Exception:
+                pass
+            connection = None
+
+        LOGGER.warning(
+            'Error sending email to %s (attempt %s): %s',
+            _get_recipient(msg),
+            str(attempt + 1),
+            error)
+
+    return connection, error
+
+
+def deliver_messages(
+    msgs: Iterable[Union[EmailMessage, EmailMultiAlternatives]],
+    n_threads: Optional[int] = None,
+    checkpoint: Optional[Callable[[List[str]], None]] = None,
+) -> Tuple[List[str], Dict[str, str]]:
+    """Deliver the messages with a set of threads.
+
+    :param msgs: Iterable of either EmailMessage or EmailMultiAlternatives
+    :param n_threads: Number of sender threads (or EMAIL_SEND_THREADS)
+    :param checkpoint: Function receiving batches of recipients delivered
+    :return: List of recipients of the messages delivered, and dictionary
+             recipient: error for those that could not be delivered.
+    """
+    n_threads = max(n_threads or settings.EMAIL_SEND_THREADS, 1)
+    rate_limiter = get_rate_limiter()
+    msg_queue = queue.Queue(maxsize=2 * n_threads)
+    results = []
+    # Recipients delivered and not yet passed to the checkpoint function
+    pending = []
+    results_lock = threading.Lock()
+
+    def do_checkpoint(min_size: int):
+        """Pass the pending recipients to the checkpoint function."""
+        if checkpoint is None:
+            return
+        with results_lock:
+            if not pending or len(pending) < min_size:
+                return
+            batch = pending[:]
+            pending.clear()
+        checkpoint(batch)
+
+    def send_from_queue():
+        """Send the messages in the queue until None is received.
+
+        Any error is recorded as a failure of the message, so the thread
+        keeps draining the queue (otherwise the producer would block).
+        """
+        connection = None
+        msg = msg_queue.get()
+        while msg is not None:
+            try:
+                if rate_limiter:
+                    rate_limiter.acquire()
+                connection, error = _send_with_retries(connection, msg)
+            except Exception as exc:
+                error = str(exc) or 'Message not sent'
+            recipient = _get_recipient(msg)
+            with results_lock:
+                results.append((recipient, error))
+                if error is None:
+                    pending.append(recipient)
+            msg = msg_queue.get()
+
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    threads = [
+        threading.Thread(target=send_from_queue, daemon=True)
+        for __ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for msg in msgs:
+            msg_queue.put(msg)
+            do_checkpoint(settings.EMAIL_CHECKPOINT_SIZE)
+    finally:
+        # Stop the threads once they empty the queue
+        for __ in threads:
+            msg_queue.put(None)
+        for thread in threads:
+            thread.join()
+        do_checkpoint(1)
+
+    delivered = [recipient for recipient, error in results if error is None]
+    failed = {
+        recipient: error for recipient, error in results if error is not None}
+    return delivered, failed
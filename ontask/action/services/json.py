@@ -10,9 +10,9 @@ from django.conf import settings
 import pytz
 import requests
 
-from ontask import OnTaskSharedState, models
+from ontask import OnTaskSharedState, models, settings as ontask_settings
 from ontask.action.evaluate import (
-    evaluate_action, evaluate_row_action_out,
+    evaluate_action_iter, evaluate_row_action_out,
     get_action_evaluation_context,
 )
 from ontask.action.services.edit_manager import ActionOutEditManager
@@ -26,6 +26,7 @@ def _send_and_log_json(
     action: models.Action,
     json_obj: str,
     headers: Mapping,
+    log_buffer: Optional[models.LogBuffer] = None,
 ):
     """Send a JSON object to the action URL and LOG event."""
     if settings.EXECUTE_ACTION_JSON_TRANSFER:
@@ -50,6 +51,7 @@ def _send_and_log_json(
     action.log(
         user,
         models.Log.ACTION_JSON_SENT,
+        log_buffer=log_buffer,
         object=json.dumps(json_obj),
         status=status_val,
         json_sent_datetime=str(datetime.datetime.now(pytz.timezone(
@@ -71,11 +73,12 @@ class ActionManagerJSON(ActionOutEditManager, ActionRunManager):
         if log_item is None:
             log_item = action.log(user, self.log_event, **payload)
 
-        action_evals = evaluate_action(
+        action_evals = evaluate_action_iter(
             action,
             column_name=action.workflow.columns.get(
                 pk=payload['item_column']).name,
             exclude_values=payload.get('exclude_values', []),
+            log_item=log_item,
         )
 
         # Create the headers to use for all requests
@@ -86,20 +89,26 @@ class ActionManagerJSON(ActionOutEditManager, ActionRunManager):
 
         # Iterate over all json objects to create the strings and check for
         # correctness
-        for json_string, _ in action_evals:
-            _send_and_log_json(
-                user,
-                action,
-                json.loads(json_string),
-                headers)
+        column_values = []
+        bulk_size = int(ontask_settings.LOGS_BULK_SIZE)
+        try:
+            with models.LogBuffer(bulk_size) as log_buffer:
+                for json_string, column_value in action_evals:
+                    _send_and_log_json(
+                        user,
+                        action,
+                        json.loads(json_string),
+                        headers,
+                        log_buffer)
+                    column_values.append(column_value)
+        finally:
+            action_evals.close()
 
         action.last_executed_log = log_item
         action.save()
 
         # Update excluded items in payload
-        self._update_excluded_items(
-            payload,
-            [column_value for __, column_value in action_evals])
+        self._update_excluded_items(payload, column_values)
 
 
 class ActionManagerJSONList(ActionOutEditManager, ActionRunManager):
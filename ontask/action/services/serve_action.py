@@ -20,6 +20,7 @@ from ontask.action.services.errors import (
     OnTaskActionSurveyNoTableData,
 )
 from ontask.dataops import sql
+from ontask.dataops.services import RowConditionCounts
 
 
 def serve_action_out(
@@ -136,6 +137,12 @@ def update_row_values(
     :return:
     """
     keys, values, where_field, where_value = row_data
+    condition_counts = RowConditionCounts(
+        action.workflow,
+        where_field,
+        where_value,
+        keys)
+
     # Execute the query
     sql.update_row(
         action.workflow.get_data_frame_table_name(),
@@ -144,10 +151,10 @@ def update_row_values(
         filter_dict={where_field: where_value},
     )
 
-    # Recompute all the values of the conditions in each of the actions
-    # TODO: Explore how to do this asynchronously (or lazy)
-    for act in action.workflow.actions.all():
-        act.update_n_rows_selected()
+    # Update the counts of the conditions with the changes in the row
+    if where_field in keys:
+        where_value = values[keys.index(where_field)]
+    condition_counts.update(where_field, where_value)
 
     # Log the event and update its content in the action
     log_item = action.log(
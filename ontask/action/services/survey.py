@@ -17,6 +17,7 @@ from ontask.action.services.edit_manager import ActionEditManager
 from ontask.action.services.run_manager import ActionRunManager
 from ontask.core import DataTablesServerSidePaging, OperationsColumn
 from ontask.dataops import sql
+from ontask.dataops.services import get_search_count
 
 
 class ColumnSelectedTable(tables.Table):
@@ -126,7 +127,7 @@ def _create_initial_qs(
     columns,
     dt_page,
 ):
-    """Obtain the iniital QuerySet to select the right page.
+    """Obtain the rows in the requested page.
 
     :param table_name: Workflow to get the table name
     :param filter_formula:
@@ -147,6 +148,9 @@ def _create_initial_qs(
         filter_formula=filter_formula,
         order_col_name=order_col_name,
         order_asc=dt_page.order_dir == 'asc',
+        key_name=next(col.name for col in columns if col.is_key),
+        limit=dt_page.length if dt_page.length >= 0 else None,
+        offset=dt_page.start,
     )
 
     return qs
@@ -155,24 +159,19 @@ def _create_initial_qs(
 def _create_table_qsdata(
     action_id: int,
     qs,
-    dt_page: DataTablesServerSidePaging,
     columns: List[models.Column],
     key_idx: int,
 ) -> List:
-    """Select the subset of the qs to be sent as qs data to the JSON request.
+    """Process the rows in the page to be sent to the JSON request.
 
     :param action_id: Action id being processed
-    :param qs: Query set from where to extract the data
-    :param dt_page: Object with DataTable parameters to process the page
+    :param qs: Query set with the rows in the page
     :param columns: List of column
     :param key_idx: Index of the key column
     :return: Query set to return to DataTable JavaScript
     """
     final_qs = []
-    item_count = 0
-    for row in qs[dt_page.start:dt_page.start + dt_page.length]:
-        item_count += 1
-
+    for row in qs:
         # Render the first element (the key) as the link to the page to update
         # the content.
         row = list(row)
@@ -185,10 +184,6 @@ def _create_table_qsdata(
         # Add the row for rendering
         final_qs.append(row)
 
-        if item_count == dt_page.length:
-            # We reached the number or requested elements, abandon loop
-            break
-
     return final_qs
 
 
@@ -212,13 +207,16 @@ def create_survey_table(
         dt_page,
     )
 
-    filtered = len(query_set)
+    filtered = get_search_count(
+        workflow,
+        dt_page.search_value,
+        [col.name for col in columns],
+        action.get_filter_formula())
 
     # Get the subset of the qs to show in the table
     query_set = _create_table_qsdata(
         action.id,
         query_set,
-        dt_page,
         columns,
         next(idx for idx, col in enumerate(columns) if col.is_key),
     )
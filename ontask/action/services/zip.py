@@ -3,6 +3,7 @@
 """Methods to process the personalized zip action run request."""
 from datetime import datetime
 from io import BytesIO
+import itertools
 from typing import List, Optional, Tuple
 import zipfile
 
@@ -11,7 +12,7 @@ from django.contrib.sessions.backends.base import SessionBase
 from django.shortcuts import redirect, render
 
 from ontask import models
-from ontask.action.evaluate.action import evaluate_action
+from ontask.action.evaluate.action import evaluate_action_iter
 from ontask.action.services.run_manager import ActionRunManager
 from ontask.core import SessionPayload
 from ontask.dataops import sql
@@ -77,26 +78,29 @@ def _create_eval_data_tuple(
     :return: List[Tuple[text, text, text]]
     """
     # Obtain the personalised text
-    action_evals = evaluate_action(
+    action_evals = evaluate_action_iter(
         action,
         column_name=item_column.name,
         exclude_values=exclude_values)
 
     if user_fname_column:
         # Get the user_fname_column values
-        user_fname_data = [row[user_fname_column.name] for row in sql.get_rows(
+        user_fname_data = (row[user_fname_column.name] for row in sql.get_rows(
             action.workflow.get_data_frame_table_name(),
             column_names=[user_fname_column.name],
-            filter_formula=None).fetchall()]
+            filter_formula=None))
     else:
-        # Array of empty strings to concatenate
-        user_fname_data = [''] * len(action_evals)
-
-    return [
-        (user_fname, part_id, _HTML_BODY.format(msg_body))
-        for (msg_body, part_id), user_fname in
-        zip(action_evals, user_fname_data)
-    ]
+        # Empty strings to concatenate
+        user_fname_data = itertools.repeat('')
+
+    try:
+        return [
+            (user_fname, part_id, _HTML_BODY.format(msg_body))
+            for (msg_body, part_id), user_fname in
+            zip(action_evals, user_fname_data)
+        ]
+    finally:
+        action_evals.close()
 
 
 def create_and_send_zip(
@@ -1,15 +1,21 @@
 # -*- coding: utf-8 -*-
 
 """Test task logic functions."""
+import multiprocessing
 import os
+import time
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core import mail
 from django.shortcuts import reverse
+from django.test import override_settings
 
 from ontask import models, tests
-from ontask.action import services
-from ontask.dataops import pandas
+from ontask.action import evaluate, services
+from ontask.action.services import email_delivery
+from ontask.dataops import pandas, sql
 
 
 class EmailActionTracking(tests.OnTaskTestCase):
@@ -61,6 +67,287 @@ class EmailActionTracking(tests.OnTaskTestCase):
                     idx
                 )
 
+
+class ActionTemplateCache(tests.OnTaskTestCase):
+    """Test the cache of compiled templates."""
+
+    fixtures = ['simple_email_action']
+    filename = os.path.join(
+        settings.BASE_DIR(),
+        'ontask',
+        'fixtures',
+        'simple_email_action.sql'
+    )
+
+    def test_template_cache(self):
+        """Test that templates are reused and discarded when text changes."""
+        action = models.Action.objects.get(name='simple action')
+        evaluate.clear_template_cache()
+
+        template = evaluate.get_template(action.text_content, action)
+        self.assertIs(
+            template,
+            evaluate.get_template(action.text_content, action))
+
+        # Rendering produces the same result as a newly compiled template
+        context = evaluate.get_action_evaluation_context(
+            action,
+            evaluate.get_row_values(action, 1))
+        cached_result = evaluate.render_action_template(
+            action.text_content,
+            context,
+            action)
+        evaluate.clear_template_cache()
+        self.assertEqual(
+            cached_result,
+            evaluate.render_action_template(
+                action.text_content,
+                context,
+                action))
+
+        # Changing the text discards the compiled templates of the action
+        action.set_text_content(action.text_content + '<p>New text</p>')
+        action.save()
+        self.assertIsNot(
+            template,
+            evaluate.get_template(action.text_content, action))
+        self.assertIn(
+            'New text',
+            evaluate.render_action_template(
+                action.text_content,
+                context,
+                action))
+
+    def test_translated_context(self):
+        """Test that the contexts with translated names render the same."""
+        action = models.Action.objects.get(name='simple action')
+        plan = evaluate.ActionEvaluationPlan(action)
+        rows = plan.get_rows()
+        for row in rows:
+            row_values = {
+                key: row[key] for key in row.keys()
+                if key not in plan.condition_columns}
+            self.assertEqual(
+                evaluate.render_action_template(
+                    action.text_content,
+                    plan.get_db_row_context(row),
+                    action,
+                    translated=True),
+                evaluate.render_action_template(
+                    action.text_content,
+                    plan.get_context(row_values),
+                    action))
+        rows.close()
+
+    def test_column_list_cache(self):
+        """Test that column lists are reused until the table changes."""
+        action = models.Action.objects.get(name='simple action')
+        text = '{% ot_insert_column_list "email" %}'
+        context = evaluate.get_action_evaluation_context(
+            action,
+            evaluate.get_row_values(action, 1))
+        result = evaluate.render_action_template(text, context, action)
+        self.assertIn('student01@bogus.com', result)
+
+        # A new object obtains the list from the cache
+        action = models.Action.objects.get(pk=action.pk)
+        with mock.patch.object(sql, 'get_rows') as get_rows:
+            self.assertEqual(
+                result,
+                evaluate.render_action_template(text, context, action))
+            get_rows.assert_not_called()
+
+        # Changing the table discards the list
+        sql.update_row(
+            action.workflow.get_data_frame_table_name(),
+            ['email'],
+            ['student04@bogus.com'],
+            filter_dict={'sid': 1})
+        action = models.Action.objects.get(pk=action.pk)
+        result = evaluate.render_action_template(text, context, action)
+        self.assertNotIn('student01@bogus.com', result)
+        self.assertIn('student04@bogus.com', result)
+
+
+class ActionRubricFeedback(tests.OnTaskTestCase):
+    """Test the evaluation of the rubric feedback."""
+
+    fixtures = ['test_rubric']
+    filename = os.path.join(
+        settings.BASE_DIR(),
+        'ontask',
+        'fixtures',
+        'test_rubric.sql'
+    )
+
+    def test_rubric_feedback(self):
+        """Test that each row gets the feedback of its categories."""
+        workflow = models.Workflow.objects.get(name='test rubric')
+        action = models.Action.objects.create(
+            workflow=workflow,
+            name='rubric action',
+            action_type=models.Action.RUBRIC_TEXT,
+            text_content='{% ot_insert_rubric_feedback %}')
+        criteria = workflow.columns.filter(
+            name__in=['Structure', 'Presentation'])
+        for criterion in criteria:
+            models.ActionColumnConditionTuple.objects.create(
+                action=action,
+                column=criterion)
+            for idx in range(len(criterion.categories)):
+                models.RubricCell.objects.create(
+                    action=action,
+                    column=criterion,
+                    loa_position=idx,
+                    feedback_text='{0} feedback {1}'.format(
+                        criterion.name,
+                        idx))
+
+        for text, email in evaluate.evaluate_action(
+            action,
+            column_name='email',
+        ):
+            row = sql.get_row(
+                workflow.get_data_frame_table_name(),
+                key_name='email',
+                key_value=email)
+            for criterion in criteria:
+                if not row[criterion.name]:
+                    continue
+                self.assertIn(
+                    '{0} feedback {1}'.format(
+                        criterion.name,
+                        criterion.categories.index(row[criterion.name])),
+                    text)
+
+    def test_rubric_feedback_unknown_category(self):
+        """Test that a value outside the categories raises an error."""
+        workflow = models.Workflow.objects.get(name='test rubric')
+        action = models.Action.objects.create(
+            workflow=workflow,
+            name='rubric action',
+            action_type=models.Action.RUBRIC_TEXT,
+            text_content='{% ot_insert_rubric_feedback %}')
+        criterion = workflow.columns.get(name='Structure')
+        models.ActionColumnConditionTuple.objects.create(
+            action=action,
+            column=criterion)
+
+        plan = evaluate.RubricEvaluationPlan(action)
+        with self.assertRaises(ValueError):
+            plan.get_text_sources({
+                plan.criteria[0][1]: 'Not a category'})
+
+
+class ActionEvaluateParallel(tests.OnTaskTestCase):
+    """Test the evaluation of an action with a pool of processes."""
+
+    fixtures = ['simple_email_action']
+    filename = os.path.join(
+        settings.BASE_DIR(),
+        'ontask',
+        'fixtures',
+        'simple_email_action.sql'
+    )
+
+    def test_evaluate_parallel(self):
+        """Test that processes produce the same result in the same order."""
+        action = models.Action.objects.get(name='simple action')
+        log_item = action.log(
+            get_user_model().objects.get(email='instructor01@bogus.com'),
+            models.Log.ACTION_RUN_PERSONALIZED_EMAIL)
+        result = evaluate.evaluate_action(
+            action,
+            extra_string='Subject {{ email }}',
+            column_name='email')
+
+        with override_settings(
+            EXECUTE_ACTION_PROCESSES=2,
+            EXECUTE_ACTION_ITERSIZE=2,
+        ):
+            parallel_result = list(evaluate.evaluate_action_iter(
+                action,
+                extra_string='Subject {{ email }}',
+                column_name='email',
+                log_item=log_item))
+
+        self.assertEqual(result, parallel_result)
+        log_item.refresh_from_db()
+        self.assertEqual(log_item.payload['rows_rendered'], len(result))
+
+    @override_settings(EXECUTE_ACTION_PROCESSES=2)
+    def test_evaluate_parallel_close(self):
+        """Test that closing the results terminates the processes."""
+        action = models.Action.objects.get(name='simple action')
+        action_evals = evaluate.evaluate_action_iter(
+            action,
+            column_name='email')
+        self.assertTrue(multiprocessing.active_children())
+
+        action_evals.close()
+        self.assertFalse(multiprocessing.active_children())
+
+
+class EmailDelivery(tests.OnTaskTestCase):
+    """Test the delivery of messages with threads and rate limit."""
+
+    def test_token_bucket(self):
+        """Test that the bucket allows a burst and then limits the rate."""
+        bucket = email_delivery.TokenBucket(100, 2)
+        start = time.monotonic()
+        for __ in range(6):
+            bucket.acquire()
+        # Two tokens available, four at 100/sec
+        self.assertGreaterEqual(time.monotonic() - start, 0.035)
+
+    @override_settings(EMAIL_SEND_THREADS=3)
+    def test_deliver_messages(self):
+        """Test that all messages are delivered with several threads."""
+        recipients = ['student{0:02}@bogus.com'.format(idx)
+                      for idx in range(10)]
+        delivered, failed = email_delivery.deliver_messages(
+            mail.EmailMessage('Subject', 'Body', 'from@bogus.com', [to_addr])
+            for to_addr in recipients)
+
+        self.assertEqual(sorted(delivered), recipients)
+        self.assertEqual(failed, {})
+        self.assertEqual(
+            sorted(msg.to[0] for msg in mail.outbox),
+            recipients)
+
+    @override_settings(EMAIL_SEND_THREADS=2)
+    def test_deliver_messages_errors(self):
+        """Test that unexpected errors do not stop the sender threads."""
+        send_with_retries = email_delivery._send_with_retries
+
+        def send_or_fail(connection, msg):
+            if msg.to[0].startswith('bad'):
+                raise Exception('Unexpected error')
+            return send_with_retries(connection, msg)
+
+        recipients = ['{0}{1:02}@bogus.com'.format(prefix, idx)
+                      for idx in range(10) for prefix in ['bad', 'student']]
+        with mock.patch.object(
+            email_delivery,
+            '_send_with_retries',
+            side_effect=send_or_fail,
+        ):
+            delivered, failed = email_delivery.deliver_messages(
+                mail.EmailMessage(
+                    'Subject',
+                    'Body',
+                    'from@bogus.com',
+                    [to_addr])
+                for to_addr in recipients)
+
+        self.assertEqual(
+            sorted(delivered),
+            [rcpt for rcpt in recipients if rcpt.startswith('student')])
+        self.assertEqual(
+            sorted(failed),
+            [rcpt for rcpt in recipients if rcpt.startswith('bad')])
+
+
 class ActionImport(tests.OnTaskTestCase):
     """Test action import."""
 
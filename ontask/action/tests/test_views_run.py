@@ -11,8 +11,9 @@ from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 
-from ontask import OnTaskSharedState, models, tests
+from ontask import OnTaskSharedState, models, tasks, tests
 from ontask.core import SessionPayload
+from ontask.dataops import sql
 
 
 class ActionViewRunEmailAction(tests.OnTaskTestCase):
@@ -79,6 +80,54 @@ class ActionViewRunEmailAction(tests.OnTaskTestCase):
         self._verify_content()
         self.assertTrue(status.is_success(resp.status_code))
 
+    def test_resume_email_execution(self):
+        """Resume an execution excluding the recipients in checkpoints."""
+        action = self.workflow.actions.get(name='Midterm comments')
+        column = action.workflow.columns.get(name='email')
+        user = get_user_model().objects.get(email=self.user_email)
+        payload = {
+            'cc_email': 'user01@bogus.com user02@bogus.com',
+            'bcc_email': 'user03@bogus.com user04@bogus.com',
+            'item_column': column.pk,
+            'subject': 'message subject',
+            'track_read': False,
+            'send_confirmation': False,
+            'exclude_values': []}
+
+        # Reverse loads the URLs registering the run producers
+        self.get_response('action:run', url_params={'pk': action.id})
+
+        # Execution interrupted after delivering three messages
+        log_item = action.log(
+            user,
+            models.Log.ACTION_RUN_PERSONALIZED_EMAIL,
+            **payload)
+        delivered = [row['email'] for row in sql.get_rows(
+            self.workflow.get_data_frame_table_name(),
+            column_names=['email'],
+            filter_formula=action.get_filter_formula()).fetchmany(3)]
+        models.RunCheckpoint.objects.create(log=log_item, items=delivered)
+
+        tasks.execute_operation(
+            models.Log.ACTION_RUN_PERSONALIZED_EMAIL,
+            user_id=user.id,
+            log_id=log_item.id,
+            workflow_id=self.workflow.id,
+            action_id=action.id,
+            payload=payload)
+
+        n_rows = action.get_rows_selected()
+        self.assertEqual(len(mail.outbox), n_rows - 3)
+        self.assertFalse(any(
+            message.to[0] in delivered for message in mail.outbox))
+        self._verify_content()
+        log_item.refresh_from_db()
+        self.assertEqual(log_item.payload['emails_sent'], n_rows)
+        self.assertEqual(log_item.payload['emails_total'], n_rows)
+        self.assertEqual(
+            len(models.RunCheckpoint.get_items(log_item)),
+            n_rows)
+
     def test_email_with_filter(self):
         """Run sequence of request to send email without filtering users."""
         action = self.workflow.actions.get(name='Midterm comments')
@@ -6,6 +6,7 @@ The constant ONTASK_FIELD_PREFIX is used in forms to avoid using column names
 (they are given by the user and may pose a problem)
 """
 from ontask.core.checks import check_key_columns, check_wf_df
+from ontask.core.data_cache import get_data_version, get_or_set_data_cache
 from ontask.core.decorators import (
     ajax_required, get_action, get_column, get_columncondition, get_condition,
     get_view, get_workflow,
@@ -30,6 +31,12 @@ ONTASK_SCHEDULED_TASK_NAME_TEMPLATE = '___ontask___scheduled_{0}'
 
 ONTASK_SCHEDULED_LOCKED_ITEM = '___ontask___scheduled___locked___item_{0}'
 
+# Cache keys with the time of the first and last request to count the rows
+# selected by the conditions of a workflow (pending count)
+ONTASK_CONDITION_COUNT_PENDING = '___ontask___condition___count___pending_{0}'
+ONTASK_CONDITION_COUNT_REQUESTED = (
+    '___ontask___condition___count___requested_{0}')
+
 # Length of suffix to add to file names
 ONTASK_SUFFIX_LENGTH = 512
 
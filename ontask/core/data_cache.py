@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""Cache of values derived from the data of a workflow.
+
+The values are stored in the Django cache with the workflow id and the
+current data version (see Workflow.data_version) in the key, so they are
+reused until the data in the table changes. Each workflow keeps an index
+with the keys stored, ordered by the time they were last used. When the
+index exceeds DATA_CACHE_SIZE entries, the least recently used are removed,
+and the entries for previous versions are removed as soon as they are
+detected.
+
+The index is updated without a lock. Concurrent requests may lose an update
+of the order in the index, which only affects the choice of the entries to
+remove (the values are always correct).
+"""
+from typing import Any, Callable, List, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ontask import models
+
+# Key in the cache with a value (workflow id, version, name)
+DATA_CACHE_KEY = '___ontask___data___cache_{0}_{1}_{2}'
+
+# Key in the cache with the index of entries of a workflow
+DATA_CACHE_INDEX_KEY = '___ontask___data___cache___index_{0}'
+
+# Value stored in the cache to represent None
+_NONE_VALUE = '___ontask___data___cache___none'
+
+
+def get_data_version(workflow: models.Workflow) -> int:
+    """Get the current version of the data in the workflow.
+
+    The value is read from the DB (and updated in the object) because the
+    functions modifying the table do not update the workflow objects.
+
+    :param workflow: Workflow to query
+    :return: Data version
+    """
+    workflow.refresh_from_db(fields=['data_version'])
+    return workflow.data_version
+
+
+def _update_index(
+    workflow: models.Workflow,
+    version: int,
+    name: str,
+) -> List[str]:
+    """Move (or add) the entry to the end of the index of the workflow.
+
+    :param workflow: Workflow owning the entry
+    :param version: Current data version
+    :param name: Name of the entry
+    :return: Keys of the entries removed from the index
+    """
+    index_key = DATA_CACHE_INDEX_KEY.format(workflow.id)
+    index: List[Tuple[int, str]] = cache.get(index_key, [])
+    if index and index[-1] == (version, name):
+        # Nothing to change
+        return []
+
+    if any(item_version > version for item_version, __ in index):
+        # The data changed while processing this request
+        return []
+
+    discarded = [
+        (item_version, item_name) for item_version, item_name in index
+        if item_version < version]
+    index = [
+        item for item in index
+        if item[0] == version and item[1] != name]
+    index.append((version, name))
+    if len(index) > settings.DATA_CACHE_SIZE:
+        discarded += index[:-settings.DATA_CACHE_SIZE]
+        index = index[-settings.DATA_CACHE_SIZE:]
+
+    cache.set(index_key, index, settings.CACHE_TTL)
+    return [
+        DATA_CACHE_KEY.format(workflow.id, item_version, item_name)
+        for item_version, item_name in discarded]
+
+
+def get_or_set_data_cache(
+    workflow: models.Workflow,
+    name: str,
+    function: Callable[[], Any],
+) -> Any:
+    """Get a value derived from the data, calculating it if needed.
+
+    :param workflow: Workflow with the data
+    :param name: Name identifying the value within the workflow. It must
+    contain all the parameters used to calculate the value.
+    :param function: Function to invoke (without parameters) to calculate
+    the value if it is not in the cache
+    :return: The value stored in the cache or returned by function
+    """
+    version = get_data_version(workflow)
+    key = DATA_CACHE_KEY.format(workflow.id, version, name)
+    value = cache.get(key)
+    if value is None:
+        value = function()
+        cache.set(
+            key,
+            _NONE_VALUE if value is None else value,
+            settings.CACHE_TTL)
+    elif isinstance(value, str) and value == _NONE_VALUE:
+        value = None
+
+    discarded = _update_index(workflow, version, name)
+    if discarded:
+        cache.delete_many(discarded)
+    return value
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 
 """Module to evaluate formulas in OnTask."""
+from ontask.dataops.formula.compiler import CompiledFormula, compile_formula
 from ontask.dataops.formula.evaluation import (
-    evaluate, get_variables, has_variable, rename_variable,
+    evaluate, evaluate_row_sql, get_variables, has_variable, rename_variable,
 )
 from ontask.dataops.formula.operands import EVAL_EXP, EVAL_SQL, EVAL_TXT
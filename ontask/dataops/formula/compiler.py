@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+"""Compile formulas into Python functions for repeated evaluation.
+
+The function evaluate traverses the JSON formula and dispatches every
+operator by name each time it is invoked. When the same formula is evaluated
+over many rows (for example, when an action is rendered for every row in the
+table), the traversal, the dispatch and the parsing of the constants are done
+once by compile_formula, and the result is a function that receives the
+dictionary of (name, value) pairs and returns the Boolean result.
+
+The compiled functions produce the same results (and raise the same
+exceptions) as evaluate(node, EVAL_EXP, given_variables).
+"""
+import operator
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from django.utils.translation import ugettext
+
+from ontask import OnTaskException
+from ontask.dataops.formula.operands import GET_CONSTANT, value_is_null
+
+CompiledFormula = Callable[[Optional[Mapping]], bool]
+
+# Operators comparing the value with a constant (value is not null)
+_CONSTANT_OPERATORS = {
+    'equal': operator.eq,
+    'not_equal': operator.ne,
+    'begins_with': lambda varvalue, constant: varvalue.startswith(constant),
+    'not_begins_with': lambda varvalue, constant: not varvalue.startswith(
+        constant),
+    'contains': lambda varvalue, constant: varvalue.find(constant) != -1,
+    'not_contains': lambda varvalue, constant: varvalue.find(constant) == -1,
+    'ends_with': lambda varvalue, constant: varvalue.endswith(constant),
+    'not_ends_with': lambda varvalue, constant: not varvalue.endswith(
+        constant),
+}
+
+# Operators that require an order in the values (and name for the errors)
+_ORDER_OPERATORS = {
+    'less': (operator.lt, 'LESS'),
+    'less_or_equal': (operator.le, 'LESS OR EQUAL'),
+    'greater': (operator.gt, 'GREATER'),
+    'greater_or_equal': (operator.ge, 'GREATER OR EQUAL'),
+}
+
+_ORDER_TYPES = ('integer', 'double', 'datetime')
+
+
+def _compile_get_value(node: Dict) -> Callable[[Optional[Mapping]], Any]:
+    """Create the function to extract the value of the variable in node.
+
+    Equivalent to operands.get_value with the variable name fixed.
+
+    :param node: Terminal node in the formula
+    :return: Function receiving the dictionary of variables/values
+    """
+    varname = node['field']
+
+    def get_value(given_variables: Optional[Mapping]) -> Any:
+        if given_variables is None:
+            return None
+
+        if varname not in given_variables:
+            raise OnTaskException(
+                'No value found for variable {0}'.format(varname),
+                0,
+            )
+
+        varvalue = given_variables.get(varname)
+        if isinstance(varvalue, bool):
+            varvalue = str(varvalue).lower()
+        return varvalue
+
+    return get_value
+
+
+def _compile_constant_operator(node: Dict) -> CompiledFormula:
+    """Compile the operators comparing a value with a constant."""
+    get_value = _compile_get_value(node)
+    constant = GET_CONSTANT.get(node['type'])(node['value'])
+    op_function = _CONSTANT_OPERATORS[node['operator']]
+
+    def evaluate_node(given_variables: Optional[Mapping]) -> bool:
+        varvalue = get_value(given_variables)
+        return (
+            (not value_is_null(varvalue))
+            and op_function(varvalue, constant))
+
+    return evaluate_node
+
+
+def _compile_order_operator(node: Dict) -> CompiledFormula:
+    """Compile the operators less, less_or_equal, greater, etc."""
+    get_value = _compile_get_value(node)
+    constant = GET_CONSTANT.get(node['type'])(node['value'])
+    op_function, op_name = _ORDER_OPERATORS[node['operator']]
+    type_allowed = node['type'] in _ORDER_TYPES
+
+    def evaluate_node(given_variables: Optional[Mapping]) -> bool:
+        varvalue = get_value(given_variables)
+        if type_allowed:
+            return (
+                (not value_is_null(varvalue))
+                and op_function(varvalue, constant))
+        raise Exception(
+            ugettext(
+                'Evaluation error: Type {0} not allowed with operator '
+                + op_name,
+            ).format(node['type']),
+        )
+
+    return evaluate_node
+
+
+def _compile_between(node: Dict) -> CompiledFormula:
+    """Compile the operators between and not_between."""
+    get_value = _compile_get_value(node)
+    negate = node['operator'] == 'not_between'
+    type_allowed = node['type'] in _ORDER_TYPES
+    if type_allowed:
+        left = GET_CONSTANT[node['type']](node['value'][0])
+        right = GET_CONSTANT[node['type']](node['value'][1])
+
+    def evaluate_node(given_variables: Optional[Mapping]) -> bool:
+        varvalue = get_value(given_variables)
+        if value_is_null(varvalue):
+            return False
+
+        if not type_allowed:
+            raise Exception(
+                ugettext(
+                    'Evaluation error: Type {0} not allowed '
+                    + 'with operator BETWEEN',
+                ).format(node['type']),
+            )
+
+        return (left <= varvalue <= right) != negate
+
+    return evaluate_node
+
+
+def _compile_empty_null(node: Dict) -> CompiledFormula:
+    """Compile the operators is_empty, is_null and their negations."""
+    get_value = _compile_get_value(node)
+    op_name = node['operator']
+
+    if op_name == 'is_empty':
+        def evaluate_node(given_variables: Optional[Mapping]) -> bool:
+            varvalue = get_value(given_variables)
+            return (not value_is_null(varvalue)) and varvalue == ''
+    elif op_name == 'is_not_empty':
+        def evaluate_node(given_variables: Optional[Mapping]) -> bool:
+            varvalue = get_value(given_variables)
+            return (not value_is_null(varvalue)) and varvalue != ''
+    elif op_name == 'is_null':
+        def evaluate_node(given_variables: Optional[Mapping]) -> bool:
+            return value_is_null(get_value(given_variables))
+    else:
+        def evaluate_node(given_variables: Optional[Mapping]) -> bool:
+            return not value_is_null(get_value(given_variables))
+
+    return evaluate_node
+
+
+def _compile_leaf(node: Dict) -> CompiledFormula:
+    """Compile a terminal node of the formula.
+
+    :param node: Terminal node
+    :return: Function to evaluate the node
+    """
+    op_name = node['operator']
+    if op_name in _CONSTANT_OPERATORS:
+        return _compile_constant_operator(node)
+
+    if op_name in _ORDER_OPERATORS:
+        return _compile_order_operator(node)
+
+    if op_name in ('between', 'not_between'):
+        return _compile_between(node)
+
+    if op_name in ('is_empty', 'is_not_empty', 'is_null', 'is_not_null'):
+        return _compile_empty_null(node)
+
+    raise OnTaskException(
+        'Unable to compile formula with operator {0}'.format(op_name),
+        0,
+    )
+
+
+def compile_formula(node: Dict) -> CompiledFormula:
+    """Translate a formula into a function to evaluate it.
+
+    The result of calling the function with a dictionary (name, value) is
+    identical to the result of evaluate(node, EVAL_EXP, dictionary). All
+    sub-clauses are evaluated (no short-circuit) to detect the same missing
+    variables as the interpreter.
+
+    :param node: JSON node representing the formula
+    :return: Function receiving the dictionary with the variables/values
+    """
+    if 'condition' not in node:
+        return _compile_leaf(node)
+
+    sub_clauses = [
+        compile_formula(sub_formula) for sub_formula in node['rules']]
+    combine = all if node['condition'] == 'AND' else any
+    negate = node.get('not') is True
+
+    def evaluate_node(given_variables: Optional[Mapping]) -> bool:
+        result_bool = combine([
+            sub_clause(given_variables) for sub_clause in sub_clauses])
+        if negate:
+            return not result_bool
+        return result_bool
+
+    return evaluate_node
@@ -17,6 +17,7 @@ from typing import Dict, List, Optional, Tuple, Union
 
 from psycopg2 import sql
 
+from ontask import OnTaskDBIdentifier
 from ontask.dataops.formula import operands
 
 
@@ -94,6 +95,54 @@ def evaluate(
     return result_txt
 
 
+def evaluate_row_sql(node) -> Tuple[sql.Composed, List]:
+    """Create a SQL expression with the same result as the EVAL_EXP type.
+
+    The SQL produced with EVAL_SQL treats NULL values differently from the
+    Python evaluation in some operators (for example, not_equal or is_empty
+    are true for NULL values in SQL and false in Python). In this expression
+    every operand (except is_null) also requires the value to be not null,
+    and empty compositions are translated into the Python result of all/any.
+    The expression is used to compute the value of the conditions for all
+    the rows in the database while obtaining the same results as
+    evaluate(node, EVAL_EXP, row).
+
+    :param node: JSON node representing the expression
+    :return: (SQL query, fields)
+    """
+    if 'condition' not in node:
+        query, fields = getattr(operands, node['operator'])(
+            node,
+            operands.EVAL_SQL,
+            None)
+        if node['operator'] == 'is_null':
+            return query, fields
+
+        return (
+            sql.SQL('(({0} is not null) AND ({1}))').format(
+                OnTaskDBIdentifier(node['field']),
+                query),
+            fields)
+
+    sub_clauses = [
+        evaluate_row_sql(sub_formula) for sub_formula in node['rules']]
+    if sub_clauses:
+        result_query = sql.SQL('({0})').format(
+            sql.SQL(' ' + node['condition'] + ' ').join(
+                [sub_c for sub_c, __ in sub_clauses]))
+    elif node['condition'] == 'AND':
+        result_query = sql.SQL('(TRUE)')
+    else:
+        result_query = sql.SQL('(FALSE)')
+    result_fields = list(itertools.chain.from_iterable(
+        [sub_field for __, sub_field in sub_clauses]))
+
+    if node.get('not') is True:
+        result_query = sql.SQL('(NOT {0})').format(result_query)
+
+    return result_query, result_fields
+
+
 def has_variable(node, var_name):
     """Check if a formula contains a variable.
 
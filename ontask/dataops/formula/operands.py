@@ -23,6 +23,17 @@ GET_CONSTANT = {
     'datetime': lambda operand: parse_datetime(operand)}
 
 
+def _escape_like(value: str) -> str:
+    """Escape the characters with special meaning in a LIKE pattern.
+
+    :param value: Constant in the formula
+    :return: Value matched literally by LIKE (backslash is the escape)
+    """
+    for char in ['\\', '%', '_']:
+        value = value.replace(char, '\\' + char)
+    return value
+
+
 def value_is_null(var_value: Any) -> bool:
     """Check if the value is None or NaN."""
     return var_value is None or pd.isna(var_value)
@@ -144,7 +155,7 @@ def begins_with(node, eval_type, given_variables):
             OnTaskDBIdentifier(node['field']),
             sql.Placeholder(),
         )
-        fields = [node['value'] + '%']
+        fields = [_escape_like(node['value']) + '%']
 
         return query, fields
 
@@ -174,7 +185,7 @@ def not_begins_with(node, eval_type, given_variables):
             OnTaskDBIdentifier(node['field']),
             sql.Placeholder(),
         )
-        fields = [node['value'] + '%']
+        fields = [_escape_like(node['value']) + '%']
 
         return query, fields
 
@@ -206,7 +217,7 @@ def contains(node, eval_type, given_variables):
             OnTaskDBIdentifier(node['field']),
             sql.Placeholder(),
         )
-        fields = ['%' + node['value'] + '%']
+        fields = ['%' + _escape_like(node['value']) + '%']
 
         return query, fields
 
@@ -237,7 +248,7 @@ def not_contains(node, eval_type, given_variables):
             OnTaskDBIdentifier(node['field']),
             sql.Placeholder(),
         )
-        fields = ['%' + node['value'] + '%']
+        fields = ['%' + _escape_like(node['value']) + '%']
 
         return query, fields
 
@@ -266,7 +277,7 @@ def ends_with(node, eval_type, given_variables):
             OnTaskDBIdentifier(node['field']),
             sql.Placeholder(),
         )
-        fields = ['%' + node['value']]
+        fields = ['%' + _escape_like(node['value'])]
 
         return query, fields
 
@@ -298,7 +309,7 @@ def not_ends_with(node, eval_type, given_variables):
             OnTaskDBIdentifier(node['field']),
             sql.Placeholder(),
         )
-        fields = ['%' + node['value']]
+        fields = ['%' + _escape_like(node['value'])]
 
         return query, fields
 
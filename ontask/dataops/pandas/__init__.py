@@ -3,14 +3,15 @@
 """Functions to manipulate the dataframe, its columns, merging and the DB."""
 from ontask.dataops.pandas.columns import (
     are_unique_columns, detect_datetime_columns, get_column_statistics,
-    has_unique_column, is_unique_column,
+    get_column_summary, has_unique_column, is_unique_column,
 )
 from ontask.dataops.pandas.database import (
-    create_db_engine, destroy_db_engine, is_table_in_db, load_table, set_engine,
-    store_table, verify_data_frame)
+    create_db_engine, destroy_db_engine, is_table_in_db, load_table,
+    load_table_chunks, set_engine, store_table, verify_data_frame)
 from ontask.dataops.pandas.dataframe import (
     add_column_to_df, get_subframe, get_table_row_by_index, rename_df_column,
-    store_dataframe, store_temporary_dataframe, store_workflow_table)
+    store_dataframe, store_dataframe_chunks, store_dataframe_columns,
+    store_temporary_dataframe, store_workflow_table)
 from ontask.dataops.pandas.datatypes import datatype_names
 from ontask.dataops.pandas.merge import (
     perform_dataframe_upload_merge, validate_merge_parameters)
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 
 """Data types considered in OnTask and its relation with Pandas data types"""
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 from ontask.dataops import pandas
@@ -66,6 +67,91 @@ def get_column_statistics(df_column) -> Dict:
     return to_return
 
 
+def _get_boxplot_summary(values: pd.Series) -> Dict:
+    """Calculate the values to draw a box plot.
+
+    :param values: Numeric values (without NaN)
+    :return: Dictionary with q1, median, q3, mean, lowerfence and upperfence
+    (the lowest and highest values within 1.5 IQR of the quartiles)
+    """
+    q1, median, q3 = values.quantile([.25, .5, .75]).tolist()
+    iqr = q3 - q1
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'mean': float(values.mean()),
+        'lowerfence': float(values[values >= q1 - 1.5 * iqr].min()),
+        'upperfence': float(values[values <= q3 + 1.5 * iqr].max()),
+    }
+
+
+def _get_histogram_summary(values: pd.Series, data_type: str) -> Dict:
+    """Calculate the bars to draw a histogram.
+
+    Numeric and datetime values are grouped in bins of the same width, and
+    the remaining types are grouped by value.
+
+    :param values: Values (without NaN)
+    :param data_type: OnTask data type of the values
+    :return: Dictionary with the lists x (bar positions) and y (counts),
+    and the width of the bars (None if the values are categories). The
+    width of datetime bars is in milliseconds.
+    """
+    if data_type == 'integer' or data_type == 'double':
+        counts, edges = np.histogram(values, bins='auto')
+        return {
+            'x': ((edges[:-1] + edges[1:]) / 2).tolist(),
+            'y': counts.tolist(),
+            'width': float(edges[1] - edges[0])}
+
+    if data_type == 'datetime':
+        counts, edges = np.histogram(values.astype('int64'), bins='auto')
+        return {
+            'x': [
+                str(pd.Timestamp(int(center), tz='UTC').tz_convert(
+                    values.dt.tz))
+                for center in (edges[:-1] + edges[1:]) / 2],
+            'y': counts.tolist(),
+            'width': float(edges[1] - edges[0]) / 1e6}
+
+    counts = values.value_counts().sort_index()
+    return {
+        'x': [str(value) for value in counts.index],
+        'y': counts.tolist(),
+        'width': None}
+
+
+def get_column_summary(df_column: pd.Series) -> Optional[Dict]:
+    """Calculate the aggregates needed to visualize a column.
+
+    The result does not depend on the size of the column, so it can be
+    stored and used to draw the visualizations without the data.
+
+    :param df_column: data frame column
+    :return: A dictionary with the following keys, or None if the column has
+    all its values to NaN
+      {'name': column name,
+       'empty': True if all the values are empty (or zero or False),
+       'boxplot': box plot values (integer, double) or None,
+       'histogram': bars of the histogram}
+    """
+    values = df_column.dropna()
+    if len(values) == 0:
+        return None
+
+    data_type = pandas.datatype_names.get(df_column.dtype.name)
+    boxplot = None
+    if data_type == 'integer' or data_type == 'double':
+        boxplot = _get_boxplot_summary(values)
+
+    return {
+        'name': df_column.name,
+        'empty': all(not col_data for col_data in values),
+        'boxplot': boxplot,
+        'histogram': _get_histogram_summary(values, data_type)}
+
+
 def is_unique_column(df_column: pd.Series) -> bool:
     """Check if a column has unique non-empty values.
 
@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 
 """Functions to manipulate Pandas DataFrames an related operations."""
-from typing import Dict, List, Mapping, Optional
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
 
 from django.conf import settings
 from django.core.cache import cache
 from django.db import connection
 from django.utils.translation import ugettext as _
 import pandas as pd
+from psycopg2 import sql as psycopg2_sql
 import sqlalchemy
 import sqlalchemy.engine
 
@@ -23,6 +24,77 @@ ontask_to_sqlalchemy = {
     'datetime': sqlalchemy.DateTime(timezone=True),
 }
 
+# Characters escaped in the text format of COPY
+_COPY_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '\n': '\\n',
+    '\r': '\\r',
+    '\t': '\\t',
+})
+
+
+class _CopyReader:
+    """File-like object with the rows of a table in the COPY text format.
+
+    The lines are produced as they are read, so the content of the table is
+    never stored as a whole in a string.
+    """
+
+    def __init__(self, rows: Iterable):
+        """Store the iterator over the rows (each row is a tuple)."""
+        self.lines = (
+            '\t'.join([self._to_text(value) for value in row]) + '\n'
+            for row in rows)
+        self.pending = ''
+
+    @staticmethod
+    def _to_text(value) -> str:
+        """Translate a value to the COPY text format (NULL is \\N)."""
+        if value is None:
+            return '\\N'
+        return str(value).translate(_COPY_ESCAPES)
+
+    def read(self, size: int = -1) -> str:
+        """Read (at most) size characters."""
+        chunks = [self.pending]
+        length = len(self.pending)
+        for line in self.lines:
+            chunks.append(line)
+            length += len(line)
+            if 0 <= size <= length:
+                break
+
+        text = ''.join(chunks)
+        if size < 0:
+            self.pending = ''
+            return text
+
+        self.pending = text[size:]
+        return text[:size]
+
+
+def _copy_insert(pd_table, conn, keys: List[str], data_iter: Iterable):
+    """Insert the rows of a data frame with COPY FROM STDIN.
+
+    Function given to DataFrame.to_sql as the insertion method, so the
+    table is created by pandas (with the types in ontask_to_sqlalchemy), but
+    the rows are transferred in a single stream instead of with INSERTs.
+
+    :param pd_table: pandas SQLTable object
+    :param conn: SQLAlchemy connection
+    :param keys: Column names
+    :param data_iter: Iterator over the rows (tuples)
+    :return: Nothing. The rows are inserted in the DB
+    """
+    with conn.connection.cursor() as cursor:
+        cursor.copy_expert(
+            psycopg2_sql.SQL('COPY {0} ({1}) FROM STDIN').format(
+                psycopg2_sql.Identifier(pd_table.name),
+                psycopg2_sql.SQL(', ').join([
+                    psycopg2_sql.Identifier(key) for key in keys]),
+            ),
+            _CopyReader(data_iter))
+
 
 def set_engine() -> None:
     """Create a persistent SQLAlchemy connection to the DB."""
@@ -97,12 +169,18 @@ def load_table(
     table_name: str,
     columns: Optional[List[str]] = None,
     filter_exp: Optional[Dict] = None,
+    order_by: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
 ) -> Optional[pd.DataFrame]:
     """Load a Pandas data frame from the SQL DB.
 
     :param table_name: Table name
     :param columns: Optional list of columns to load (all if NOne is given)
     :param filter_exp: JSON expression to filter a subset of rows
+    :param order_by: Column to order the rows (needed to load pages)
+    :param limit: Maximum number of rows to load (None to load all)
+    :param offset: Number of rows to skip
     :return: data frame
     """
     if table_name not in connection.introspection.table_names():
@@ -111,12 +189,15 @@ def load_table(
     if settings.DEBUG:
         LOGGER.debug('Loading table %s', table_name)
 
-    if columns or filter_exp:
-        # A list of columns or a filter exp is given
+    if columns or filter_exp or order_by or limit is not None or offset:
+        # A subset of the columns or rows is requested
         query, query_fields = sql.get_select_query_txt(
             table_name,
             column_names=columns,
-            filter_formula=filter_exp)
+            filter_formula=filter_exp,
+            order_by=order_by,
+            limit=limit,
+            offset=offset)
         return pd.read_sql_query(
             query,
             OnTaskSharedState.engine,
@@ -126,10 +207,42 @@ def load_table(
     return pd.read_sql_table(table_name, OnTaskSharedState.engine)
 
 
+def load_table_chunks(
+    table_name: str,
+    chunk_size: int,
+    columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Load a table from the SQL DB as a sequence of data frames.
+
+    The rows are fetched with a server side cursor, so only one chunk is in
+    memory at a time.
+
+    :param table_name: Table name
+    :param chunk_size: Number of rows in each data frame
+    :param columns: Optional list of columns to load (all if None is given)
+    :return: Generator of data frames
+    """
+    if settings.DEBUG:
+        LOGGER.debug('Loading table %s in chunks', table_name)
+
+    query, query_fields = sql.get_select_query_txt(
+        table_name,
+        column_names=columns)
+    with OnTaskSharedState.engine.connect().execution_options(
+        stream_results=True,
+    ) as db_connection:
+        yield from pd.read_sql_query(
+            query,
+            db_connection,
+            params=query_fields,
+            chunksize=chunk_size)
+
+
 def store_table(
     data_frame: pd.DataFrame,
     table_name: str,
     dtype: Optional[Mapping] = None,
+    if_exists: str = 'replace',
 ):
     """Store a data frame in the DB.
 
@@ -153,6 +266,7 @@ def store_table(
     :param table_name: The name of the table in the DB
     :param dtype: dictionary with (column_name, data type) to force the storage
     of certain data types
+    :param if_exists: 'replace' the table or 'append' the rows to it
     :return: Nothing. Side effect in the DB
     """
     # Check the length of the column names
@@ -165,17 +279,23 @@ def store_table(
         dtype = {}
 
     with cache.lock(table_name):
-        # We ovewrite the content and do not create an index
+        # We ovewrite (or append to) the content and do not create an index.
+        # The rows are loaded with COPY.
         data_frame.to_sql(
             table_name,
             OnTaskSharedState.engine,
-            if_exists='replace',
+            if_exists=if_exists,
             index=False,
             dtype={
                 key: ontask_to_sqlalchemy[tvalue]
                 for key, tvalue in dtype.items()
             },
+            method=_copy_insert,
         )
+    sql.increase_data_version(table_name)
+    if if_exists != 'append':
+        # The index of an existing table is maintained by the DB
+        sql.update_search_index(table_name)
 
 
 def verify_data_frame(data_frame: pd.DataFrame):
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 """Operations to manipulate dataframes."""
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
 from django.conf import settings
 from django.utils.translation import gettext, ugettext_lazy as _
@@ -55,55 +55,71 @@ def _verify_dataframe_columns(
     # may be values that have been added to the column, so this field needs to
     # be reassessed
     for col in workflow.columns.all():
-        # Condition 1: If the column is marked as a key column, it should
-        # maintain this property
-        if col.is_key and not pandas.is_unique_column(data_frame[col.name]):
-            raise Exception(gettext(
-                'Column {0} looses its "key" property through this merge.'
-                + ' Either remove this property from the column or '
-                + 'remove the rows that cause this problem in the new '
-                + 'dataset').format(col.name))
+        _verify_dataframe_column(col, data_frame)
+
 
+def _verify_dataframe_column(
+    column,
+    data_frame: pd.DataFrame,
+    check_type: bool = True,
+):
+    """Verify that the values of the column in the df are compatible.
+
+    :param column: Column object in the workflow
+    :param data_frame: Data frame with the new values of the column
+    :param check_type: Check the data type (False if values are all null)
+    :return: Nothing. An exception is raised if the values are not compatible
+    """
+    # Condition 1: If the column is marked as a key column, it should
+    # maintain this property
+    if column.is_key and not pandas.is_unique_column(data_frame[column.name]):
+        raise Exception(gettext(
+            'Column {0} looses its "key" property through this merge.'
+            + ' Either remove this property from the column or '
+            + 'remove the rows that cause this problem in the new '
+            + 'dataset').format(column.name))
+
+    if check_type:
         # Get the pandas data type
         df_col_type = pandas.datatype_names.get(
-            data_frame[col.name].dtype.name)
+            data_frame[column.name].dtype.name)
 
         # Condition 2: Review potential data type changes
-        if col.data_type == 'boolean' and df_col_type == 'string':
+        if column.data_type == 'boolean' and df_col_type == 'string':
             # 2.1: A WF boolean with must be DF string with True/False/None
             column_data_types = {
                 type(row_value)
-                for row_value in data_frame[col.name]
+                for row_value in data_frame[column.name]
                 # Remove the NoneType and Float
                 if not isinstance(row_value, float) and row_value is not None
             }
             if len(column_data_types) != 1 or column_data_types.pop() != bool:
                 raise Exception(gettext(
                     'New values in column {0} are not of type {1}',
-                ).format(col.name, col.data_type))
+                ).format(column.name, column.data_type))
         elif (
-            col.data_type == 'integer' and df_col_type != 'integer'
+            column.data_type == 'integer' and df_col_type != 'integer'
             and df_col_type != 'double'
         ):
             # 2.2 WF Numeric column must be DF integer or double
             raise Exception(gettext(
                 'New values in column {0} are not of type number',
-            ).format(col.name))
-        elif col.data_type != 'integer' and df_col_type != col.data_type:
+            ).format(column.name))
+        elif column.data_type != 'integer' and df_col_type != column.data_type:
             # 2.3 Any other type change is incorrect
             raise Exception(gettext(
                 'New values in column {0} are not of type {1}',
-            ).format(col.name, col.data_type))
+            ).format(column.name, column.data_type))
 
-        # Condition 3: If there are categories, the new values should be
-        # compatible with them.
-        if col.categories and not all(
-            row_val in col.categories for row_val in data_frame[col.name]
-            if row_val and not pd.isnull(row_val)
-        ):
-            raise Exception(gettext(
-                'New values in column {0} are not in categories {1}',
-            ).format(col.name, ', '.join(col.categories)))
+    # Condition 3: If there are categories, the new values should be
+    # compatible with them.
+    if column.categories and not all(
+        row_val in column.categories for row_val in data_frame[column.name]
+        if row_val and not pd.isnull(row_val)
+    ):
+        raise Exception(gettext(
+            'New values in column {0} are not in categories {1}',
+        ).format(column.name, ', '.join(column.categories)))
 
 
 def store_temporary_dataframe(
@@ -163,6 +179,209 @@ def store_dataframe(
             'keep_key_column': is_key})
 
 
+def store_dataframe_columns(
+    data_frame: pd.DataFrame,
+    workflow,
+    key_name: str,
+):
+    """Store the columns of a data frame in the workflow table.
+
+    Only the columns in the data frame are written (the rest of the table is
+    not loaded or stored again). The data frame contains the key column to
+    match the rows and the columns to store. Columns that are not in the
+    workflow are created.
+
+    :param data_frame: Data frame with the key and the columns to store
+    :param workflow: Workflow with the table
+    :param key_name: Key column used to match the rows
+    :return: Nothing. The columns are stored in the DB and the workflow
+    """
+    store_dataframe_chunks([data_frame], workflow, key_name)
+
+
+def _get_chunk_column_type(series: pd.Series) -> Optional[str]:
+    """Obtain the type with which a column of a chunk would be stored.
+
+    The type is inferred from the values as done by pandas when creating the
+    table.
+
+    :param series: Column of the chunk
+    :return: OnTask type or None if the column has only null values
+    """
+    if series.isna().all():
+        return None
+
+    return {
+        'boolean': 'boolean',
+        'datetime': 'datetime',
+        'datetime64': 'datetime',
+        'floating': 'double',
+        'integer': 'integer',
+    }.get(pd.api.types.infer_dtype(series, skipna=True), 'string')
+
+
+def _merge_chunk_column_type(
+    col_type: str,
+    chunk_type: Optional[str],
+    has_values: bool,
+) -> str:
+    """Calculate the column type to store the values of a new chunk.
+
+    :param col_type: Current type of the column in the table
+    :param chunk_type: Type of the column in the chunk (None if all null)
+    :param has_values: The column in the table has non-null values
+    :return: Type needed for the values of the table and the chunk
+    """
+    if chunk_type is None or chunk_type == col_type:
+        return col_type
+
+    if not has_values:
+        # The type of a column with only nulls is not determined yet
+        return chunk_type
+
+    if col_type == 'string' or (col_type, chunk_type) == (
+        'double',
+        'integer',
+    ):
+        return col_type
+
+    if (col_type, chunk_type) == ('integer', 'double'):
+        return 'double'
+
+    # Values of different types are stored as text
+    return 'string'
+
+
+def store_dataframe_chunks(
+    chunks: Iterable[pd.DataFrame],
+    workflow,
+    key_name: str,
+):
+    """Store the columns of a sequence of data frames in the workflow table.
+
+    The chunks (data frames with the same columns and disjoint rows) are
+    appended to the upload table as they are produced, so only one of them
+    is in memory at a time. The column types are inferred from the first
+    chunk and changed when a later chunk has values that do not fit in them
+    (columns with only null values take the type of the first values, and
+    columns with values of different types are stored as strings). The
+    values of existing columns are verified in every chunk, except the type
+    of those with only nulls in the chunk. The columns are then copied to
+    the workflow table as in store_dataframe_columns.
+
+    :param chunks: Iterable of data frames with the key and the columns
+    :param workflow: Workflow with the table
+    :param key_name: Key column used to match the rows
+    :return: Nothing. The columns are stored in the DB and the workflow
+    """
+    table_name = workflow.get_upload_table_name()
+    df_columns = None
+    col_types = []
+    has_values = []
+    current_columns = {}
+    try:
+        for data_frame in chunks:
+            if df_columns is None:
+                df_columns = list(data_frame.columns)
+                current_columns = {
+                    col.name: col
+                    for col in workflow.columns.filter(name__in=df_columns)}
+            else:
+                data_frame = data_frame[df_columns]
+
+            chunk_types = [
+                _get_chunk_column_type(data_frame[cname])
+                for cname in df_columns]
+            for idx, cname in enumerate(df_columns):
+                if cname in current_columns:
+                    # Nulls are compatible with any type
+                    _verify_dataframe_column(
+                        current_columns[cname],
+                        data_frame,
+                        check_type=chunk_types[idx] is not None)
+
+            if not col_types:
+                # First chunk, the column types are inferred
+                pandas.store_table(data_frame, table_name)
+                col_types = sql.get_df_column_types(table_name)
+                has_values = [ctype is not None for ctype in chunk_types]
+                continue
+
+            # Change the type of the columns that cannot store the new values
+            for idx, (cname, chunk_type) in enumerate(
+                zip(df_columns, chunk_types),
+            ):
+                new_type = _merge_chunk_column_type(
+                    col_types[idx],
+                    chunk_type,
+                    has_values[idx])
+                if new_type != col_types[idx]:
+                    if has_values[idx]:
+                        sql.db_change_column_type(table_name, cname, new_type)
+                    else:
+                        # Only nulls, the column is created with the new type
+                        sql.df_drop_column(table_name, cname)
+                        sql.add_column_to_db(table_name, cname, new_type)
+                    col_types[idx] = new_type
+                has_values[idx] = has_values[idx] or chunk_type is not None
+
+            pandas.store_table(data_frame, table_name, if_exists='append')
+
+        if df_columns is None:
+            return
+
+        # Existing columns with only nulls keep their type
+        for idx, cname in enumerate(df_columns):
+            column = current_columns.get(cname)
+            if column and not has_values[idx] and (
+                col_types[idx] != column.data_type
+            ):
+                sql.df_drop_column(table_name, cname)
+                sql.add_column_to_db(table_name, cname, column.data_type)
+                col_types[idx] = column.data_type
+
+        is_key = [
+            sql.is_column_unique(table_name, cname) for cname in df_columns]
+        for cname, unique in zip(df_columns, is_key):
+            column = current_columns.get(cname)
+            if column and column.is_key and not unique:
+                raise Exception(gettext(
+                    'Column {0} looses its "key" property through this merge.'
+                    + ' Either remove this property from the column or '
+                    + 'remove the rows that cause this problem in the new '
+                    + 'dataset').format(cname))
+
+        sql.update_columns_from_table(
+            workflow.get_data_frame_table_name(),
+            table_name,
+            key_name,
+            [
+                (cname, ctype) for cname, ctype in zip(df_columns, col_types)
+                if cname != key_name])
+    finally:
+        sql.delete_table(table_name)
+
+    # Update the columns in the workflow
+    new_columns = []
+    for cname, ctype, unique in zip(df_columns, col_types, is_key):
+        if cname == key_name:
+            continue
+
+        column = current_columns.get(cname)
+        if not column:
+            new_columns.append((cname, ctype, unique))
+            continue
+
+        column.data_type = ctype
+        column.is_key = column.is_key and unique
+        column.save()
+
+    workflow.add_columns(new_columns)
+    workflow.refresh_from_db()
+    workflow.set_query_builder_ops()
+    workflow.save()
+
+
 def store_workflow_table(
     workflow,
     update_info: Optional[Dict] = None,
@@ -254,6 +473,8 @@ def store_workflow_table(
     if workflow.has_table():
         sql.delete_table(workflow.get_data_frame_table_name())
     sql.rename_table(db_table, workflow.get_data_frame_table_name())
+    # The upload table has no search index
+    sql.update_search_index(workflow.get_data_frame_table_name())
 
     # Step 5: Update workflow fields and save
     workflow.nrows = sql.get_num_rows(workflow.get_data_frame_table_name())
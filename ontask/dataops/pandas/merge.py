@@ -333,7 +333,3 @@ def perform_dataframe_upload_merge(
     pandas.store_dataframe(new_df, workflow)
 
     _update_is_key_field(merge_info, workflow)
-
-    # Recompute all the values of the conditions in each of the actions
-    for action in workflow.actions.all():
-        action.update_n_rows_selected()
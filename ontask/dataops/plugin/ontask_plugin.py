@@ -18,6 +18,7 @@ class OnTaskPluginAbstract(object, metaclass=ABCMeta):
         self.output_column_names = []
         self.output_suffix = ''
         self.parameters = []
+        self.chunk_size = 0
 
     def get_name(self):
         """Access the name."""
@@ -51,6 +52,14 @@ class OnTaskPluginAbstract(object, metaclass=ABCMeta):
         """Access the parameters."""
         return self.parameters
 
+    def get_chunk_size(self):
+        """Access the number of rows per chunk (0 to use the default)."""
+        return getattr(self, 'chunk_size', 0)
+
+    def get_is_chunked(self):
+        """Check if the plugin processes the rows in chunks."""
+        return type(self).run_chunks is not OnTaskPluginAbstract.run_chunks
+
     def run(self, data_frame, parameters=dict):
         """Overwrite this method.
 
@@ -65,6 +74,22 @@ class OnTaskPluginAbstract(object, metaclass=ABCMeta):
         """
         raise Exception(_('This method should be implemented!'))
 
+    def run_chunks(self, chunks, parameters=dict):
+        """Overwrite this method (instead of run) to process row chunks.
+
+        Receives an iterator over data frames with consecutive rows of the
+        input data (chunk_size rows each, or DATAOPS_PLUGIN_CHUNK_SIZE if
+        zero; the last one may be shorter) and yields, for each of them, a
+        data frame with the same number of rows and the output columns. The
+        results are stored as they are yielded, so the whole table is never
+        in memory.
+
+        :param chunks: Iterator over the input data frames
+        :param parameters: dictionary with the parameters
+        :return: Generator of Pandas data frames (one per input chunk)
+        """
+        raise Exception(_('This method should be implemented!'))
+
 
 class OnTaskTransformation(OnTaskPluginAbstract):
     """Abstract class to instantiate to create an OnTask transformation."""
@@ -4,6 +4,8 @@
 from ontask.dataops.services.athena import (
     create_athena_connection_admintable,
     create_athena_connection_runtable)
+from ontask.dataops.services.condition_counts import (
+    RowConditionCounts, schedule_condition_counts)
 from ontask.dataops.services.connections import (
     ConnectionTableAdmin, ConnectionTableSelect, clone, delete, toggle)
 from ontask.dataops.services.connections_sql import (
@@ -21,6 +23,7 @@ from ontask.dataops.services.plugin_execute import ExecuteRunPlugin
 from ontask.dataops.services.plugin_run import (
     create_model_table, plugin_queue_execution)
 from ontask.dataops.services.row import create_row, update_row_values
+from ontask.dataops.services.search import get_search_count
 from ontask.dataops.services.sql_upload import (
     ExecuteSQLUpload, sql_upload_step_one)
 from ontask.dataops.services.upload_steps import (
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+"""Maintain the number of rows selected by the conditions incrementally.
+
+When a single row of the table is inserted, updated or deleted, the
+conditions are evaluated only for that row (before and after the change) and
+the field n_rows_selected of those that change is increased or decreased by
+one instead of counting again the rows in the whole table. If the row cannot
+be identified (or some count is unknown), the full count is executed in the
+background.
+
+Operations changing a large part of the table (merges, plugin executions,
+etc.) mark the counts as unknown (-1) and request a full count that is
+executed by a celery task. The requests received for the same workflow while
+the task is pending are served by that task.
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+
+from ontask import models, tasks
+from ontask.core import (
+    ONTASK_CONDITION_COUNT_PENDING, ONTASK_CONDITION_COUNT_REQUESTED,
+)
+from ontask.dataops import sql
+
+
+def schedule_condition_counts(workflow: models.Workflow):
+    """Mark the condition counts as unknown and request a full count.
+
+    :param workflow: Workflow with the conditions to count
+    :return: Nothing. The count is executed asynchronously.
+    """
+    models.Condition.objects.filter(action__workflow=workflow).update(
+        n_rows_selected=-1)
+    workflow.actions.update(rows_all_false=None)
+
+    now = time.time()
+    cache.set(
+        ONTASK_CONDITION_COUNT_REQUESTED.format(workflow.id),
+        now,
+        settings.CACHE_TTL)
+    if cache.add(
+        ONTASK_CONDITION_COUNT_PENDING.format(workflow.id),
+        now,
+        settings.CACHE_TTL,
+    ):
+        # There is no count pending for this workflow
+        tasks.update_condition_counts.apply_async(
+            (workflow.id,),
+            countdown=settings.CONDITION_COUNT_DELAY)
+
+
+class RowConditionCounts:
+    """Adjust the condition counts for a change in a single row.
+
+    The object is created before the row is modified (with the pair
+    identifying the row, if it exists), and method update is invoked after
+    the modification (with the pair identifying the row, if it still exists).
+    """
+
+    def __init__(
+        self,
+        workflow: models.Workflow,
+        key: Optional[str] = None,
+        value: Any = None,
+        column_names: Optional[List[str]] = None,
+    ):
+        """Evaluate the conditions in the row before the change.
+
+        :param workflow: Workflow being modified
+        :param key: Key column to select the row (None if row is new)
+        :param value: Value in the key column to select the row
+        :param column_names: Columns that may change (None to consider all)
+        """
+        self.workflow = workflow
+        self.full_count = False
+        self.actions = [
+            (action, list(action.conditions.all()))
+            for action in workflow.actions.prefetch_related(
+                'conditions__columns')]
+        if column_names is not None:
+            # Only actions with some condition using the columns
+            self.actions = [
+                (action, conditions) for action, conditions in self.actions
+                if any(
+                    col.name in column_names
+                    for cond in conditions for col in cond.columns.all())]
+
+        self.before = None
+        if key is not None:
+            self.before = self._evaluate(key, value)
+
+    def _evaluate(self, key: str, value: Any) -> Optional[Dict]:
+        """Evaluate the conditions in the row with the given key/value.
+
+        :return: Dictionary condition id: value or None if not found
+        """
+        conditions = [
+            cond for __, conditions in self.actions for cond in conditions]
+        if not conditions:
+            return {}
+
+        values = sql.get_row_formula_values(
+            self.workflow.get_data_frame_table_name(),
+            [cond.formula for cond in conditions],
+            {key: value})
+        if values is None:
+            # Row not found or key not unique
+            self.full_count = True
+            return None
+
+        return {cond.id: val for cond, val in zip(conditions, values)}
+
+    def update(self, key: Optional[str] = None, value: Any = None):
+        """Evaluate the row after the change and update the counts.
+
+        :param key: Key column to select the row (None if row was deleted)
+        :param value: Value in the key column to select the row
+        :return: Nothing. The counts are updated in the DB.
+        """
+        after = None
+        if key is not None:
+            after = self._evaluate(key, value)
+
+        if not self.full_count:
+            for action, conditions in self.actions:
+                self._update_action(action, conditions, self.before, after)
+
+        if self.full_count:
+            schedule_condition_counts(self.workflow)
+
+    def _update_action(
+        self,
+        action: models.Action,
+        conditions: List[models.Condition],
+        before: Optional[Dict],
+        after: Optional[Dict],
+    ):
+        """Apply the changes in the row to the counts of the action.
+
+        :param action: Action to update
+        :param conditions: Conditions in the action
+        :param before: Values of the conditions before the change (or None)
+        :param after: Values of the conditions after the change (or None)
+        :return: Nothing. The counts are updated in the DB.
+        """
+        filter_obj = next(
+            (cond for cond in conditions if cond.is_filter),
+            None)
+        cond_list = [cond for cond in conditions if not cond.is_filter]
+
+        rows_all_false = False
+        for values in [before, after]:
+            if values is not None and self._all_false(
+                filter_obj,
+                cond_list,
+                values,
+            ):
+                # The positions of the rows with all conditions false change
+                rows_all_false = True
+
+        for cond in conditions:
+            delta = (
+                self._is_selected(filter_obj, cond, after)
+                - self._is_selected(filter_obj, cond, before))
+            if not delta:
+                continue
+
+            if cond.n_rows_selected < 0:
+                # The count is not known, calculate it from scratch
+                self.full_count = True
+                continue
+
+            models.Condition.objects.filter(pk=cond.pk).update(
+                n_rows_selected=F('n_rows_selected') + delta)
+            rows_all_false = True
+
+        if rows_all_false and action.rows_all_false is not None:
+            action.rows_all_false = None
+            action.save(update_fields=['rows_all_false'])
+
+    @staticmethod
+    def _is_selected(
+        filter_obj: Optional[models.Condition],
+        cond: models.Condition,
+        values: Optional[Dict],
+    ) -> int:
+        """Check if the row is counted by the condition (1 or 0)."""
+        if values is None:
+            return 0
+
+        if (
+            filter_obj
+            and not cond.is_filter
+            and values[filter_obj.id] is not True
+        ):
+            return 0
+
+        return int(values[cond.id] is True)
+
+    @staticmethod
+    def _all_false(
+        filter_obj: Optional[models.Condition],
+        cond_list: List[models.Condition],
+        values: Dict,
+    ) -> bool:
+        """Check if the row has all the conditions false."""
+        if not cond_list:
+            return False
+
+        if filter_obj and values[filter_obj.id] is not True:
+            return False
+
+        return all(values[cond.id] is False for cond in cond_list)
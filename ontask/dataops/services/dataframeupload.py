@@ -12,6 +12,7 @@ import smart_open
 
 from ontask import models
 from ontask.dataops import pandas, sql
+from ontask.dataops.services.condition_counts import schedule_condition_counts
 
 
 def process_object_column(data_frame: pd.DataFrame) -> pd.DataFrame:
@@ -332,6 +333,8 @@ def batch_load_df_from_athenaconnection(
         raise Exception(_('Unable to perform merge operation: {0}').format(
             str(exc)))
 
+    schedule_condition_counts(workflow)
+
     col_names, col_types, is_key = workflow.get_column_info()
     log_item.payload['col_names'] = col_names
     log_item.payload['col_types'] = col_types
@@ -9,6 +9,7 @@ from django.utils.translation import ugettext
 
 from ontask import models
 from ontask.dataops import sql
+from ontask.dataops.services.condition_counts import RowConditionCounts
 
 
 class ExecuteIncreaseTrackCount:
@@ -93,6 +94,12 @@ class ExecuteIncreaseTrackCount:
         # If the track comes with column_dst, the event needs to be reflected
         # back in the data frame
         if column_dst:
+            # Only the conditions using the tracking column may change
+            condition_counts = RowConditionCounts(
+                action.workflow,
+                column_to,
+                msg_to,
+                [column_dst])
             try:
                 # Increase the relevant cell by one
                 sql.increase_row_integer(
@@ -103,12 +110,7 @@ class ExecuteIncreaseTrackCount:
             except Exception as exc:
                 log_payload['EXCEPTION_MSG'] = str(exc)
             else:
-                # Get the tracking column and update all the conditions in the
-                # actions that have this column as part of their formulas
-                # FIX: Too aggressive?
-                track_col = action.workflow.columns.get(name=column_dst)
-                for action in action.workflow.actions.all():
-                    action.update_n_rows_selected(track_col)
+                condition_counts.update(column_to, msg_to)
 
         # Record the event
         action.log(user, self.log_event, **log_payload)
@@ -144,7 +144,8 @@ _checks = [
         + 'parameter.'),
     _(
         'Class has a method with name run receiving a data frame '
-        + 'and a dictionary with parameters.'),
+        + 'and a dictionary with parameters (or run_chunks receiving '
+        + 'an iterator of data frames and the dictionary).'),
 ]
 
 
@@ -193,7 +194,8 @@ def _verify_plugin(pinobj: models.Plugin) -> List[Tuple[str, str]]:
        help text: string
 
     8. Class has a method with name run that receives a data frame and a
-       dictionary.
+       dictionary (or run_chunks receiving an iterator of data frames and
+       a dictionary).
 
     :param pinobj: Plugin instance
     :return: List of Booleans with the result of the tests
@@ -319,6 +321,9 @@ def _verify_plugin(pinobj: models.Plugin) -> List[Tuple[str, str]]:
         if callable(run_method) and (
             inspect.signature(ontask_plugin.OnTaskPluginAbstract.run)
             == inspect.signature(pinobj.__class__.run)
+        ) and (
+            inspect.signature(ontask_plugin.OnTaskPluginAbstract.run_chunks)
+            == inspect.signature(pinobj.__class__.run_chunks)
         ):
             diag[check_idx] = _('Ok')
         else:
@@ -1,17 +1,294 @@
 # -*- coding: utf-8 -*-
 
 """Service functions to execute a plugin."""
+import collections
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Deque, Dict, Iterator, List, Optional
 
 from django.conf import settings
 from django.utils.translation import ugettext
 import pandas as pd
 import pytz
 
-from ontask import OnTaskServiceException, models
-from ontask.dataops import pandas
+from ontask import OnTaskServiceException, models, settings as ontask_settings
+from ontask.dataops import pandas, sql
 from ontask.dataops.services import load_plugin
+from ontask.dataops.services.condition_counts import schedule_condition_counts
+
+
+def _get_plugin_input(
+    plugin_instance,
+    data_frame: pd.DataFrame,
+    input_column_names: List[str],
+) -> pd.DataFrame:
+    """Create the data frame with the input columns given to the plugin.
+
+    :param plugin_instance: Plugin being executed
+    :param data_frame: Data frame with (at least) the input columns
+    :param input_column_names: List of input column names
+    :return: Data frame with the columns renamed as expected by the plugin
+    """
+    try:
+        sub_df = pd.DataFrame(data_frame[input_column_names])
+        if plugin_instance.get_input_column_names():
+            sub_df.columns = plugin_instance.get_input_column_names()
+    except Exception as exc:
+        raise Exception(ugettext(
+            'Error when creating data frame for plugin: {0}',
+        ).format(str(exc)))
+
+    return sub_df
+
+
+def _verify_plugin_result(
+    plugin_instance,
+    new_df: pd.DataFrame,
+    num_rows: int,
+    merge_key: str,
+):
+    """Verify that the data frame returned by the plugin can be stored.
+
+    :param plugin_instance: Plugin being executed
+    :param new_df: Data frame returned by the plugin
+    :param num_rows: Number of rows given to the plugin
+    :param merge_key: Key column to use in the merge
+    :return: Nothing. An exception is raised if the result is incorrect
+    """
+    # If plugin does not return a data frame, flag as error
+    if not isinstance(new_df, pd.DataFrame):
+        raise Exception(
+            ugettext(
+                'Plugin executed but did not return a pandas data frame.'),
+        )
+
+    # Result has to have the exact same number of rows
+    if new_df.shape[0] != num_rows:
+        raise Exception(
+            ugettext(
+                'Incorrect number of rows ({0}) in result data frame.',
+            ).format(new_df.shape[0]),
+        )
+
+    # Merge key name cannot be part of the output df
+    if merge_key in new_df.columns:
+        raise Exception(
+            ugettext(
+                'Column name {0} cannot be in the result data frame.'.format(
+                    merge_key)),
+        )
+
+    # Result column names are consistent
+    if set(new_df.columns) != set(plugin_instance.get_output_column_names()):
+        raise Exception(ugettext('Incorrect columns in result data frame.'))
+
+
+def _execute_plugin_frame(
+    workflow,
+    plugin_instance,
+    input_column_names: List[str],
+    merge_key: str,
+    plugin_params: Dict,
+):
+    """Execute the run method in the plugin with the whole data frame.
+
+    :param workflow: Workflow object being processed
+    :param plugin_instance: Plugin being executed
+    :param input_column_names: List of input column names
+    :param merge_key: Key column to use in the merge
+    :param plugin_params: Dictionary with the parameters to execute the plug in
+    :return: Nothing, the result is stored in the workflow table
+    """
+    # Get the input columns and the key from the workflow
+    try:
+        df = pandas.load_table(
+            workflow.get_data_frame_table_name(),
+            columns=list(dict.fromkeys(input_column_names + [merge_key])))
+    except Exception as exc:
+        raise Exception(
+            ugettext(
+                'Exception when retrieving the data frame from workflow: {0}',
+            ).format(str(exc)),
+        )
+
+    # Create a new dataframe with the given input columns, and rename them if
+    # needed
+    sub_df = _get_plugin_input(plugin_instance, df, input_column_names)
+
+    # Try the execution and catch any exception
+    try:
+        new_df = plugin_instance.run(sub_df, parameters=plugin_params)
+    except Exception as exc:
+        raise Exception(
+            ugettext('Error while executing plugin: {0}').format(str(exc)),
+        )
+
+    # Execution is DONE. Now we have to perform various additional checks
+    _verify_plugin_result(plugin_instance, new_df, df.shape[0], merge_key)
+
+    # Add the merge column to the result df
+    new_df[merge_key] = df[merge_key]
+
+    # Store the result columns (the rest of the table is not modified)
+    try:
+        pandas.store_dataframe_columns(new_df, workflow, merge_key)
+    except Exception as exc:
+        raise Exception(
+            ugettext('Error while merging result: {0}.').format(str(exc)),
+        )
+
+
+def _get_input_chunks(
+    workflow,
+    plugin_instance,
+    input_column_names: List[str],
+    merge_key: str,
+    pending_keys: Deque[pd.Series],
+) -> Iterator[pd.DataFrame]:
+    """Read the input of the plugin in chunks.
+
+    :param workflow: Workflow object being processed
+    :param plugin_instance: Plugin being executed
+    :param input_column_names: List of input column names
+    :param merge_key: Key column to use in the merge
+    :param pending_keys: Queue where the key values of each chunk are added
+    :return: Generator of the data frames given to the plugin
+    """
+    chunk_size = plugin_instance.get_chunk_size() or int(
+        ontask_settings.PLUGIN_CHUNK_SIZE)
+    for data_frame in pandas.load_table_chunks(
+        workflow.get_data_frame_table_name(),
+        chunk_size,
+        columns=list(dict.fromkeys(input_column_names + [merge_key])),
+    ):
+        pending_keys.append(data_frame[merge_key])
+        yield _get_plugin_input(
+            plugin_instance,
+            data_frame,
+            input_column_names)
+
+
+def _get_result_chunks(
+    plugin_instance,
+    input_chunks: Iterator[pd.DataFrame],
+    pending_keys: Deque[pd.Series],
+    merge_key: str,
+    plugin_params: Dict,
+    num_rows: int,
+    log_item: Optional[models.Log],
+) -> Iterator[pd.DataFrame]:
+    """Run the plugin over the input chunks and verify its results.
+
+    :param plugin_instance: Plugin being executed
+    :param input_chunks: Generator of the data frames given to the plugin
+    :param pending_keys: Queue with the key values of the chunks given to
+    the plugin that have not been returned yet
+    :param merge_key: Key column to use in the merge
+    :param plugin_params: Dictionary with the parameters to execute the plug in
+    :param num_rows: Number of rows in the table (to report the progress)
+    :param log_item: Log object to report the progress (if given)
+    :return: Generator of the results with the merge key column
+    """
+    processed_rows = 0
+    try:
+        results = iter(plugin_instance.run_chunks(
+            input_chunks,
+            parameters=plugin_params))
+    except Exception as exc:
+        raise Exception(
+            ugettext('Error while executing plugin: {0}').format(str(exc)),
+        )
+
+    while True:
+        try:
+            new_df = next(results)
+        except StopIteration:
+            break
+        except Exception as exc:
+            raise Exception(
+                ugettext('Error while executing plugin: {0}').format(
+                    str(exc)),
+            )
+
+        # Each result corresponds to the oldest chunk without result
+        if not pending_keys:
+            raise Exception(
+                ugettext('Plugin returned a result before reading a chunk.'),
+            )
+        key_values = pending_keys.popleft()
+        _verify_plugin_result(
+            plugin_instance,
+            new_df,
+            key_values.shape[0],
+            merge_key)
+        new_df[merge_key] = key_values.values
+
+        processed_rows += new_df.shape[0]
+        if log_item:
+            log_item.payload['status'] = ugettext(
+                'Executing ({0} of {1} rows processed)',
+            ).format(processed_rows, num_rows)
+            log_item.save()
+
+        yield new_df
+
+    # Every chunk must have its result
+    if pending_keys or next(input_chunks, None) is not None:
+        raise Exception(
+            ugettext(
+                'Incorrect number of rows ({0}) in result data frame.',
+            ).format(processed_rows),
+        )
+
+
+def _execute_plugin_chunks(
+    workflow,
+    plugin_instance,
+    input_column_names: List[str],
+    merge_key: str,
+    plugin_params: Dict,
+    log_item: Optional[models.Log],
+):
+    """Execute the run_chunks method in the plugin.
+
+    The input columns are read in chunks through a server side cursor and the
+    results are stored as they are produced, so the memory used does not
+    depend on the number of rows in the table.
+
+    :param workflow: Workflow object being processed
+    :param plugin_instance: Plugin being executed
+    :param input_column_names: List of input column names
+    :param merge_key: Key column to use in the merge
+    :param plugin_params: Dictionary with the parameters to execute the plug in
+    :param log_item: Log object to report the progress (if given)
+    :return: Nothing, the result is stored in the workflow table
+    """
+    pending_keys = collections.deque()
+    input_chunks = _get_input_chunks(
+        workflow,
+        plugin_instance,
+        input_column_names,
+        merge_key,
+        pending_keys)
+    try:
+        result_chunks = _get_result_chunks(
+            plugin_instance,
+            input_chunks,
+            pending_keys,
+            merge_key,
+            plugin_params,
+            sql.get_num_rows(workflow.get_data_frame_table_name()),
+            log_item)
+
+        # Store the result columns (the rest of the table is not modified)
+        try:
+            pandas.store_dataframe_chunks(result_chunks, workflow, merge_key)
+        except Exception as exc:
+            raise Exception(
+                ugettext('Error while merging result: {0}.').format(str(exc)),
+            )
+    finally:
+        # Release the cursor if the plugin did not read all the chunks
+        input_chunks.close()
 
 
 def _execute_plugin(
@@ -22,12 +299,13 @@ def _execute_plugin(
     output_suffix,
     merge_key,
     plugin_params,
+    log_item=None,
 ):
     """
     Execute the run method in the plugin.
 
     Execute the run method in a plugin with the dataframe from the given
-    workflow
+    workflow (or run_chunks if the plugin processes the rows in chunks)
 
     :param workflow: Workflow object being processed
     :param plugin_info: PluginReistry object being processed
@@ -36,6 +314,7 @@ def _execute_plugin(
     :param output_suffix: Suffix that is added to the output column names
     :param merge_key: Key column to use in the merge
     :param plugin_params: Dictionary with the parameters to execute the plug in
+    :param log_item: Log object to report the progress of chunked plugins
     :return: Nothing, the result is stored in the log with log_id
     """
     try:
@@ -72,96 +351,29 @@ def _execute_plugin(
             ).format(plugin_info.name),
         )
 
-    # Get the data frame from the workflow
-    try:
-        df = pandas.load_table(workflow.get_data_frame_table_name())
-    except Exception as exc:
-        raise Exception(
-            ugettext(
-                'Exception when retrieving the data frame from workflow: {0}',
-            ).format(str(exc)),
-        )
-
     # Set the updated names of the input, output columns, and the suffix
     if not plugin_instance.get_input_column_names():
         plugin_instance.input_column_names = input_column_names
     plugin_instance.output_column_names = output_column_names
     plugin_instance.output_suffix = output_suffix
 
-    # Create a new dataframe with the given input columns, and rename them if
-    # needed
-    try:
-        sub_df = pd.DataFrame(df[input_column_names])
-        if plugin_instance.get_input_column_names():
-            sub_df.columns = plugin_instance.get_input_column_names()
-    except Exception as exc:
-        raise Exception(ugettext(
-            'Error when creating data frame for plugin: {0}',
-        ).format(str(exc)))
-
-    # Try the execution and catch any exception
-    try:
-        new_df = plugin_instance.run(sub_df, parameters=plugin_params)
-    except Exception as exc:
-        raise Exception(
-            ugettext('Error while executing plugin: {0}').format(str(exc)),
-        )
-
-    # If plugin does not return a data frame, flag as error
-    if not isinstance(new_df, pd.DataFrame):
-        raise Exception(
-            ugettext(
-                'Plugin executed but did not return a pandas data frame.'),
-        )
-
-    # Execution is DONE. Now we have to perform various additional checks
-
-    # Result has to have the exact same number of rows
-    if new_df.shape[0] != df.shape[0]:
-        raise Exception(
-            ugettext(
-                'Incorrect number of rows ({0}) in result data frame.',
-            ).format(new_df.shape[0]),
-        )
-
-    # Merge key name cannot be part of the output df
-    if merge_key in new_df.columns:
-        raise Exception(
-            ugettext(
-                'Column name {0} cannot be in the result data frame.'.format(
-                    merge_key)),
-        )
-
-    # Result column names are consistent
-    if set(new_df.columns) != set(plugin_instance.get_output_column_names()):
-        raise Exception(ugettext('Incorrect columns in result data frame.'))
-
-    # Add the merge column to the result df
-    new_df[merge_key] = df[merge_key]
-
-    # Proceed with the merge
-    try:
-        new_frame = pandas.perform_dataframe_upload_merge(
+    if plugin_instance.get_is_chunked():
+        _execute_plugin_chunks(
             workflow,
-            df,
-            new_df,
-            {
-                'how_merge': 'inner',
-                'dst_selected_key': merge_key,
-                'src_selected_key': merge_key,
-                'initial_column_names': list(new_df.columns),
-                'rename_column_names': list(new_df.columns),
-                'columns_to_upload': [True] * len(list(new_df.columns)),
-            },
-        )
-    except Exception as exc:
-        raise Exception(
-            ugettext('Error while merging result: {0}.').format(str(exc)),
-        )
+            plugin_instance,
+            input_column_names,
+            merge_key,
+            plugin_params,
+            log_item)
+    else:
+        _execute_plugin_frame(
+            workflow,
+            plugin_instance,
+            input_column_names,
+            merge_key,
+            plugin_params)
 
-    if isinstance(new_frame, str):
-        raise Exception(
-            ugettext('Error while merging result: {0}.').format(new_frame))
+    schedule_condition_counts(workflow)
 
     # Update execution time in the plugin
     plugin_info.executed = datetime.now(
@@ -235,7 +447,8 @@ class ExecuteRunPlugin:
                 output_column_names,
                 output_suffix,
                 merge_key,
-                parameters)
+                parameters,
+                log_item=log_item)
 
             # Reflect status in the log event
             log_item.payload['status'] = 'Execution finished successfully'
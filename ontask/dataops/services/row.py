@@ -8,6 +8,7 @@ from django.db import transaction
 from ontask import models
 from ontask.core import checks
 from ontask.dataops import sql
+from ontask.dataops.services.condition_counts import RowConditionCounts
 
 
 def create_row(workflow: models.Workflow, row_values: List[Any]):
@@ -20,6 +21,7 @@ def create_row(workflow: models.Workflow, row_values: List[Any]):
     # Create the query to update the row
     columns = workflow.columns.all()
     column_names = [col.name for col in columns]
+    condition_counts = RowConditionCounts(workflow)
 
     with transaction.atomic():
         # Insert the new row in the db
@@ -35,10 +37,9 @@ def create_row(workflow: models.Workflow, row_values: List[Any]):
     workflow.nrows += 1
     workflow.save()
 
-    # Recompute all the values of the conditions in each of the actions
-    # TODO: Explore how to do this asynchronously (or lazy)
-    for act in workflow.actions.all():
-        act.update_n_rows_selected()
+    # Add the new row to the counts of the conditions
+    key_idx = next(idx for idx, col in enumerate(columns) if col.is_key)
+    condition_counts.update(column_names[key_idx], row_values[key_idx])
 
 
 def update_row_values(
@@ -57,6 +58,7 @@ def update_row_values(
     """
     # Create the query to update the row
     column_names = [col.name for col in workflow.columns.all()]
+    condition_counts = RowConditionCounts(workflow, update_key, update_val)
     with transaction.atomic():
         # Update the row in the db
         sql.update_row(
@@ -68,7 +70,7 @@ def update_row_values(
         # columns.
         checks.check_key_columns(workflow)
 
-    # Recompute all the values of the conditions in each of the actions
-    # TODO: Explore how to do this asynchronously (or lazy)
-    for act in workflow.actions.all():
-        act.update_n_rows_selected()
+    # Update the counts of the conditions with the changes in the row
+    if update_key in column_names:
+        update_val = row_values[column_names.index(update_key)]
+    condition_counts.update(update_key, update_val)
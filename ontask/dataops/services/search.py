@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+"""Count the rows selected by the searches in a table."""
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from ontask import core, models
+from ontask.dataops import sql
+
+# Name of the row counts in the data cache
+SEARCH_COUNT_NAME = 'search_count_{0}'
+
+
+def get_search_count(
+    workflow: models.Workflow,
+    search_value: str,
+    columns_to_search: List[str],
+    filter_formula: Optional[Dict] = None,
+) -> int:
+    """Count the rows selected by sql.search_table.
+
+    The count is stored in the data cache, so the pages of a table (with the
+    same search) only execute the query once while the data does not change.
+
+    :param workflow: Workflow with the table
+    :param search_value: String to search
+    :param columns_to_search: Columns in which to search the value
+    :param filter_formula: Optional filter condition
+    :return: Number of rows
+    """
+    return core.get_or_set_data_cache(
+        workflow,
+        SEARCH_COUNT_NAME.format(hashlib.md5(json.dumps(
+            [search_value, columns_to_search, filter_formula],
+            sort_keys=True).encode()).hexdigest()),
+        lambda: sql.search_table_count(
+            workflow.get_data_frame_table_name(),
+            search_value,
+            columns_to_search=columns_to_search,
+            filter_formula=filter_formula))
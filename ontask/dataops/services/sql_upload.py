@@ -14,6 +14,7 @@ import ontask
 from ontask import models
 from ontask.core.session_ops import acquire_workflow_access
 from ontask.dataops import pandas, services
+from ontask.dataops.services.condition_counts import schedule_condition_counts
 
 SESSION_STORE = import_module(settings.SESSION_ENGINE).SessionStore
 
@@ -207,6 +208,7 @@ class ExecuteSQLUpload:
             dst_df,
             src_df,
             merge_info)
+        schedule_condition_counts(workflow)
 
         log_item.payload = merge_info
         log_item.save()
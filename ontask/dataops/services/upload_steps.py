@@ -12,6 +12,7 @@ from django.utils.translation import ugettext as _
 from ontask import models
 from ontask.core import store_workflow_in_session
 from ontask.dataops import pandas, sql
+from ontask.dataops.services.condition_counts import schedule_condition_counts
 
 
 def upload_step_two(
@@ -208,6 +209,8 @@ def upload_step_four(
         messages.error(request, _('Merge operation failed. ') + str(exc))
         return redirect(reverse('table:display'))
 
+    schedule_condition_counts(workflow)
+
     col_info = workflow.get_column_info()
     workflow.log(
         request.user,
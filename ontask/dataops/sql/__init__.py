@@ -2,13 +2,20 @@
 
 """Access the DB directly through psycopg2 and django connection."""
 from ontask.dataops.sql.column_queries import (
-    COLUMN_NAME_SIZE, add_column_to_db, copy_column_in_db, db_rename_column,
-    df_drop_column, get_df_column_types, get_text_column_hash,
-    is_column_in_table, is_column_unique)
+    COLUMN_NAME_SIZE, add_column_to_db, add_formula_column_to_db,
+    add_random_column_to_db, copy_column_in_db, db_change_column_type,
+    db_rename_column, df_drop_column, get_df_column_types,
+    get_text_column_hash, is_column_in_table, is_column_unique,
+    update_columns_from_table)
+from ontask.dataops.sql.data_version import increase_data_version
 from ontask.dataops.sql.row_queries import (
-    delete_row, get_num_rows, get_row, get_rows, increase_row_integer,
-    insert_row, select_ids_all_false, update_row)
+    delete_row, get_num_rows, get_row, get_row_formula_values, get_rows,
+    increase_row_integer, insert_row, select_ids_all_false, update_row)
+from ontask.dataops.sql.search_index import (
+    drop_search_index, update_search_index,
+)
+from ontask.dataops.sql.summary_queries import get_column_summary
 from ontask.dataops.sql.table_queries import (
-    clone_table, delete_table, get_select_query_txt, rename_table,
-    search_table,
+    CONDITION_COLUMN_NAME, clone_table, delete_table, get_select_query_txt,
+    rename_table, search_table, search_table_count,
 )
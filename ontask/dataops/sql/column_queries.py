@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 
 """DB queries to manipulate columns."""
-from typing import List
+from typing import List, Tuple
 
-from django.db import connection
+from django.db import connection, transaction
 from django.utils.translation import ugettext_lazy as _
 from psycopg2 import sql
 
 from ontask import OnTaskDBIdentifier
+from ontask.dataops.sql.data_version import increase_data_version
+from ontask.dataops.sql.search_index import update_search_index
 
 COLUMN_NAME_SIZE = 63
 
@@ -27,6 +29,57 @@ ontask_to_sql_datatype_names = {
 }
 
 
+def _any_null(
+    operands: List[sql.Composable],
+    expression: sql.Composable,
+) -> sql.Composed:
+    """Make the expression NULL if any of the operands is NULL."""
+    return sql.SQL('CASE WHEN {0} THEN NULL ELSE {1} END').format(
+        sql.SQL(' OR ').join([
+            sql.SQL('{0} IS NULL').format(operand) for operand in operands]),
+        expression)
+
+
+def _row_aggregate(
+    function: str,
+    operands: List[sql.Composable],
+) -> sql.Composed:
+    """Apply an aggregate function to the values of the operands in a row."""
+    return _any_null(
+        operands,
+        sql.SQL('(SELECT {0} FROM (VALUES {1}) AS row_values(x))').format(
+            sql.SQL(function),
+            sql.SQL(', ').join([
+                sql.SQL('({0}::double precision)').format(operand)
+                for operand in operands])))
+
+
+# Expressions calculating the formula columns in every row. As in pandas
+# with skipna=False, the result is NULL if any value is NULL, except in the
+# boolean operations, where a NULL is considered false.
+FORMULA_COLUMN_EXPRESSIONS = {
+    'sum': lambda ops: sql.SQL(' + ').join(ops),
+    'prod': lambda ops: sql.SQL(' * ').join(ops),
+    'max': lambda ops: _any_null(
+        ops,
+        sql.SQL('GREATEST({0})').format(sql.SQL(', ').join(ops))),
+    'min': lambda ops: _any_null(
+        ops,
+        sql.SQL('LEAST({0})').format(sql.SQL(', ').join(ops))),
+    'mean': lambda ops: sql.SQL('({0})::double precision / {1}').format(
+        sql.SQL(' + ').join(ops),
+        sql.Literal(len(ops))),
+    'median': lambda ops: _row_aggregate(
+        'percentile_cont(0.5) WITHIN GROUP (ORDER BY x)',
+        ops),
+    'std': lambda ops: _row_aggregate('stddev_samp(x)', ops),
+    'all': lambda ops: sql.SQL(' AND ').join([
+        sql.SQL('coalesce({0}, FALSE)').format(operand) for operand in ops]),
+    'any': lambda ops: sql.SQL(' OR ').join([
+        sql.SQL('coalesce({0}, FALSE)').format(operand) for operand in ops]),
+}
+
+
 def add_column_to_db(
     table_name: str,
     col_name: str,
@@ -55,6 +108,150 @@ def add_column_to_db(
         query = query + sql.SQL(' DEFAULT ') + sql.Literal(initial)
 
     connection.connection.cursor().execute(query)
+    increase_data_version(table_name)
+    update_search_index(table_name)
+
+
+def add_formula_column_to_db(
+    table_name: str,
+    col_name: str,
+    col_type: str,
+    operation: str,
+    operand_names: List[str],
+):
+    """Add a column with the result of an operation over other columns.
+
+    The column is added and populated with a single UPDATE (the table is not
+    loaded or written again).
+
+    :param table_name: Table to consider
+    :param col_name: Column name
+    :param col_type: OnTask column type
+    :param operation: Operation in FORMULA_COLUMN_EXPRESSIONS
+    :param operand_names: Columns to combine
+    :return: Nothing. Effect done in the DB
+    """
+    sql_type = ontask_to_sql_datatype_names[col_type]
+    expression = FORMULA_COLUMN_EXPRESSIONS[operation]([
+        OnTaskDBIdentifier(cname) for cname in operand_names])
+
+    with transaction.atomic(), connection.connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL('ALTER TABLE {0} ADD COLUMN {1} ' + sql_type).format(
+                sql.Identifier(table_name),
+                sql.Identifier(col_name)))
+        cursor.execute(
+            sql.SQL('UPDATE {0} SET {1} = {2}').format(
+                sql.Identifier(table_name),
+                OnTaskDBIdentifier(col_name),
+                expression),
+            [])
+    increase_data_version(table_name)
+    update_search_index(table_name)
+
+
+def add_random_column_to_db(
+    table_name: str,
+    col_name: str,
+    col_type: str,
+    categories: List,
+    key_name: str,
+):
+    """Add a column with the categories randomly distributed in the rows.
+
+    The rows are shuffled with row_number() OVER (ORDER BY random()) and the
+    row in position p receives the category p modulo the number of
+    categories, so all of them are assigned to the same number of rows (plus
+    minus one).
+
+    :param table_name: Table to consider
+    :param col_name: Column name
+    :param col_type: OnTask column type
+    :param categories: Values to assign
+    :param key_name: Key column to identify the rows
+    :return: Nothing. Effect done in the DB
+    """
+    sql_type = ontask_to_sql_datatype_names[col_type]
+
+    with transaction.atomic(), connection.connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL('ALTER TABLE {0} ADD COLUMN {1} ' + sql_type).format(
+                sql.Identifier(table_name),
+                sql.Identifier(col_name)))
+        if categories:
+            # Without categories the column remains empty
+            cursor.execute(
+                sql.SQL(
+                    'UPDATE {0} SET {1} = (%s::' + sql_type + '[])'
+                    + '[(shuffled.pos - 1) %% %s + 1] '
+                    + 'FROM (SELECT {2} AS row_key, '
+                    + 'row_number() OVER (ORDER BY random()) AS pos '
+                    + 'FROM {0}) AS shuffled '
+                    + 'WHERE {0}.{2} = shuffled.row_key',
+                ).format(
+                    sql.Identifier(table_name),
+                    OnTaskDBIdentifier(col_name),
+                    OnTaskDBIdentifier(key_name)),
+                [list(categories), len(categories)])
+    increase_data_version(table_name)
+    update_search_index(table_name)
+
+
+def update_columns_from_table(
+    table_name: str,
+    src_table: str,
+    key_name: str,
+    columns: List[Tuple[str, str]],
+):
+    """Copy the values of some columns from another table.
+
+    The rows are matched with the key column (present in both tables). The
+    columns that are not in the table are added, and those with a different
+    type are changed to the new type.
+
+    :param table_name: Table to update
+    :param src_table: Table with the new values
+    :param key_name: Key column to match the rows
+    :param columns: List of pairs (column name, OnTask type) to copy
+    :return: Nothing. Effect done in the DB
+    """
+    with transaction.atomic(), connection.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT column_name, data_type FROM information_schema.columns '
+            + 'WHERE table_name = %s',
+            [table_name])
+        current_types = dict(cursor.fetchall())
+
+        for cname, ctype in columns:
+            sql_type = ontask_to_sql_datatype_names[ctype]
+            if cname not in current_types:
+                cursor.execute(
+                    sql.SQL('ALTER TABLE {0} ADD COLUMN {1} ' + sql_type)
+                    .format(sql.Identifier(table_name), sql.Identifier(cname)))
+            elif current_types[cname] != sql_type:
+                # The values are replaced below
+                cursor.execute(
+                    sql.SQL(
+                        'ALTER TABLE {0} ALTER COLUMN {1} TYPE ' + sql_type
+                        + ' USING NULL',
+                    ).format(
+                        sql.Identifier(table_name),
+                        sql.Identifier(cname)))
+
+        cursor.execute(
+            sql.SQL(
+                'UPDATE {0} SET {1} FROM {2} AS src WHERE {0}.{3} = src.{3}',
+            ).format(
+                sql.Identifier(table_name),
+                sql.SQL(', ').join([
+                    sql.SQL('{0} = src.{0}').format(
+                        OnTaskDBIdentifier(cname))
+                    for cname, __ in columns]),
+                sql.Identifier(src_table),
+                OnTaskDBIdentifier(key_name)),
+            [])
+    increase_data_version(table_name)
+    update_search_index(table_name)
 
 
 def copy_column_in_db(
@@ -76,6 +273,7 @@ def copy_column_in_db(
     )
 
     connection.connection.cursor().execute(query)
+    increase_data_version(table_name)
 
 
 def is_column_in_table(table_name: str, column_name: str) -> bool:
@@ -148,6 +346,28 @@ def db_rename_column(table: str, old_name: str, new_name: str):
             sql.Identifier(old_name),
             sql.Identifier(new_name),
         ))
+    increase_data_version(table)
+    update_search_index(table)
+
+
+def db_change_column_type(table: str, column_name: str, col_type: str):
+    """Change the type of a column in the database.
+
+    The values are converted to the new type by PostgreSQL.
+
+    :param table: table
+    :param column_name: Column name
+    :param col_type: New OnTask type
+    :return: Nothing. Change reflected in the database table
+    """
+    with connection.connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL(
+                'ALTER TABLE {0} ALTER COLUMN {1} TYPE '
+                + ontask_to_sql_datatype_names[col_type],
+            ).format(sql.Identifier(table), sql.Identifier(column_name)))
+    increase_data_version(table)
+    update_search_index(table)
 
 
 def df_drop_column(table_name: str, column_name: str):
@@ -161,6 +381,8 @@ def df_drop_column(table_name: str, column_name: str):
         cursor.execute(sql.SQL('ALTER TABLE {0} DROP COLUMN {1}').format(
             sql.Identifier(table_name),
             sql.Identifier(column_name)))
+    increase_data_version(table_name)
+    update_search_index(table_name)
 
 
 def get_text_column_hash(table_name: str, column_name: str) -> str:
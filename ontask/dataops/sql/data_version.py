@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+"""Version of the data stored in the table of a workflow.
+
+Every function modifying a table increases the field data_version of the
+workflow owning the table, so values derived from the data can be stored in
+the cache with the version in the key (see ontask.core.data_cache), and they
+are not used once the table changes. The version is increased after the
+modification is written (the functions in ontask.dataops.pandas write through
+their own connection, so it is not always the same transaction). A value
+stored with a version may thus include changes made just before the version
+was increased, but it never misses changes made before that version.
+"""
+from django.apps import apps
+from django.db.models import F
+
+
+def increase_data_version(table_name: str):
+    """Increase the data version of the workflow using the table.
+
+    Tables not used by a workflow (e.g. temporary upload tables) are ignored.
+
+    :param table_name: Table name
+    :return: Nothing. The new version is stored in the DB
+    """
+    # The model is obtained here because the models import this package
+    apps.get_model('ontask', 'Workflow').objects.filter(
+        data_frame_table_name=table_name,
+    ).update(data_version=F('data_version') + 1)
@@ -2,6 +2,7 @@
 
 """DB queries to manipulate rows."""
 from typing import Any, Dict, List, Mapping, Optional, Tuple
+import uuid
 
 from django.db import connection
 from psycopg2 import sql
@@ -12,6 +13,7 @@ from ontask.dataops import formula
 from ontask.dataops.sql.table_queries import (
     get_boolean_clause, get_select_query,
 )
+from ontask.dataops.sql.data_version import increase_data_version
 
 
 def get_rows(
@@ -19,16 +21,27 @@ def get_rows(
     column_names: Optional[List[str]] = None,
     filter_formula: Optional[Mapping] = None,
     filter_pairs: Optional[Mapping] = None,
+    condition_formulas: Optional[List[Dict]] = None,
+    itersize: Optional[int] = None,
 ):
     """Get columns in a row selected by filter and/or pairs.
 
     Execute a select query in the database with an optional filter and
     pairs and return a subset of columns (or all of them if empty)
 
+    If itersize is given, the query is executed with a named (server side)
+    cursor and the rows are transferred in batches of itersize rows while
+    the cursor is iterated (the value of rowcount is not reliable in this
+    case). The cursor must be closed once the iteration finishes.
+
     :param table_name: Primary key of the workflow storing the data
     :param column_names: optional list of columns to select
     :param filter_formula: Optional JSON formula to use in the WHERE clause
     :param filter_pairs: Pairs key: value to filter in the WHERE clause
+    :param condition_formulas: Optional formulas to evaluate for each row (
+    see get_select_query)
+    :param itersize: Number of rows to fetch at a time with a server side
+    cursor (None to fetch all the rows with a client side cursor)
     :return: cursor resulting from the query
     """
     query, fields = get_select_query(
@@ -36,10 +49,19 @@ def get_rows(
         column_names=column_names,
         filter_formula=filter_formula,
         filter_pairs=filter_pairs,
+        condition_formulas=condition_formulas,
     )
 
     # Execute the query
-    cursor = connection.connection.cursor(cursor_factory=DictCursor)
+    if itersize:
+        # Named cursors need WITH HOLD to be used in autocommit mode
+        cursor = connection.connection.cursor(
+            name='ontask_rows_{0}'.format(uuid.uuid4().hex),
+            cursor_factory=DictCursor,
+            withhold=True)
+        cursor.itersize = itersize
+    else:
+        cursor = connection.connection.cursor(cursor_factory=DictCursor)
     cursor.execute(query, fields)
     return cursor
 
@@ -111,6 +133,7 @@ def insert_row(
     # Execute the query
     with connection.connection.cursor() as cursor:
         cursor.execute(query, values)
+    increase_data_version(table_name)
 
 
 def update_row(
@@ -152,6 +175,7 @@ def update_row(
     # Execute the query
     with connection.connection.cursor() as cursor:
         cursor.execute(query, query_fields)
+    increase_data_version(table_name)
 
 
 def increase_row_integer(
@@ -181,6 +205,7 @@ def increase_row_integer(
     with connection.connection.cursor() as cursor:
         cursor.execute(query, [where_value])
         connection.commit()
+    increase_data_version(table_name)
 
 
 def select_ids_all_false(
@@ -229,6 +254,49 @@ def select_ids_all_false(
     return [id_tuple[0] for id_tuple in cursor.fetchall()]
 
 
+def get_row_formula_values(
+    table_name: str,
+    formula_list: List[Dict],
+    filter_pairs: Mapping,
+) -> Optional[List[Optional[bool]]]:
+    """Evaluate a list of formulas in the row selected by the pairs.
+
+    The formulas are evaluated as in the WHERE clause of a query (see
+    get_num_rows), thus the result of a formula may be NULL (None) when the
+    row has empty cells. An empty formula evaluates to True.
+
+    :param table_name: Table name
+    :param formula_list: List of formulas to evaluate
+    :param filter_pairs: Pairs key: value selecting a single row
+    :return: List with the result of each formula, or None if the pairs do
+    not select exactly one row.
+    """
+    select_items = []
+    query_fields = []
+    for cond_formula in formula_list:
+        cond_sql, cond_fields = formula.evaluate(
+            cond_formula,
+            formula.EVAL_SQL)
+        if not cond_sql:
+            cond_sql = sql.SQL('TRUE')
+        select_items.append(sql.SQL('({0})').format(cond_sql))
+        query_fields += cond_fields
+
+    bool_clause, bool_fields = get_boolean_clause(filter_pairs=filter_pairs)
+    query = sql.SQL('SELECT {0} FROM {1} WHERE {2} LIMIT 2').format(
+        sql.SQL(', ').join(select_items) if select_items else sql.SQL('1'),
+        sql.Identifier(table_name),
+        bool_clause)
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(query, query_fields + bool_fields)
+        if cursor.rowcount != 1:
+            return None
+        row = cursor.fetchone()
+
+    return list(row) if select_items else []
+
+
 def get_num_rows(table_name, cond_filter=None):
     """Get the number of rows in the table that satisfy the condition.
 
@@ -275,3 +343,4 @@ def delete_row(table_name: str, kv_pair: Tuple[str, Any]):
     # Execute the query
     with connection.connection.cursor() as cursor:
         cursor.execute(query, query_fields)
+    increase_data_version(table_name)
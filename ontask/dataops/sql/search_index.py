@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+"""Trigram index to search the content of the workflow tables.
+
+If SEARCH_INDEX is true (requires the pg_trgm extension in the database),
+every table stored, cloned or with modified columns has a GIN trigram index
+on the concatenation of the text of all its cells. Row updates are
+maintained by PostgreSQL. Searches using at least three characters add the
+condition on the concatenation (which uses the index) to the search in every
+column, so only the rows matching the first are checked.
+
+The index is created on an expression and the columns (with their data
+types) are stored in the comment of the index, so the expression can be
+reproduced in the queries.
+"""
+import json
+from typing import List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from psycopg2 import sql
+
+from ontask import LOGGER, OnTaskDBIdentifier
+
+SEARCH_INDEX_NAME = '{0}_search'
+
+# Minimum length of the searched value to use the index (trigrams)
+SEARCH_INDEX_MIN_LENGTH = 3
+
+
+def _get_search_expression(columns: List[Tuple[str, str]]) -> sql.Composed:
+    """Create the expression concatenating the text of all the columns.
+
+    The values are separated by a character that cannot appear in the search
+    box, so a value is contained in the expression only if it is contained in
+    one of the columns. Datetime values are converted with the function
+    ontask_search_text (immutable) to be used in the index.
+
+    :param columns: List of pairs (column name, SQL data type)
+    :return: SQL expression
+    """
+    return sql.SQL(' || chr(1) || ').join([
+        sql.SQL('coalesce({0}, \'\')').format(
+            sql.SQL(
+                'ontask_search_text({0})'
+                if col_type == 'timestamp with time zone'
+                else 'CAST({0} AS TEXT)').format(OnTaskDBIdentifier(cname)))
+        for cname, col_type in columns])
+
+
+def get_search_index_columns(
+    table_name: str,
+) -> Optional[List[Tuple[str, str]]]:
+    """Get the columns included in the search index of the table.
+
+    :param table_name: Table name
+    :return: List of pairs (column name, SQL type) or None if no index
+    """
+    with connection.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT obj_description(to_regclass(%s), \'pg_class\')',
+            [sql.Identifier(
+                SEARCH_INDEX_NAME.format(table_name),
+            ).as_string(connection.connection)])
+        description = cursor.fetchone()[0]
+
+    if not description:
+        return None
+    return [tuple(column) for column in json.loads(description)]
+
+
+def get_search_index_clause(
+    table_name: str,
+    search_value: str,
+    columns_to_search: Optional[List[str]],
+) -> Optional[sql.Composed]:
+    """Get the clause to select the rows with the search index.
+
+    :param table_name: Table name
+    :param search_value: String to search
+    :param columns_to_search: Columns in which the value is searched
+    :return: SQL clause with a parameter (the LIKE pattern) or None if the
+    index cannot be used
+    """
+    if not search_value or len(search_value) < SEARCH_INDEX_MIN_LENGTH:
+        return None
+
+    columns = get_search_index_columns(table_name)
+    if not columns or not set(columns_to_search or []).issubset(
+        cname for cname, __ in columns
+    ):
+        return None
+
+    return sql.SQL('({0} LIKE %s)').format(_get_search_expression(columns))
+
+
+def drop_search_index(table_name: str):
+    """Drop the search index of the table (if it exists).
+
+    :param table_name: Table name
+    :return: Nothing. The index is dropped in the DB
+    """
+    with connection.connection.cursor() as cursor:
+        cursor.execute(sql.SQL('DROP INDEX IF EXISTS {0}').format(
+            sql.Identifier(SEARCH_INDEX_NAME.format(table_name))))
+
+
+def update_search_index(table_name: str):
+    """Create (or create again) the search index with all the columns.
+
+    If SEARCH_INDEX is false, the index is only dropped. If the index cannot
+    be created (e.g. pg_trgm is not available) the error is logged and the
+    searches scan the table. Upload tables are not indexed (the index is
+    created when they become the workflow table).
+
+    :param table_name: Table name
+    :return: Nothing. The index is created in the DB
+    """
+    # The model is obtained here because the models import this package
+    upload_prefix = apps.get_model(
+        'ontask',
+        'Workflow').upload_table_prefix.format('')
+    if table_name.startswith(upload_prefix):
+        return
+
+    if not settings.SEARCH_INDEX:
+        drop_search_index(table_name)
+        return
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT column_name, data_type FROM information_schema.columns '
+            + 'WHERE table_name = %s ORDER BY ordinal_position',
+            [table_name])
+        columns = cursor.fetchall()
+
+    drop_search_index(table_name)
+    if not columns:
+        return
+
+    index_name = sql.Identifier(SEARCH_INDEX_NAME.format(table_name))
+    try:
+        with transaction.atomic(), connection.connection.cursor() as cursor:
+            cursor.execute(
+                sql.SQL(
+                    'CREATE INDEX {0} ON {1} USING gin (({2}) gin_trgm_ops)',
+                ).format(
+                    index_name,
+                    sql.Identifier(table_name),
+                    _get_search_expression(columns)))
+            cursor.execute(
+                sql.SQL('COMMENT ON INDEX {0} IS {1}').format(
+                    index_name,
+                    sql.Literal(json.dumps(columns))))
+    except Exception as exc:
+        LOGGER.error(
+            'Unable to create search index for table %s: %s',
+            table_name,
+            str(exc))
+
+
+def rename_search_index(table_name: str, new_name: str):
+    """Rename the search index of a table that has been renamed.
+
+    :param table_name: Previous table name
+    :param new_name: New table name
+    :return: Nothing. The index is renamed in the DB
+    """
+    with connection.connection.cursor() as cursor:
+        cursor.execute(
+            sql.SQL('ALTER INDEX IF EXISTS {0} RENAME TO {1}').format(
+                sql.Identifier(SEARCH_INDEX_NAME.format(table_name)),
+                sql.Identifier(SEARCH_INDEX_NAME.format(new_name))))
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+"""DB queries to summarize columns.
+
+The aggregates needed to visualize a column (quartiles, histogram bins and
+value counts) are calculated in the database, so only the summary is
+transferred, regardless of the number of rows in the table. The result has
+the same structure as pandas.get_column_summary.
+"""
+import datetime
+import math
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from django.db import connection
+from psycopg2 import sql
+
+from ontask import OnTaskDBIdentifier
+from ontask.dataops.sql.table_queries import get_boolean_clause
+
+# Condition for a value to be considered empty for each data type
+_EMPTY_CONDITION = {
+    'integer': '{0} = 0',
+    'double': '{0} = 0',
+    'string': '{0} = \'\'',
+    'boolean': 'NOT {0}',
+    'datetime': 'FALSE',
+}
+
+
+def _get_values_query(
+    table_name: str,
+    select_list: sql.Composable,
+    filter_formula: Optional[Mapping],
+) -> Tuple[sql.Composed, List]:
+    """Create the subquery with the values of the column.
+
+    :param table_name: Table to query
+    :param select_list: Expressions to select (the value is named x)
+    :param filter_formula: Optional formula to select the rows
+    :return: (sql query, sql params)
+    """
+    query = sql.SQL('SELECT {0} FROM {1}').format(
+        select_list,
+        sql.Identifier(table_name))
+    query_fields = []
+    bool_clause, bool_fields = get_boolean_clause(
+        filter_formula=filter_formula)
+    if bool_clause:
+        query += sql.SQL(' WHERE ') + bool_clause
+        query_fields += bool_fields
+    return query, query_fields
+
+
+def _get_bin_count(n_values: int, iqr: float, value_range: float) -> int:
+    """Calculate the number of bins of a histogram.
+
+    Same rule as bins='auto' in numpy: the smallest width between the
+    Sturges and the Freedman-Diaconis estimators.
+
+    :param n_values: Number of values
+    :param iqr: Interquartile range
+    :param value_range: Maximum - minimum
+    :return: Number of bins (at least one)
+    """
+    if value_range <= 0:
+        return 1
+
+    width = value_range / (math.log2(n_values) + 1.0)
+    fd_width = 2.0 * iqr * n_values ** (-1.0 / 3.0)
+    if fd_width:
+        width = min(width, fd_width)
+    return max(int(math.ceil(value_range / width)), 1)
+
+
+def _get_numeric_summary(
+    cursor,
+    values_query: sql.Composed,
+    values_fields: List,
+    data_type: str,
+) -> Optional[Dict]:
+    """Calculate the box plot and histogram of numeric or datetime values.
+
+    Datetime values are processed as seconds since the epoch.
+
+    :return: Dictionary with keys empty, boxplot and histogram
+    """
+    cursor.execute(
+        sql.SQL(
+            'SELECT count(x), min(x), max(x), avg(x), '
+            + 'percentile_cont(ARRAY[0.25, 0.5, 0.75]) '
+            + 'WITHIN GROUP (ORDER BY x), '
+            + 'bool_and({0}), min(d) '
+            + 'FROM ({1}) AS v WHERE x IS NOT NULL',
+        ).format(
+            sql.SQL(_EMPTY_CONDITION[data_type]).format(sql.SQL('x')),
+            values_query),
+        values_fields)
+    n_values, min_value, max_value, mean, quartiles, empty, min_dt = (
+        cursor.fetchone())
+    if not n_values:
+        return None
+
+    q1, median, q3 = quartiles
+    iqr = q3 - q1
+    n_bins = _get_bin_count(n_values, iqr, max_value - min_value)
+    low, high = min_value, max_value
+    if high == low:
+        # Same as numpy, a bin of width one around the value
+        low, high = low - 0.5, high + 0.5
+    width = (high - low) / n_bins
+
+    # Histogram (values equal to high go in the last bin) and box fences
+    cursor.execute(
+        sql.SQL(
+            'SELECT LEAST(width_bucket(x, %s, %s, %s), %s) AS bin, '
+            + 'count(*), min(x) FILTER (WHERE x >= %s), '
+            + 'max(x) FILTER (WHERE x <= %s) '
+            + 'FROM ({0}) AS v WHERE x IS NOT NULL GROUP BY bin',
+        ).format(values_query),
+        [
+            low, high, n_bins, n_bins,
+            q1 - 1.5 * iqr, q3 + 1.5 * iqr,
+        ] + values_fields)
+    counts = [0] * n_bins
+    lower_fences, upper_fences = [], []
+    for bin_idx, count, lower_fence, upper_fence in cursor.fetchall():
+        counts[bin_idx - 1] = count
+        if lower_fence is not None:
+            lower_fences.append(lower_fence)
+        if upper_fence is not None:
+            upper_fences.append(upper_fence)
+
+    centers = [low + (idx + 0.5) * width for idx in range(n_bins)]
+    if data_type == 'datetime':
+        return {
+            'empty': empty,
+            'boxplot': None,
+            'histogram': {
+                'x': [
+                    str(datetime.datetime.fromtimestamp(
+                        center,
+                        tz=min_dt.tzinfo))
+                    for center in centers],
+                'y': counts,
+                'width': width * 1000}}
+
+    return {
+        'empty': empty,
+        'boxplot': {
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'mean': mean,
+            'lowerfence': min(lower_fences),
+            'upperfence': max(upper_fences),
+        },
+        'histogram': {'x': centers, 'y': counts, 'width': width}}
+
+
+def get_column_summary(
+    table_name: str,
+    column_name: str,
+    data_type: str,
+    filter_formula: Optional[Mapping] = None,
+) -> Optional[Dict]:
+    """Calculate in the DB the aggregates needed to visualize a column.
+
+    :param table_name: Table to query
+    :param column_name: Column to summarize
+    :param data_type: OnTask data type of the column
+    :param filter_formula: Optional formula to select the rows
+    :return: A dictionary with the following keys, or None if the column has
+    all its values to NULL
+      {'name': column name,
+       'empty': True if all the values are empty (or zero or False),
+       'boxplot': box plot values (integer, double) or None,
+       'histogram': bars of the histogram}
+    """
+    column = OnTaskDBIdentifier(column_name)
+    with connection.connection.cursor() as cursor:
+        if data_type in ('integer', 'double', 'datetime'):
+            # Column d keeps the datetime values to obtain their time zone
+            if data_type == 'datetime':
+                select_list = sql.SQL(
+                    'EXTRACT(EPOCH FROM {0})::double precision AS x, {0} AS d',
+                ).format(column)
+            else:
+                select_list = sql.SQL(
+                    '{0}::double precision AS x, NULL::timestamptz AS d',
+                ).format(column)
+            values_query, values_fields = _get_values_query(
+                table_name,
+                select_list,
+                filter_formula)
+            summary = _get_numeric_summary(
+                cursor,
+                values_query,
+                values_fields,
+                data_type)
+        else:
+            values_query, values_fields = _get_values_query(
+                table_name,
+                sql.SQL('{0} AS x').format(column),
+                filter_formula)
+            cursor.execute(
+                sql.SQL(
+                    'SELECT x, count(*), bool_and({0}) FROM ({1}) AS v '
+                    + 'WHERE x IS NOT NULL GROUP BY x ORDER BY x',
+                ).format(
+                    sql.SQL(_EMPTY_CONDITION[data_type]).format(
+                        sql.SQL('x')),
+                    values_query),
+                values_fields)
+            rows = cursor.fetchall()
+            summary = None
+            if rows:
+                summary = {
+                    'empty': all(empty for __, __, empty in rows),
+                    'boxplot': None,
+                    'histogram': {
+                        'x': [str(value) for value, __, __ in rows],
+                        'y': [count for __, count, __ in rows],
+                        'width': None}}
+
+    if summary is None:
+        return None
+
+    summary['name'] = column_name
+    return summary
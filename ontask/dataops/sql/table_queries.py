@@ -3,11 +3,27 @@
 """Direct SQL operations in the DB."""
 from typing import Any, Dict, List, Mapping, Optional, Tuple
 
+from django.conf import settings
 from django.db import connection
 from psycopg2 import sql
 
 from ontask import LOGGER, OnTaskDBIdentifier
 from ontask.dataops import formula
+from ontask.dataops.sql.data_version import increase_data_version
+from ontask.dataops.sql.search_index import (
+    get_search_index_clause, rename_search_index, update_search_index,
+)
+
+# Name of the columns with the evaluation of conditions in a select query
+# (names starting with __ are reserved for OnTask)
+CONDITION_COLUMN_NAME = '__ONTASK_CONDITION_{0}'
+
+# Expression to format a datetime as strftime('%Y-%m-%d %H:%M:%S  %z') in a
+# time zone (the offset is calculated in seconds and written as +HHMM)
+DATETIME_TEXT_EXPRESSION = (
+    'to_char({0} AT TIME ZONE {1}, \'YYYY-MM-DD HH24:MI:SS\') || \'  \' || '
+    + 'to_char(sign({2}) * (abs({2}) / 3600 * 100 '
+    + '+ mod(abs({2}), 3600) / 60), \'SG0000\')')
 
 
 def clone_table(table_from: str, table_to: str):
@@ -21,6 +37,8 @@ def clone_table(table_from: str, table_to: str):
         cursor.execute(sql.SQL('CREATE TABLE {0} AS TABLE {1}').format(
             sql.Identifier(table_to),
             sql.Identifier(table_from)))
+    increase_data_version(table_to)
+    update_search_index(table_to)
 
 
 def rename_table(table: str, new_name: str):
@@ -35,6 +53,9 @@ def rename_table(table: str, new_name: str):
             sql.Identifier(table),
             sql.Identifier(new_name),
         ))
+    rename_search_index(table, new_name)
+    increase_data_version(table)
+    increase_data_version(new_name)
 
 
 def get_boolean_clause(
@@ -87,35 +108,67 @@ def get_select_query(
     column_names: Optional[List[str]] = None,
     filter_formula: Optional[Dict] = None,
     filter_pairs: Optional[Mapping] = None,
+    condition_formulas: Optional[List[Dict]] = None,
+    order_by: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
 ) -> Tuple[sql.Composed, List[Any]]:
     """Calculate pair query, fields to execute a select statement.
 
+    If condition formulas are given, the query includes one additional
+    Boolean column per formula (named CONDITION_COLUMN_NAME.format(idx))
+    with the result of evaluating the formula for each row.
+
     :param table_name: Table to query
     :param column_names: list of columns to consider or None to consider all
     :param filter_formula: Text filter expression
     :param filter_pairs: Dictionary of key/value pairs.
+    :param condition_formulas: List of formulas to evaluate in each row
+    :param order_by: Column to order the rows
+    :param limit: Maximum number of rows to select (None to select all)
+    :param offset: Number of rows to skip
     :return: (sql query, sql params)
     """
     if column_names:
-        query = sql.SQL('SELECT {0} FROM {1}').format(
-            sql.SQL(', ').join([
-                OnTaskDBIdentifier(cname) for cname in column_names
-            ]),
-            sql.Identifier(table_name),
-        )
+        select_list = sql.SQL(', ').join([
+            OnTaskDBIdentifier(cname) for cname in column_names
+        ])
     else:
-        query = sql.SQL('SELECT * FROM {0}').format(sql.Identifier(table_name))
+        select_list = sql.SQL('*')
 
     query_fields = []
 
+    if condition_formulas:
+        cond_columns = []
+        for idx, cond_formula in enumerate(condition_formulas):
+            cond_query, cond_fields = formula.evaluate_row_sql(cond_formula)
+            cond_columns.append(sql.SQL('{0} AS {1}').format(
+                cond_query,
+                sql.Identifier(CONDITION_COLUMN_NAME.format(idx))))
+            query_fields += cond_fields
+        select_list = sql.SQL(', ').join([select_list] + cond_columns)
+
+    query = sql.SQL('SELECT {0} FROM {1}').format(
+        select_list,
+        sql.Identifier(table_name))
+
     if filter_formula or filter_pairs:
-        bool_clause, query_fields = get_boolean_clause(
+        bool_clause, bool_fields = get_boolean_clause(
             filter_formula=filter_formula,
             filter_pairs=filter_pairs,
         )
 
         if bool_clause:
             query = query + sql.SQL(' WHERE ') + bool_clause
+            query_fields += bool_fields
+
+    if order_by:
+        query = query + sql.SQL(' ORDER BY {0}').format(
+            OnTaskDBIdentifier(order_by))
+
+    if limit is not None or offset:
+        query = query + sql.SQL(' LIMIT %s OFFSET %s')
+        query_fields += [limit, offset]
 
     return query, query_fields
 
@@ -125,6 +178,9 @@ def get_select_query_txt(
     column_names: Optional[List[str]] = None,
     filter_formula: Optional[Dict] = None,
     filter_pairs: Optional[Mapping] = None,
+    order_by: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
 ) -> Tuple[str, List[Any]]:
     """Calculate the text representation of a query to select table subset.
 
@@ -132,6 +188,9 @@ def get_select_query_txt(
     :param column_names: list of columns to consider or None to consider all
     :param filter_formula: Text filter expression
     :param filter_pairs: Dictionary of key/value pairs.
+    :param order_by: Column to order the rows
+    :param limit: Maximum number of rows to select (None to select all)
+    :param offset: Number of rows to skip
     :return: (sql query, sql params)
     """
     # invoke get_select_query and transform into string
@@ -140,49 +199,34 @@ def get_select_query_txt(
         column_names=column_names,
         filter_formula=filter_formula,
         filter_pairs=filter_pairs,
+        order_by=order_by,
+        limit=limit,
+        offset=offset,
     )
 
     return query_str.as_string(connection.connection), fields
 
 
-def search_table(
+def _get_search_clause(
     table_name: str,
     search_value: str,
     columns_to_search: Optional[List] = None,
     filter_formula: Optional[Dict] = None,
     any_join: bool = True,
-    order_col_name: str = None,
-    order_asc: bool = True,
-):
-    """Search the content of all cells in the table.
+) -> Tuple[sql.Composable, List]:
+    """Create the WHERE clause to search the content of the table.
 
-    Select rows where for every (column, value) pair, column contains value (
-    as in LIKE %value%, these are combined with OR if any is TRUE, or AND if
-    any is false, and the result is ordered by the given column and type (if
-    given)
+    If the table has a search index, the condition using it is added to the
+    search in the columns.
 
     :param table_name: table name
+    :param search_value: String to search
+    :param columns_to_search: Columns in which to search the value
     :param filter_formula: Optional filter condition to pre filter the query
-    :param columns_to_search: A column, value, type tuple to search the value
-    in the column set. the query is built with these terms as requirement AND
-    the cv_tuples.
     :param any_join: Boolean encoding if values should be combined with OR (or
     AND)
-    :param order_col_name: Order results by this column
-    :param order_asc: Order results in ascending values (or descending)
-    :param search_value: String to search
-    :return: The resulting query set
+    :return: (sql clause (empty if there is no condition), sql params)
     """
-    # Create the query
-    if columns_to_search:
-        query = sql.SQL('SELECT {0} FROM {1}').format(
-            sql.SQL(', ').join([
-                OnTaskDBIdentifier(colname) for colname in columns_to_search
-            ]),
-            sql.Identifier(table_name),
-        )
-    else:
-        query = sql.SQL('SELECT * from {1}').format(sql.Identifier(table_name))
     query_fields = []
 
     where_clause = sql.SQL('')
@@ -206,24 +250,128 @@ def search_table(
         else:
             conn_txt = ' AND '
 
-        where_clause = where_clause + sql.SQL(conn_txt).join([
-            sql.SQL('(CAST ({0} AS TEXT) LIKE %s)').format(
-                OnTaskDBIdentifier(cname),
-            ) for cname in columns_to_search
-        ])
+        where_clause = where_clause + sql.SQL('({0})').format(
+            sql.SQL(conn_txt).join([
+                sql.SQL('(CAST ({0} AS TEXT) LIKE %s)').format(
+                    OnTaskDBIdentifier(cname),
+                ) for cname in columns_to_search
+            ]))
 
         query_fields += ['%' + search_value + '%'] * len(columns_to_search)
 
+        index_clause = get_search_index_clause(
+            table_name,
+            search_value,
+            columns_to_search)
+        if index_clause:
+            where_clause = where_clause + sql.SQL(' AND ') + index_clause
+            query_fields.append('%' + search_value + '%')
+
     if where_clause != sql.SQL(''):
-        query = query + sql.SQL(' WHERE ') + where_clause
+        where_clause = sql.SQL(' WHERE ') + where_clause
+
+    return where_clause, query_fields
+
+
+def _get_select_item(
+    column_name: str,
+    datetime_columns: Optional[List[str]],
+) -> sql.Composable:
+    """Get the expression to select a column in search_table.
+
+    :param column_name: Column to select
+    :param datetime_columns: Columns to format as text in settings.TIME_ZONE
+    :return: SQL expression
+    """
+    column = OnTaskDBIdentifier(column_name)
+    if not datetime_columns or column_name not in datetime_columns:
+        return column
+
+    time_zone = sql.Literal(settings.TIME_ZONE)
+    return sql.SQL(DATETIME_TEXT_EXPRESSION).format(
+        column,
+        time_zone,
+        sql.SQL(
+            'EXTRACT(EPOCH FROM ({0} AT TIME ZONE {1}) '
+            + '- ({0} AT TIME ZONE \'UTC\'))::integer',
+        ).format(column, time_zone))
+
+
+def search_table(
+    table_name: str,
+    search_value: str,
+    columns_to_search: Optional[List] = None,
+    filter_formula: Optional[Dict] = None,
+    any_join: bool = True,
+    order_col_name: str = None,
+    order_asc: bool = True,
+    key_name: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    datetime_columns: Optional[List[str]] = None,
+):
+    """Search the content of all cells in the table.
+
+    Select rows where for every (column, value) pair, column contains value (
+    as in LIKE %value%, these are combined with OR if any is TRUE, or AND if
+    any is false, and the result is ordered by the given column and type (if
+    given)
+
+    If limit is given, only the page of rows starting at offset is returned,
+    and the rows are also ordered by key_name so that the pages are
+    consistent. The columns in datetime_columns are returned as strings
+    formatted in settings.TIME_ZONE (as displayed in the table pages).
+
+    :param table_name: table name
+    :param filter_formula: Optional filter condition to pre filter the query
+    :param columns_to_search: A column, value, type tuple to search the value
+    in the column set. the query is built with these terms as requirement AND
+    the cv_tuples.
+    :param any_join: Boolean encoding if values should be combined with OR (or
+    AND)
+    :param order_col_name: Order results by this column
+    :param order_asc: Order results in ascending values (or descending)
+    :param search_value: String to search
+    :param key_name: Unique column to break the ties in the order
+    :param limit: Maximum number of rows to return (None to return all)
+    :param offset: Number of rows to skip
+    :param datetime_columns: Columns to return formatted as text
+    :return: The resulting query set
+    """
+    # Create the query
+    if columns_to_search:
+        query = sql.SQL('SELECT {0} FROM {1}').format(
+            sql.SQL(', ').join([
+                _get_select_item(colname, datetime_columns)
+                for colname in columns_to_search
+            ]),
+            sql.Identifier(table_name),
+        )
+    else:
+        query = sql.SQL('SELECT * from {1}').format(sql.Identifier(table_name))
+
+    where_clause, query_fields = _get_search_clause(
+        table_name,
+        search_value,
+        columns_to_search,
+        filter_formula,
+        any_join)
+    query = query + where_clause
 
     # Add the order if needed
+    order_by = []
     if order_col_name:
-        query = query + sql.SQL(' ORDER BY {0}').format(
-            OnTaskDBIdentifier(order_col_name))
-
+        order_by.append(OnTaskDBIdentifier(order_col_name))
         if not order_asc:
-            query = query + sql.SQL(' DESC')
+            order_by[-1] = order_by[-1] + sql.SQL(' DESC')
+    if limit is not None and key_name and key_name != order_col_name:
+        order_by.append(OnTaskDBIdentifier(key_name))
+    if order_by:
+        query = query + sql.SQL(' ORDER BY ') + sql.SQL(', ').join(order_by)
+
+    if limit is not None:
+        query = query + sql.SQL(' LIMIT %s OFFSET %s')
+        query_fields += [limit, offset]
 
     # Execute the query
     with connection.connection.cursor() as cursor:
@@ -233,6 +381,38 @@ def search_table(
     return search_result
 
 
+def search_table_count(
+    table_name: str,
+    search_value: str,
+    columns_to_search: Optional[List] = None,
+    filter_formula: Optional[Dict] = None,
+    any_join: bool = True,
+) -> int:
+    """Count the rows selected by search_table with the same parameters.
+
+    :param table_name: table name
+    :param search_value: String to search
+    :param columns_to_search: Columns in which to search the value
+    :param filter_formula: Optional filter condition to pre filter the query
+    :param any_join: Boolean encoding if values should be combined with OR (or
+    AND)
+    :return: Number of rows
+    """
+    where_clause, query_fields = _get_search_clause(
+        table_name,
+        search_value,
+        columns_to_search,
+        filter_formula,
+        any_join)
+    query = sql.SQL('SELECT count(*) FROM {0}').format(
+        sql.Identifier(table_name),
+    ) + where_clause
+
+    with connection.connection.cursor() as cursor:
+        cursor.execute(query, query_fields)
+        return cursor.fetchone()[0]
+
+
 def delete_table(table_name: str):
     """Delete the given table.
 
@@ -245,5 +425,6 @@ def delete_table(table_name: str):
     try:
         with connection.connection.cursor() as cursor:
             cursor.execute(query)
+        increase_data_version(table_name)
     except Exception as exc:
         LOGGER.error('Error when dropping table %s: %s', table_name, str(exc))
@@ -3,14 +3,17 @@
 """Testing logic functions in the package."""
 import datetime
 import io
+import json
 import os
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
 import pandas as pd
 from rest_framework import status
 
-from ontask import models, tests
+from ontask import OnTaskException, models, tests
 from ontask.dataops import formula, pandas, services, sql
 
 
@@ -110,6 +113,122 @@ class DataopsMatrixManipulation(tests.OnTaskTestCase):
         # Data frames mut be identical
         assert df_source.equals(df_dst)
 
+    def test_store_table_special_values(self):
+        """Test that the values with special characters survive COPY."""
+        df_source = pd.DataFrame({
+            'key': [1, 2, 3, 4, 5],
+            'text': ['', None, 'a\tb\nc\r', '\\N', 'back\\slash'],
+        })
+        pandas.store_table(df_source, self.table_name)
+        df_dst = pandas.load_table(self.table_name)
+
+        self.assertEqual(list(df_dst['key']), list(df_source['key']))
+        self.assertEqual(list(df_dst['text']), list(df_source['text']))
+
+    def test_column_summary_sql(self):
+        """Test that the summaries in the DB are equal to those in pandas."""
+        df_source = services.load_df_from_csvfile(
+            io.StringIO(self.csv1),
+            0,
+            0)
+        df_source['int1'] = df_source['key'].astype(int)
+        pandas.store_table(df_source, self.table_name)
+        df_dst = pandas.load_table(self.table_name)
+
+        for cname, data_type in [
+            ('key', 'double'),
+            ('double1', 'double'),
+            ('int1', 'integer'),
+            ('text1', 'string'),
+            ('bool1', 'boolean'),
+            ('date1', 'datetime'),
+        ]:
+            sql_summary = sql.get_column_summary(
+                self.table_name,
+                cname,
+                data_type)
+            df_summary = pandas.get_column_summary(df_dst[cname])
+            self.assertEqual(sql_summary['empty'], df_summary['empty'])
+            self.assertEqual(
+                sql_summary['histogram']['y'],
+                df_summary['histogram']['y'])
+            if data_type in ('string', 'boolean'):
+                self.assertEqual(
+                    sql_summary['histogram']['x'],
+                    df_summary['histogram']['x'])
+                continue
+            if data_type == 'datetime':
+                self.assertIsNone(sql_summary['boxplot'])
+                self.assertEqual(
+                    len(sql_summary['histogram']['x']),
+                    len(df_summary['histogram']['x']))
+                continue
+            for key, value in df_summary['boxplot'].items():
+                self.assertAlmostEqual(sql_summary['boxplot'][key], value)
+
+        # Summary restricted to the rows selected by a formula
+        sql_summary = sql.get_column_summary(
+            self.table_name,
+            'double1',
+            'double',
+            {
+                'condition': 'AND',
+                'not': False,
+                'rules': [{
+                    'field': 'double1',
+                    'id': 'double1',
+                    'operator': 'less',
+                    'type': 'double',
+                    'value': '115'}]})
+        self.assertEqual(sum(sql_summary['histogram']['y']), 2)
+
+    def test_search_index(self):
+        """Test that the searches return the same rows with the index."""
+        df_source = services.load_df_from_csvfile(
+            io.StringIO(self.csv1),
+            0,
+            0)
+        pandas.store_table(df_source, self.table_name)
+        column_names = list(df_source.columns)
+
+        searches = ['d1_t1', 'd1_', '2018-01-01', '111', 'True']
+        results = [
+            sql.search_table(self.table_name, search, column_names)
+            for search in searches]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT 1 FROM pg_extension WHERE extname = %s',
+                ['pg_trgm'])
+            if not cursor.fetchone():
+                self.skipTest('The pg_trgm extension is not available')
+
+        with override_settings(SEARCH_INDEX=True):
+            sql.update_search_index(self.table_name)
+        self.assertIsNotNone(
+            sql.search_index.get_search_index_columns(self.table_name))
+        for search, result in zip(searches, results):
+            self.assertCountEqual(
+                sql.search_table(self.table_name, search, column_names),
+                result)
+            self.assertEqual(
+                sql.search_table_count(self.table_name, search, column_names),
+                len(result))
+        sql.drop_search_index(self.table_name)
+
+    def test_search_index_upload_table(self):
+        """Test that the upload tables are not indexed."""
+        df_source = services.load_df_from_csvfile(
+            io.StringIO(self.csv1),
+            0,
+            0)
+        table_name = models.Workflow.upload_table_prefix.format(0)
+        with override_settings(SEARCH_INDEX=True):
+            pandas.store_table(df_source, table_name)
+        self.assertIsNone(
+            sql.search_index.get_search_index_columns(table_name))
+        sql.delete_table(table_name)
+
     def test_merge_inner(self):
 
         # Get the workflow
@@ -132,6 +251,105 @@ class DataopsMatrixManipulation(tests.OnTaskTestCase):
         # Result must be correct (None)
         self.assertEquals(result, None)
 
+    def test_store_dataframe_columns(self):
+        """Test that only the given columns are stored in the table."""
+        workflow = models.Workflow.objects.all()[0]
+        table_name = workflow.get_data_frame_table_name()
+        df_before = pandas.load_table(table_name)
+
+        df_new = pandas.load_table(table_name, columns=['key', 'double1'])
+        df_new['double1'] = df_new['key'] * 2
+        df_new['new column'] = 'value'
+        pandas.store_dataframe_columns(df_new, workflow, 'key')
+
+        df_after = pandas.load_table(table_name).set_index('key')
+        df_new = df_new.set_index('key')
+        self.assertEqual(len(df_after), len(df_before))
+        self.assertTrue(df_after['text1'].equals(
+            df_before.set_index('key')['text1']))
+        for cname in ['double1', 'new column']:
+            self.assertEqual(
+                list(df_after.loc[df_new.index, cname]),
+                list(df_new[cname]))
+        self.assertTrue(workflow.columns.filter(name='new column').exists())
+
+    def test_store_dataframe_chunks(self):
+        """Test that the columns are stored from a sequence of chunks."""
+        workflow = models.Workflow.objects.all()[0]
+        table_name = workflow.get_data_frame_table_name()
+
+        chunks = list(pandas.load_table_chunks(table_name, 3, ['key']))
+        self.assertEqual(
+            [chunk.shape[0] for chunk in chunks],
+            [3, 3, 2])
+        for idx, chunk in enumerate(chunks):
+            # The first chunk is integer, the others double
+            chunk['result'] = chunk['key'].astype(int) if idx == 0 else (
+                chunk['key'] / 2)
+        pandas.store_dataframe_chunks(chunks, workflow, 'key')
+
+        df_after = pandas.load_table(table_name).set_index('key')
+        for chunk in chunks:
+            self.assertEqual(
+                list(df_after.loc[chunk['key'], 'result']),
+                list(chunk['result']))
+        self.assertEqual(
+            workflow.columns.get(name='result').data_type,
+            'double')
+
+    def test_store_dataframe_chunks_null(self):
+        """Test that a chunk with only nulls keeps the column type."""
+        workflow = models.Workflow.objects.all()[0]
+        table_name = workflow.get_data_frame_table_name()
+
+        chunks = list(pandas.load_table_chunks(table_name, 3, ['key']))
+        for idx, chunk in enumerate(chunks):
+            # The chunk in the middle has only nulls (float)
+            chunk['text1'] = float('nan') if idx == 1 else 'new text'
+        pandas.store_dataframe_chunks(chunks, workflow, 'key')
+
+        df_after = pandas.load_table(table_name).set_index('key')
+        self.assertTrue(df_after.loc[chunks[1]['key'], 'text1'].isna().all())
+        for chunk in [chunks[0], chunks[2]]:
+            self.assertEqual(
+                list(df_after.loc[chunk['key'], 'text1']),
+                list(chunk['text1']))
+        self.assertEqual(
+            workflow.columns.get(name='text1').data_type,
+            'string')
+
+    def test_store_dataframe_chunks_types(self):
+        """Test that the types change with the values of later chunks."""
+        workflow = models.Workflow.objects.all()[0]
+        table_name = workflow.get_data_frame_table_name()
+
+        chunks = list(pandas.load_table_chunks(table_name, 3, ['key']))
+        # The first chunk has only null values or numbers
+        chunks[0]['nulls_text'] = float('nan')
+        chunks[0]['nulls_int'] = None
+        chunks[0]['mixed'] = chunks[0]['key']
+        for chunk in chunks[1:]:
+            chunk['nulls_text'] = 'text'
+            chunk['nulls_int'] = chunk['key'].astype(int)
+            chunk['mixed'] = 'text'
+        pandas.store_dataframe_chunks(chunks, workflow, 'key')
+
+        df_after = pandas.load_table(table_name).set_index('key')
+        self.assertTrue(
+            df_after.loc[chunks[0]['key'], 'nulls_text'].isna().all())
+        for cname, data_type in [
+            ('nulls_text', 'string'),
+            ('nulls_int', 'integer'),
+            ('mixed', 'string'),
+        ]:
+            self.assertEqual(
+                workflow.columns.get(name=cname).data_type,
+                data_type)
+            for chunk in chunks[1:]:
+                self.assertEqual(
+                    list(df_after.loc[chunk['key'], cname]),
+                    list(chunk[cname]))
+
 
 class FormulaEvaluation(tests.OnTaskTestCase):
     skel = {
@@ -166,6 +384,17 @@ class FormulaEvaluation(tests.OnTaskTestCase):
         self.skel['rules'][0]['value'] = value
         return self.skel
 
+    def evaluate_and_compare(self, given_variables):
+        """Evaluate the skel formula and check the compiled version."""
+        result = formula.evaluate(
+            self.skel,
+            formula.EVAL_EXP,
+            given_variables)
+        self.assertEqual(
+            formula.compile_formula(self.skel)(given_variables),
+            result)
+        return result
+
     def do_operand(
         self,
         input_value,
@@ -175,24 +404,9 @@ class FormulaEvaluation(tests.OnTaskTestCase):
         value2,
         value3):
 
-        result1 = formula.evaluate(
-            self.set_skel(
-                input_value,
-                op_value.format(''),
-                type_value,
-                value1),
-            formula.EVAL_EXP,
-            {'variable': value2}
-        )
-        result2 = formula.evaluate(
-            self.set_skel(
-                input_value,
-                op_value.format(''),
-                type_value,
-                value1),
-            formula.EVAL_EXP,
-            {'variable': value3}
-        )
+        self.set_skel(input_value, op_value.format(''), type_value, value1)
+        result1 = self.evaluate_and_compare({'variable': value2})
+        result2 = self.evaluate_and_compare({'variable': value3})
 
         if op_value.endswith('null') or value2 is not None:
             # If value2 is not None, expect regular results
@@ -204,24 +418,13 @@ class FormulaEvaluation(tests.OnTaskTestCase):
         self.assertFalse(result2)
 
         if op_value.find('{0}') != -1:
-            result1 = formula.evaluate(
-                self.set_skel(
-                    input_value,
-                    op_value.format('not_'),
-                    type_value,
-                    value1),
-                formula.EVAL_EXP,
-                {'variable': value2}
-            )
-            result2 = formula.evaluate(
-                self.set_skel(
-                    input_value,
-                    op_value.format('not_'),
-                    type_value,
-                    value1),
-                formula.EVAL_EXP,
-                {'variable': value3}
-            )
+            self.set_skel(
+                input_value,
+                op_value.format('not_'),
+                type_value,
+                value1)
+            result1 = self.evaluate_and_compare({'variable': value2})
+            result2 = self.evaluate_and_compare({'variable': value3})
 
             self.assertFalse(result1)
             if op_value.endswith('null') or value3 is not None:
@@ -516,6 +719,109 @@ class FormulaEvaluation(tests.OnTaskTestCase):
             None,
             datetime.datetime(2018, 9, 15, 0, 3, 4))
 
+    def test_compiled_composition(self):
+        """Compiled formulas with nested clauses match the interpreter."""
+        composed = {
+            'condition': 'OR',
+            'not': True,
+            'rules': [
+                {
+                    'field': 'v1',
+                    'id': 'v1',
+                    'input': 'number',
+                    'operator': 'greater',
+                    'type': 'integer',
+                    'value': '3'},
+                {
+                    'condition': 'AND',
+                    'not': False,
+                    'rules': [
+                        {
+                            'field': 'v2',
+                            'id': 'v2',
+                            'input': 'text',
+                            'operator': 'contains',
+                            'type': 'string',
+                            'value': 'xx'},
+                        {
+                            'field': 'v3',
+                            'id': 'v3',
+                            'input': 'text',
+                            'operator': 'is_null',
+                            'type': 'string',
+                            'value': None}],
+                    'valid': True}],
+            'valid': True}
+        compiled = formula.compile_formula(composed)
+
+        for v1, v2, v3 in [
+            (4, 'axxb', None),
+            (2, 'axxb', None),
+            (2, 'ab', None),
+            (None, None, 'text'),
+        ]:
+            given = {'v1': v1, 'v2': v2, 'v3': v3}
+            self.assertEqual(
+                compiled(given),
+                formula.evaluate(composed, formula.EVAL_EXP, given))
+
+        # Missing variables raise the same exception
+        with self.assertRaises(OnTaskException):
+            formula.evaluate(composed, formula.EVAL_EXP, {'v1': 4})
+        with self.assertRaises(OnTaskException):
+            compiled({'v1': 4})
+
+    def test_eval_row_sql(self):
+        """Conditions evaluated by the DB match the Python evaluation."""
+        df = pd.DataFrame(
+            [(1, 2.0, True, 'xxx', datetime.datetime(2018, 1, 1, 0, 0, 0)),
+             (2, 3.0, False, '', datetime.datetime(2018, 1, 2, 0, 0, 0)),
+             (3, 4.0, True, '500', datetime.datetime(2018, 1, 3, 0, 0, 0)),
+             (4, 5.0, False, '50%a_b', datetime.datetime(2018, 1, 4, 0, 0, 0)),
+             (5, 6.0, True, 'axb', datetime.datetime(2018, 1, 5, 0, 0, 0)),
+             (None, None, None, None, None)],
+            columns=self.test_columns)
+        pandas.store_table(df, self.test_table)
+
+        formulas = []
+        for op_value, type_value, value in [
+            ('equal', 'integer', '1'),
+            ('not_equal', 'integer', '1'),
+            ('not_equal', 'string', 'xxx'),
+            ('not_begins_with', 'string', 'x'),
+            ('not_contains', 'string', 'x'),
+            ('not_ends_with', 'string', 'x'),
+            # Wildcards in LIKE are matched literally
+            ('begins_with', 'string', '50%'),
+            ('contains', 'string', 'a_b'),
+            ('ends_with', 'string', '%a_b'),
+            ('is_empty', 'string', None),
+            ('is_not_empty', 'string', None),
+            ('is_null', 'double', None),
+            ('greater', 'double', '2.5'),
+            ('not_between', 'integer', ['0', '1']),
+        ]:
+            self.set_skel(
+                'text',
+                op_value,
+                type_value,
+                value,
+                'v_' + type_value)
+            self.skel['not'] = op_value == 'is_null'
+            formulas.append(json.loads(json.dumps(self.skel)))
+        self.skel['not'] = False
+
+        cursor = sql.get_rows(self.test_table, condition_formulas=formulas)
+        for row in cursor:
+            row_values = {cname: row[cname] for cname in self.test_columns}
+            for idx, cond_formula in enumerate(formulas):
+                self.assertEqual(
+                    row[sql.CONDITION_COLUMN_NAME.format(idx)],
+                    formula.evaluate(
+                        cond_formula,
+                        formula.EVAL_EXP,
+                        row_values))
+
     def test_eval_sql(self):
 
         # Create the dataframe with the variables
@@ -696,6 +1002,27 @@ class ConditionSetEvaluation(tests.OnTaskTestCase):
 
             assert cond_eval1 == cond_eval2
 
+    def test_schedule_condition_counts(self):
+        """Test that the counts are marked as pending and recalculated."""
+        self.action = models.Action.objects.get(name='Test action 2')
+        self.action.update_n_rows_selected()
+        counts = {
+            cond.id: cond.n_rows_selected
+            for cond in self.action.conditions.all()}
+
+        # Tasks are executed eagerly, the counts are recalculated
+        services.schedule_condition_counts(self.action.workflow)
+        for cond in self.action.conditions.all():
+            self.assertEqual(cond.n_rows_selected, counts[cond.id])
+
+        # The count of the filter is obtained when needed
+        models.Condition.objects.filter(action=self.action).update(
+            n_rows_selected=-1)
+        self.action.refresh_from_db()
+        self.assertEqual(
+            self.action.get_rows_selected(),
+            counts[self.action.get_filter().id])
+
 
 class ConditionNameWithSymbols(tests.OnTaskTestCase):
     fixtures = ['symbols_in_condition_name']
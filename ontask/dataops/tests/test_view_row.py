@@ -26,6 +26,24 @@ class DataopsViewsRow(tests.OnTaskTestCase):
 
     workflow_name = 'Testing Eval Conditions'
 
+    def _check_condition_counts(self):
+        """Compare the condition counts with a full count."""
+        table_name = self.workflow.get_data_frame_table_name()
+        for action in self.workflow.actions.all():
+            filter_formula = action.get_filter_formula()
+            for cond in action.conditions.all():
+                cond_formula = cond.formula
+                if filter_formula and not cond.is_filter:
+                    cond_formula = {
+                        'condition': 'AND',
+                        'not': False,
+                        'rules': [filter_formula, cond.formula],
+                        'valid': True,
+                    }
+                self.assertEqual(
+                    cond.n_rows_selected,
+                    sql.get_num_rows(table_name, cond_formula))
+
     def test_row_create(self):
         """Test the view to filter items."""
         nrows = self.workflow.nrows
@@ -82,6 +100,9 @@ class DataopsViewsRow(tests.OnTaskTestCase):
         self.assertEqual(row_val['double1'], 22)
         self.assertEqual(row_val['double2'], 23)
 
+        # Condition counts are updated with the new row
+        self._check_condition_counts()
+
     def test_row_edit(self):
         """Test the view to filter items."""
         # Row edit (GET)
@@ -122,3 +143,6 @@ class DataopsViewsRow(tests.OnTaskTestCase):
         self.assertEqual(row_val['text2'], 'NEW TEXT 2')
         self.assertEqual(row_val['double1'], 111)
         self.assertEqual(row_val['double2'], 222)
+
+        # Condition counts are updated with the new values
+        self._check_condition_counts()
@@ -1,3 +1,44 @@
 # -*- coding: utf-8 -*-
 
-# Create your tests here.
+"""Test the log models and services."""
+import os
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+from ontask import models, tests
+
+
+class LogBufferTest(tests.OnTaskTestCase):
+    """Test the logs stored in bulk."""
+
+    fixtures = ['simple_email_action']
+    filename = os.path.join(
+        settings.BASE_DIR(),
+        'ontask',
+        'fixtures',
+        'simple_email_action.sql'
+    )
+
+    def test_log_buffer(self):
+        """Test that logs are stored in chunks and when leaving the block."""
+        user = get_user_model().objects.get(email='instructor01@bogus.com')
+        action = models.Action.objects.get(name='simple action')
+        n_logs = models.Log.objects.count()
+
+        with models.LogBuffer(3) as log_buffer:
+            for idx in range(5):
+                action.log(
+                    user,
+                    models.Log.ACTION_EMAIL_SENT,
+                    log_buffer=log_buffer,
+                    with_content=False,
+                    to_email='student{0}@bogus.com'.format(idx))
+            # First chunk stored, two logs pending
+            self.assertEqual(models.Log.objects.count(), n_logs + 3)
+
+        self.assertEqual(models.Log.objects.count(), n_logs + 5)
+        log_item = models.Log.objects.filter(
+            name=models.Log.ACTION_EMAIL_SENT).last()
+        self.assertNotIn('content', log_item.payload)
+        self.assertEqual(log_item.workflow, action.workflow)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""Command to measure the rendering speed of a personalized action."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from ontask import models
+from ontask.action.evaluate import (
+    ActionEvaluationPlan, clear_template_cache, render_action_template,
+)
+
+
+class Command(BaseCommand):
+    """Command to measure the rendering speed of a personalized action.
+
+    The text of the action is rendered for all the rows selected by the
+    action, first compiling the template for every row (no cache) and then
+    reusing the compiled template. The result is shown in rows/sec.
+    """
+
+    def add_arguments(self, parser):
+        """Parse the command arguments."""
+        parser.add_argument(
+            '-a',
+            help='Action ID')
+
+        parser.add_argument(
+            '-r',
+            '--repeat',
+            type=int,
+            default=1,
+            help='Number of times the rows are rendered')
+
+    def _render_rows(self, action, contexts, repeat, use_cache) -> float:
+        """Render the action for all contexts and return the rows/sec."""
+        clear_template_cache(action.id)
+        start = time.perf_counter()
+        for __ in range(repeat):
+            for context in contexts:
+                if not use_cache:
+                    clear_template_cache(action.id)
+                render_action_template(
+                    action.text_content,
+                    context,
+                    action,
+                    translated=True)
+        elapsed = time.perf_counter() - start
+        return len(contexts) * repeat / elapsed if elapsed else 0
+
+    def handle(self, *args, **options):
+        """Render the action with and without the template cache."""
+        action = models.Action.objects.filter(pk=options['a']).first()
+        if not action or not action.is_out or not action.text_content:
+            self.stdout.write(self.style.ERROR(
+                'There is no personalized action with the given ID',
+            ))
+            return
+
+        # Contexts are calculated once, only rendering is measured
+        plan = ActionEvaluationPlan(action)
+        rows = plan.get_rows()
+        contexts = [plan.get_db_row_context(row) for row in rows]
+        rows.close()
+        if not contexts:
+            self.stdout.write(self.style.ERROR('The action selects no rows'))
+            return
+
+        repeat = max(options['repeat'], 1)
+        no_cache = self._render_rows(action, contexts, repeat, False)
+        cache = self._render_rows(action, contexts, repeat, True)
+
+        self.stdout.write('Rows: {0}'.format(len(contexts) * repeat))
+        self.stdout.write('Without template cache: {0:.1f} rows/sec'.format(
+            no_cache))
+        self.stdout.write('With template cache: {0:.1f} rows/sec'.format(
+            cache))
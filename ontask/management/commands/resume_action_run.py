@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+"""Command to resume an interrupted execution of an email action."""
+from django.core.management.base import BaseCommand
+
+from ontask import models, tasks
+
+
+class Command(BaseCommand):
+    """Command to resume an interrupted execution of an email action.
+
+    The execution is submitted again with the same log. The recipients
+    recorded in its checkpoints as delivered are excluded.
+    """
+
+    def add_arguments(self, parser):
+        """Parse the command arguments."""
+        parser.add_argument(
+            '-l',
+            help='ID of the log of the execution')
+
+    def handle(self, *args, **options):
+        """Submit the execution again."""
+        log_item = models.Log.objects.filter(
+            pk=options['l'],
+            name=models.Log.ACTION_RUN_PERSONALIZED_EMAIL,
+        ).first()
+        if not log_item:
+            self.stdout.write(self.style.ERROR(
+                'There is no email action execution with the given ID',
+            ))
+            return
+
+        if log_item.payload.get('status') == 'Finished':
+            self.stdout.write(self.style.ERROR(
+                'The execution has already finished',
+            ))
+            return
+
+        self.stdout.write('Resuming after {0} messages'.format(
+            len(models.RunCheckpoint.get_items(log_item))))
+
+        # The log payload contains the payload of the execution
+        tasks.execute_operation.delay(
+            log_item.name,
+            user_id=log_item.user.id,
+            log_id=log_item.id,
+            workflow_id=log_item.workflow.id,
+            action_id=log_item.payload['id'],
+            payload=log_item.payload)
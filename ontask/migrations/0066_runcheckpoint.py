@@ -0,0 +1,27 @@
+# Generated by Django 2.2.6 on 2020-01-20 10:12
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ontask', '0065_auto_20191201_1208'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('items', django.contrib.postgres.fields.jsonb.JSONField(blank=True, default=list, verbose_name='items')),
+                ('log', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='ontask.Log')),
+            ],
+            options={
+                'ordering': ['created'],
+            },
+        ),
+    ]
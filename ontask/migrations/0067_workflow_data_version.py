@@ -0,0 +1,18 @@
+# Generated by Django 2.2.6 on 2020-02-10 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ontask', '0066_runcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflow',
+            name='data_version',
+            field=models.BigIntegerField(blank=True, default=0, verbose_name='data version'),
+        ),
+    ]
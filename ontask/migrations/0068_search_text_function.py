@@ -0,0 +1,21 @@
+# Generated by Django 2.2.6 on 2020-02-17 11:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ontask', '0067_workflow_data_version'),
+    ]
+
+    operations = [
+        # Text of a datetime in the search index of the tables (the result is
+        # the same as CAST AS TEXT in the connections, that use UTC)
+        migrations.RunSQL(
+            "CREATE OR REPLACE FUNCTION ontask_search_text(timestamptz) "
+            "RETURNS text AS $$ SELECT CAST($1 AS TEXT) $$ "
+            "LANGUAGE sql IMMUTABLE SET TimeZone = 'UTC' "
+            "SET DateStyle = 'ISO, MDY'",
+            "DROP FUNCTION IF EXISTS ontask_search_text(timestamptz)"),
+    ]
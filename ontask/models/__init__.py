@@ -4,12 +4,13 @@
 from ontask.models.action import Action, VAR_USE_RES
 from ontask.models.actioncolumnconditiontuple import ActionColumnConditionTuple
 from ontask.models.athenaconnection import AthenaConnection
+from ontask.models.checkpoint import RunCheckpoint
 from ontask.models.column import Column
 from ontask.models.common import (
     CHAR_FIELD_LONG_SIZE, CHAR_FIELD_MID_SIZE, CHAR_FIELD_SMALL_SIZE, Owner)
 from ontask.models.condition import Condition
 from ontask.models.connection import Connection
-from ontask.models.logs import Log
+from ontask.models.logs import Log, LogBuffer
 from ontask.models.oauth import OAuthUserToken
 from ontask.models.plugin import Plugin
 from ontask.models.profiles import Profile
@@ -157,6 +157,10 @@ class ActionBase(NameAndDescription, CreateModifyFields):
         if not action_filter:
             return self.workflow.nrows
 
+        if action_filter.n_rows_selected < 0:
+            # The count is pending, obtain the value now
+            action_filter.update_n_rows_selected()
+
         return action_filter.n_rows_selected
 
     def get_row_all_false_count(self):
@@ -430,15 +434,25 @@ class Action(ActionDataOut, ActionDataIn):
             ),
         )
 
-    def log(self, user, operation_type: str, **kwargs):
-        """Log the operation with the object."""
+    def log(
+        self,
+        user,
+        operation_type: str,
+        log_buffer=None,
+        with_content: bool = True,
+        **kwargs,
+    ):
+        """Log the operation with the object.
+
+        If log_buffer is given, the log is stored in bulk (see LogBuffer).
+        """
         payload = {
             'id': self.id,
             'name': self.name,
             'type': self.action_type,
             'workflow_id': self.workflow.id}
 
-        if self.text_content:
+        if self.text_content and with_content:
             payload['content'] = self.text_content
 
         if self.target_url:
@@ -449,7 +463,8 @@ class Action(ActionDataOut, ActionDataIn):
             user,
             operation_type,
             self.workflow,
-            payload)
+            payload,
+            log_buffer=log_buffer)
 
     class Meta:
         """Define uniqueness with name and workflow. Order by name."""
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""Checkpoints of the items processed by an action execution.
+
+Every object stores a batch of items (for example, the email addresses of
+the messages delivered) processed by the execution recorded in a log. If the
+execution is interrupted, it resumes by excluding the items stored in its
+checkpoints.
+"""
+from typing import List
+
+from django.contrib.postgres.fields import JSONField
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+
+
+class RunCheckpoint(models.Model):
+    """Batch of items processed by an action execution.
+
+    @DynamicAttrs
+    """
+
+    log = models.ForeignKey(
+        'Log',
+        db_index=True,
+        on_delete=models.CASCADE,
+        null=False,
+        blank=False,
+        related_name='checkpoints')
+
+    created = models.DateTimeField(auto_now_add=True, null=False, blank=False)
+
+    # List of items processed in the batch
+    items = JSONField(
+        default=list,
+        blank=True,
+        null=False,
+        verbose_name=_('items'))
+
+    @classmethod
+    def get_items(cls, log) -> List:
+        """Get all the items processed in the execution of the log.
+
+        :param log: Log of the execution
+        :return: List of items in all the checkpoints
+        """
+        return [
+            item
+            for items in cls.objects.filter(log=log).values_list(
+                'items',
+                flat=True)
+            for item in items]
+
+    def __str__(self):
+        """Render string."""
+        return '{0} ({1} items)'.format(self.log_id, len(self.items))
+
+    class Meta:
+        """Order by creation."""
+
+        ordering = ['created']
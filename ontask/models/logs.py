@@ -2,7 +2,7 @@
 
 """Model for OnTask Logs."""
 import json
-from typing import Dict
+from typing import Dict, List, Optional
 
 from django.contrib.postgres.fields import JSONField
 from django.db import models
@@ -12,6 +12,46 @@ from django.utils.translation import ugettext_lazy as _
 from ontask.models.common import CHAR_FIELD_MID_SIZE, Owner
 
 
+class LogBuffer:
+    """Accumulate logs to store them with bulk_create.
+
+    The logs are stored every chunk_size logs, when flush is invoked, and
+    when leaving the with block:
+
+    with LogBuffer(chunk_size) as log_buffer:
+        for item in items:
+            action.log(user, name, log_buffer=log_buffer, **payload)
+    """
+
+    def __init__(self, chunk_size: int):
+        """Initialize the list of pending logs.
+
+        :param chunk_size: Number of logs stored at a time
+        """
+        self.chunk_size = max(chunk_size, 1)
+        self.log_items: List['Log'] = []
+
+    def __enter__(self) -> 'LogBuffer':
+        """Use the buffer in a with statement."""
+        return self
+
+    def __exit__(self, *args):
+        """Store the pending logs when leaving the with statement."""
+        self.flush()
+
+    def append(self, log_item: 'Log'):
+        """Add a log and store the chunk if full."""
+        self.log_items.append(log_item)
+        if len(self.log_items) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Store the pending logs."""
+        if self.log_items:
+            Log.objects.bulk_create(self.log_items)
+            self.log_items = []
+
+
 class LogManager(models.Manager):
     """Manager to create elements with the right parameters."""
 
@@ -20,9 +60,23 @@ class LogManager(models.Manager):
         user,
         name: str,
         workflow,
-        payload: Dict
+        payload: Dict,
+        log_buffer: Optional[LogBuffer] = None,
     ) -> 'Log':
-        """Handle user, name, workflow and payload."""
+        """Handle user, name, workflow and payload.
+
+        If a log buffer is given, the log is stored when the buffer is
+        flushed, and it has no id until then.
+        """
+        if log_buffer is not None:
+            log_item = self.model(
+                user=user,
+                name=name,
+                workflow=workflow,
+                payload=payload)
+            log_buffer.append(log_item)
+            return log_item
+
         log_item = self.create(
             user=user,
             name=name,
@@ -74,6 +74,13 @@ class Workflow(NameAndDescription, CreateModifyFields):
         default='',
         blank=True)
 
+    # Version of the data in the table (increased by every modification)
+    data_version = models.BigIntegerField(
+        verbose_name=_('data version'),
+        default=0,
+        null=False,
+        blank=True)
+
     # The key of the session locking this workflow (to allow sharing
     # workflows among users
     session_key = models.CharField(
@@ -120,6 +127,23 @@ class Workflow(NameAndDescription, CreateModifyFields):
         null=False,
         blank=False)
 
+    def save(self, *args, **kwargs):
+        """Save the workflow without overwriting the data version.
+
+        The version is increased in the DB by the functions modifying the
+        table, so the value in this object may be outdated.
+        """
+        if (
+            not self._state.adding
+            and not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'data_version']
+        super().save(*args, **kwargs)
+
     @classmethod
     def unlock_workflow_by_id(cls, wid: int):
         """Remove the session_key from the workflow with given id.
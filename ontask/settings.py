@@ -68,6 +68,9 @@ PLUGIN_DIRECTORY = getattr(
     'DATAOPS_PLUGIN_DIRECTORY',
     os.path.join(settings.BASE_DIR, 'plugins'))
 
+# Number of rows given to the plugins that process the data in chunks
+PLUGIN_CHUNK_SIZE = getattr(settings, 'DATAOPS_PLUGIN_CHUNK_SIZE', 10000)
+
 # Get the plugin path in the sys.path
 plugin_folder = PLUGIN_DIRECTORY
 if not os.path.isabs(plugin_folder):
@@ -82,6 +85,10 @@ if plugin_folder not in sys.path:
 ############
 MAX_LOG_LIST_SIZE = getattr(settings, 'LOGS_MAX_LIST_SIZE', 200)
 
+LOGS_BULK_SIZE = getattr(settings, 'LOGS_BULK_SIZE', 500)
+
+LOGS_EMAIL_BODY = getattr(settings, 'LOGS_EMAIL_BODY', True)
+
 ############
 #
 # MISCELLANEOUS
@@ -141,6 +148,11 @@ if 'siteprefs' in settings.INSTALLED_APPS:
                     verbose_name=_('Folder where code packages are stored'),
                     static=False,
                     field=models.CharField(max_length=2048, blank=True)),
+                pref(
+                    PLUGIN_CHUNK_SIZE,
+                    verbose_name=_('Number of rows per chunk for plugins'),
+                    static=False,
+                    field=models.IntegerField(blank=True)),
             ),
             static=False),
         pref_group(
@@ -151,6 +163,16 @@ if 'siteprefs' in settings.INSTALLED_APPS:
                     verbose_name=_('Maximum number of logs shown to the user'),
                     static=False,
                     field=models.IntegerField(blank=True)),
+                pref(
+                    LOGS_BULK_SIZE,
+                    verbose_name=_('Number of logs stored at a time in bulk'),
+                    static=False,
+                    field=models.IntegerField(blank=True)),
+                pref(
+                    LOGS_EMAIL_BODY,
+                    verbose_name=_('Store the body of every email sent'),
+                    static=False,
+                    field=models.BooleanField(blank=True)),
             ),
             static=False),
         pref_group(
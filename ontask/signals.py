@@ -8,6 +8,7 @@ from django.dispatch.dispatcher import receiver
 from django.utils.translation import ugettext_lazy as _
 
 from ontask import LOGGER, models
+from ontask.action.evaluate import clear_template_cache
 from ontask.dataops import sql
 from ontask.scheduler import services
 
@@ -41,6 +42,21 @@ def delete_data_frame_table(sender, **kwargs):
         sql.delete_table(instance.get_data_frame_table_name())
 
 
+@receiver(post_save, sender=models.Action)
+@receiver(pre_delete, sender=models.Action)
+def delete_action_templates(sender, **kwargs):
+    """Discard the compiled templates when the action changes.
+
+    Covers the text modified by set_text_content and rename_variable.
+    """
+    del sender
+    instance = kwargs.get('instance')
+    if not instance:
+        return
+
+    clear_template_cache(instance.id)
+
+
 @receiver(post_save, sender=models.ScheduledOperation)
 def create_scheduled_task(sender, **kwargs):
     """Create the task in django_celery_beat for every scheduled operation."""
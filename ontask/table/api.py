@@ -14,6 +14,7 @@ from rest_framework.views import APIView
 from ontask import OnTaskDataFrameNoKey, models
 from ontask.core import UserIsInstructor, get_workflow
 from ontask.dataops import pandas
+from ontask.dataops.services import schedule_condition_counts
 from ontask.table import serializers
 
 
@@ -68,8 +69,7 @@ class TableBasicOps(APIView):
                 status=status.HTTP_400_BAD_REQUEST)
 
         # Update all the counters in the conditions
-        for action in workflow.actions.all():
-            action.update_n_rows_selected()
+        schedule_condition_counts(workflow)
 
         return Response(None, status=status.HTTP_201_CREATED)
 
@@ -81,14 +81,68 @@ class TableBasicOps(APIView):
         format=None,
         workflow: Optional[models.Workflow] = None,
     ) -> HttpResponse:
-        """Retrieve the existing data frame."""
-        del request, wid, format
+        """Retrieve the existing data frame.
+
+        The optional query parameters select a subset of the table: columns
+        (may be repeated) with the names of the columns to include, and limit
+        and offset with the page of rows (ordered by the first key column).
+        """
+        del wid, format
+        columns = request.query_params.getlist('columns') or None
+        if columns and not set(columns).issubset(
+            col.name for col in workflow.columns.all()
+        ):
+            return Response(
+                _('Incorrect column names in the request'),
+                status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = request.query_params.get('limit')
+            if limit is not None:
+                limit = int(limit)
+            offset = int(request.query_params.get('offset', 0))
+            if offset < 0 or (limit is not None and limit < 0):
+                raise ValueError
+        except ValueError:
+            return Response(
+                _('Incorrect limit or offset in the request'),
+                status=status.HTTP_400_BAD_REQUEST)
+
+        order_by = None
+        if limit is not None or offset:
+            order_by = next(
+                (col.name for col in workflow.columns.all() if col.is_key),
+                None)
+
         serializer = self.serializer_class(
             {
                 'data_frame': pandas.load_table(
-                    workflow.get_data_frame_table_name())})
+                    workflow.get_data_frame_table_name(),
+                    columns=columns,
+                    order_by=order_by,
+                    limit=limit,
+                    offset=offset)})
         return Response(serializer.data)
 
+    @method_decorator(get_workflow(pf_related='columns'))
+    def head(
+        self,
+        request: HttpRequest,
+        wid: int,
+        format=None,
+        workflow: Optional[models.Workflow] = None,
+    ) -> HttpResponse:
+        """Get the number of rows and columns without loading the table.
+
+        The values are in the headers X-OnTask-Rows and X-OnTask-Columns
+        (both are zero if the workflow has no table).
+        """
+        del request, wid, format
+        response = Response(status=status.HTTP_200_OK)
+        response['X-OnTask-Rows'] = workflow.nrows
+        response['X-OnTask-Columns'] = workflow.ncols
+        return response
+
     @method_decorator(get_workflow(pf_related='columns'))
     def post(
         self,
@@ -98,7 +152,7 @@ class TableBasicOps(APIView):
         workflow: Optional[models.Workflow] = None,
     ) -> HttpResponse:
         """Create a new data frame."""
-        if pandas.load_table(workflow.get_data_frame_table_name()) is not None:
+        if workflow.has_table():
             raise APIException(
                 _('Post request requires workflow without a table'))
         return self.override(
@@ -144,7 +198,11 @@ class TableJSONOps(TableBasicOps):
 
     - get: Get all the data in the table corresponding to the workflow (no
     matter how big). If the workflow has no data, an empty dictionary is
-    returned.
+    returned. The query parameters columns, limit and offset select a subset
+    of the columns and a page of rows.
+
+    - head: Get the number of rows and columns of the table in the headers
+    X-OnTask-Rows and X-OnTask-Columns.
 
     - post: Upload a new table to a workflow without. If there is a table
     already, the operation will be rejected (consider deleting the table
@@ -200,7 +258,12 @@ class TablePandasOps(TableBasicOps):
 
     get: Get all the data in the table corresponding to the workflow (no
     matter how big) as a Base64 encoded string of the binary data frame. If
-    the workflow has no data, an empty dictionary is returned.
+    the workflow has no data, an empty dictionary is returned. The query
+    parameters columns, limit and offset select a subset of the columns and
+    a page of rows.
+
+    head: Get the number of rows and columns of the table in the headers
+    X-OnTask-Rows and X-OnTask-Columns.
 
     post: Upload a new table (Base64 encoded of a binary data frame) to a
     workflow without. If there is a table already, the operation will be
@@ -298,6 +361,8 @@ class TableBasicMerge(APIView):
             raise APIException(
                 _('Unable to perform merge operation: {0}').format(str(exc)))
 
+        schedule_condition_counts(workflow)
+
         # Merge went through.
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
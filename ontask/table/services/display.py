@@ -2,24 +2,59 @@
 
 """Functions to support the display of a table."""
 from builtins import next, str
-from datetime import datetime
 from typing import Any, Optional
 
 from django import http
-from django.conf import settings
 from django.shortcuts import render, reverse
 from django.template.loader import render_to_string
-from django.utils.html import escape, urlencode
+from django.utils.html import urlencode
 from django.utils.translation import ugettext_lazy as _
-from pytz import timezone
 
 from ontask import models
 from ontask.core import DataTablesServerSidePaging
 from ontask.dataops import sql
+from ontask.dataops.services import RowConditionCounts, get_search_count
 from ontask.table.services.errors import OnTaskTableNoKeyValueError
 from ontask.visualizations.plotly import PlotlyHandler
 
 
+# Placeholder in the operations template replaced by the (encoded) key value
+ROW_OPS_KEY_VALUE = '__ONTASK_KEY_VALUE__'
+
+
+def _render_row_ops_template(columns, view: Optional[models.View]) -> str:
+    """Render the operations of a row with a placeholder for the key value.
+
+    The template is rendered once per page and the browser replaces the
+    placeholder with the key value of each row.
+
+    :param columns: Columns to display in the page
+    :param view: View used to render the table (or None)
+    :return: HTML string
+    """
+    key_name = next((col.name for col in columns if col.is_key), None)
+    if view:
+        stat_url = reverse('table:stat_table_view', kwargs={'pk': view.id})
+    else:
+        stat_url = reverse('table:stat_table')
+
+    # The placeholder is not modified by urlencode
+    return render_to_string(
+        'table/includes/partial_row_ops.html',
+        {
+            'stat_url': stat_url + '?{0}'.format(urlencode(
+                {'key': key_name, 'val': ROW_OPS_KEY_VALUE},
+            )),
+            'edit_url': reverse('dataops:rowupdate') + '?{0}'.format(
+                urlencode({'k': key_name, 'v': ROW_OPS_KEY_VALUE}),
+            ),
+            'delete_key': '?{0}'.format(urlencode(
+                {'key': key_name, 'value': ROW_OPS_KEY_VALUE},
+            )),
+        },
+    )
+
+
 def render_table_display_page(
     request: http.HttpRequest,
     workflow: models.Workflow,
@@ -57,6 +92,10 @@ def render_table_display_page(
         context['columns_datatables'] = [{'data': 'Operations'}] + [
             {'data': col.name.replace('.', '\\.')} for col in columns]
         context['columns_show_stat'] = workflow.columns.filter(is_key=False)
+        context['row_ops_template'] = _render_row_ops_template(
+            columns,
+            view)
+        context['row_ops_key_value'] = ROW_OPS_KEY_VALUE
     else:
         context['columns'] = None
         context['columns_datatables'] = []
@@ -73,7 +112,6 @@ def render_table_display_server_side(
     workflow,
     columns,
     formula,
-    view_id=None,
 ) -> http.JsonResponse:
     """Render the appropriate subset of the data table.
 
@@ -84,7 +122,6 @@ def render_table_display_server_side(
     :param workflow: workflow object
     :param columns: Subset of columns to consider
     :param formula: Expression to filter rows
-    :param view_id: ID of the view restricting the display (if any)
     :return: JSON response
     """
     # Check that the GET parameter are correctly given
@@ -103,6 +140,12 @@ def render_table_display_server_side(
         # The first column is ops
         order_col_name = column_names[dt_page.order_col - 1]
 
+    # Find the first key column
+    key_name, key_idx = next(
+        ((col.name, idx) for idx, col in enumerate(columns) if col.is_key),
+        None)
+
+    # Get only the rows in the page (length is -1 to show all)
     qs = sql.search_table(
         workflow.get_data_frame_table_name(),
         dt_page.search_value,
@@ -110,68 +153,29 @@ def render_table_display_server_side(
         filter_formula=formula,
         order_col_name=order_col_name,
         order_asc=dt_page.order_dir == 'asc',
+        key_name=key_name,
+        limit=dt_page.length if dt_page.length >= 0 else None,
+        offset=dt_page.start,
+        datetime_columns=[
+            col.name for col in columns if col.data_type == 'datetime'],
     )
 
-    # Find the first key column
-    key_name, key_idx = next(
-        ((col.name, idx) for idx, col in enumerate(columns) if col.is_key),
-        None)
-    key_name = escape(key_name)
-
-    # Post processing + adding operation columns and performing the search
+    # The operations column only carries the key value, the buttons are
+    # produced in the browser from the template in the page.
     final_qs = []
-    nitems = 0  # For counting the number of elements in the result
-    for row in qs[dt_page.start:dt_page.start + dt_page.length]:
-        nitems += 1
-        new_element = {}
-        if view_id:
-            stat_url = reverse(
-                'table:stat_table_view',
-                kwargs={'pk': view_id})
-        else:
-            stat_url = reverse('table:stat_table')
-
-        # Transform key name and key value into escaped strings
-        key_value = escape(row[key_idx])
-        ops_string = render_to_string(
-            'table/includes/partial_row_ops.html',
-            {
-                'stat_url': stat_url + '?{0}'.format(urlencode(
-                    {'key': key_name, 'val': key_value},
-                )),
-                'edit_url': reverse('dataops:rowupdate') + '?{0}'.format(
-                    urlencode(
-                        {'k': key_name,
-                         'v': key_value},
-                    )),
-                'delete_key': '?{0}'.format(urlencode(
-                    {'key': key_name, 'value': key_value},
-                )),
-                'view_id': view_id,
-            },
-        )
-
-        # Element to add to the final queryset
-        new_element['Operations'] = ops_string
-        column_values = [
-            rval.astimezone(timezone(
-                settings.TIME_ZONE,
-            )).strftime('%Y-%m-%d %H:%M:%S  %z')
-            if isinstance(rval, datetime) else rval for rval in list(row)
-        ]
-        new_element.update(zip(column_names, column_values))
-
-        # Create the list of elements to display and add it ot the final QS
+    for row in qs:
+        new_element = {'Operations': row[key_idx]}
+        new_element.update(zip(column_names, row))
         final_qs.append(new_element)
 
-        if nitems == dt_page.length:
-            # We reached the number or requested elements, abandon.
-            break
-
     return http.JsonResponse({
         'draw': dt_page.draw,
         'recordsTotal': workflow.nrows,
-        'recordsFiltered': len(qs),
+        'recordsFiltered': get_search_count(
+            workflow,
+            dt_page.search_value,
+            column_names,
+            formula),
         'data': final_qs,
     })
 
@@ -196,13 +200,12 @@ def perform_row_delete(
         # The response will require going to the table display anyway
 
     # Proceed to delete the row
+    condition_counts = RowConditionCounts(workflow, row_key, row_value)
     sql.delete_row(workflow.get_data_frame_table_name(), (row_key, row_value))
 
     # Update rowcount
     workflow.nrows -= 1
     workflow.save()
 
-    # Update the value of all the conditions in the actions
-    # TODO: Explore how to do this asynchronously (or lazy)
-    for action in workflow.actions.all():
-        action.update_n_rows_selected()
+    # Remove the row from the counts of the conditions
+    condition_counts.update()
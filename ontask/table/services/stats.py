@@ -1,28 +1,35 @@
 # -*- coding: utf-8 -*-
 
 """Functions to support stats visualisation."""
+import hashlib
+import json
 from typing import Any, Dict, List, Optional, Tuple
 
 from django.utils.translation import ugettext as _
-from pandas import DataFrame
 
-from ontask import models
+from ontask import core, models
 from ontask.dataops import pandas, sql
-from ontask.visualizations.plotly import PlotlyBoxPlot, PlotlyColumnHistogram
+from ontask.visualizations.plotly import (
+    PlotlySummaryBoxPlot, PlotlySummaryHistogram,
+)
 
 VISUALIZATION_WIDTH = 600
 VISUALIZATION_HEIGHT = 400
 
+# Names of the column summaries and stats in the data cache
+STATS_SUMMARY_NAME = 'stats_summary_{0}'
+COLUMN_STATS_NAME = 'column_stats_{0}'
 
-def _get_df_and_columns(
+
+def _get_view_and_columns(
     workflow: models.Workflow,
     pk: int,
-) -> Optional[Tuple[DataFrame, List, models.View]]:
-    """Get the DF and the columns to process.
+) -> Optional[Tuple[List[models.Column], models.View]]:
+    """Get the view and the columns to process.
 
     :param workflow: Workflow object
     :param pk: Optional id for a view
-    :return: Tuple DataFrame, List of columns (None, None if error
+    :return: Tuple List of columns, View (None if error)
     """
     # If a view is given, filter the columns
     view = None
@@ -32,24 +39,53 @@ def _get_df_and_columns(
             # View not found. Redirect to workflow detail
             return None
         columns_to_view = view.columns.filter(is_key=False)
-
-        df = pandas.load_table(
-            workflow.get_data_frame_table_name(),
-            [col.name for col in columns_to_view],
-            view.formula)
     else:
-        # No view given, fetch the entire data frame
+        # No view given, consider all the columns
         columns_to_view = workflow.columns.filter(is_key=False)
-        df = pandas.load_table(
-            workflow.get_data_frame_table_name(),
-            [col.name for col in columns_to_view])
 
-    return df, columns_to_view, view
+    return list(columns_to_view), view
+
+
+def _get_column_summaries(
+    workflow: models.Workflow,
+    columns: List[models.Column],
+    view: Optional[models.View],
+) -> Dict[str, Optional[Dict]]:
+    """Get the summaries of the columns (stored in the data cache).
+
+    The summaries are calculated in the DB once for every version of the
+    data, and reused by all the pages showing the stats of the table or of a
+    row.
+
+    :param workflow: Workflow object
+    :param columns: Columns to summarize
+    :param view: Optional view to select the rows
+    :return: Dictionary column name: summary (see get_column_summary)
+    """
+    column_names = [col.name for col in columns]
+    formula = view.formula if view else None
+
+    def calculate_summaries():
+        """Summarize the columns in the DB."""
+        return {
+            col.name: sql.get_column_summary(
+                workflow.get_data_frame_table_name(),
+                col.name,
+                col.data_type,
+                formula)
+            for col in columns}
+
+    return core.get_or_set_data_cache(
+        workflow,
+        STATS_SUMMARY_NAME.format(hashlib.md5(json.dumps(
+            [column_names, formula],
+            sort_keys=True).encode()).hexdigest()),
+        calculate_summaries)
 
 
 def _get_column_visualisations(
     column: models.Column,
-    col_data: List,
+    summary: Dict,
     vis_scripts: List,
     viz_id: Optional[str] = '',
     single_val: Optional[str] = None,
@@ -57,13 +93,13 @@ def _get_column_visualisations(
 ) -> List[str]:
     """Create a column visualization.
 
-    Given a column object and a dataframe, create the visualisations for this
+    Given a column object and its summary, create the visualisations for this
     column. The list vis_scripts is modified to include the scripts to
     include in the HTML page. If single_val is not None, its position in the
     visualisation is marked (place individual value in population measure.
 
     :param column: Column element to visualize
-    :param col_data: Data in the column (extracted from the data frame)
+    :param summary: Summary of the column (see get_column_summary)
     :param viz_id: String to use to label the visualization
     :param vis_scripts: Collection of visualisation scripts needed in HTML
     :param single_val: Mark a specific value (or None)
@@ -85,8 +121,8 @@ def _get_column_visualisations(
 
         if single_val is not None:
             context['individual_value'] = single_val
-        v1 = PlotlyBoxPlot(
-            data=col_data,
+        v1 = PlotlySummaryBoxPlot(
+            data=summary,
             context=context)
         v1.get_engine_scripts(vis_scripts)
         visualizations.append(v1)
@@ -98,8 +134,8 @@ def _get_column_visualisations(
 
     if single_val is not None:
         context['individual_value'] = single_val
-    v2 = PlotlyColumnHistogram(
-        data=col_data,
+    v2 = PlotlySummaryHistogram(
+        data=summary,
         context=context)
     v2.get_engine_scripts(vis_scripts)
     visualizations.append(v2)
@@ -118,19 +154,33 @@ def get_column_visualization_items(
     :return: Tuple stat_data with descriptive stats, visualization scripts and
     visualization HTML
     """
-    # Get the dataframe
-    df = pandas.load_table(workflow.get_data_frame_table_name(), [column.name])
+    def calculate_stats():
+        """Calculate the stats and the summary (computed by the DB)."""
+        table_name = workflow.get_data_frame_table_name()
+        df = pandas.load_table(table_name, [column.name])
+        return (
+            pandas.get_column_statistics(df[column.name]),
+            sql.get_column_summary(
+                table_name,
+                column.name,
+                column.data_type))
 
     # Extract the data to show at the top of the page
-    stat_data = pandas.get_column_statistics(df[column.name])
+    stat_data, summary = core.get_or_set_data_cache(
+        workflow,
+        COLUMN_STATS_NAME.format(
+            hashlib.md5(column.name.encode()).hexdigest()),
+        calculate_stats)
 
-    visualizations = _get_column_visualisations(
-        column,
-        df[[column.name]],
-        [],
-        context={
-            'style': 'width:100%; height:100%;' + 'display:inline-block;'},
-    )
+    visualizations = []
+    if summary:
+        visualizations = _get_column_visualisations(
+            column,
+            summary,
+            [],
+            context={
+                'style': 'width:100%; height:100%;' + 'display:inline-block;'},
+        )
 
     return stat_data, [], visualizations
 
@@ -143,17 +193,21 @@ def get_table_visualization_items(
 ) -> Optional[Tuple[str, Dict]]:
     """Get a tuple with a template, and a dictionary to visualize a table.
 
+    The visualizations are created with the summaries of the columns, so the
+    page for a row only needs to load the values in that row.
+
     :param workflow: Workflow being processed
     :param rowselect_key: Optional key name to select a row
     :param rowselect_val: Optional value to select a row
     :param pk: Primary key of a view (could be none)
     :return:
     """
-    # Get the data frame and the columns
-    df_col_view = _get_df_and_columns(workflow, pk)
-    if not df_col_view:
+    # Get the columns and their summaries
+    col_view = _get_view_and_columns(workflow, pk)
+    if not col_view:
         return None
-    df, columns_to_view, view = df_col_view
+    columns_to_view, view = col_view
+    summaries = _get_column_summaries(workflow, columns_to_view, view)
 
     if bool(rowselect_key):
         template = 'table/stat_row.html'
@@ -180,7 +234,8 @@ def get_table_visualization_items(
         visualizations.append(
             '<hr/><h4 class="text-center">' + column.name + '</h4>')
         # If all values are empty, no need to proceed
-        if all(not col_data for col_data in df[column.name]):
+        summary = summaries[column.name]
+        if not summary or summary['empty']:
             visualizations.append(
                 '<p>' + _('No values in this column') + '</p>')
             continue
@@ -193,7 +248,7 @@ def get_table_visualization_items(
 
         column_viz = _get_column_visualisations(
             column,
-            df[[column.name]],
+            summary,
             vis_scripts=vis_scripts,
             viz_id='column_{0}'.format(idx),
             single_val=row[column.name] if row else None,
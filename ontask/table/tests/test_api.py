@@ -123,6 +123,53 @@ class TableApiCreate(TableApiBase):
         # Compare both elements
         self.compare_tables(r_df, dframe)
 
+    def test_table_JSON_get_page(self):
+        # Get the only workflow in the fixture
+        workflow = models.Workflow.objects.all()[0]
+        dframe = pandas.load_table(workflow.get_data_frame_table_name())
+        key_name = workflow.columns.filter(is_key=True).first().name
+        dframe = dframe.sort_values(key_name)
+
+        # Get the table in pages of two rows and two columns
+        rows = []
+        for offset in range(0, workflow.nrows, 2):
+            response = self.client.get(
+                reverse('table:api_ops', kwargs={'wid': workflow.id}),
+                {
+                    'columns': [key_name, 'email'],
+                    'limit': 2,
+                    'offset': offset})
+            r_df = pd.DataFrame(response.data['data_frame'])
+            self.assertEqual(set(r_df.columns), {key_name, 'email'})
+            self.assertTrue(len(r_df) <= 2)
+            rows += list(r_df['email'])
+
+        self.assertEqual(rows, list(dframe['email']))
+
+        # Incorrect parameters
+        response = self.client.get(
+            reverse('table:api_ops', kwargs={'wid': workflow.id}),
+            {'columns': ['email', 'unknown']})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            reverse('table:api_pops', kwargs={'wid': workflow.id}),
+            {'limit': 'one'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_table_head(self):
+        # Get the only workflow in the fixture
+        workflow = models.Workflow.objects.all()[0]
+
+        response = self.client.head(
+            reverse('table:api_ops', kwargs={'wid': workflow.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            int(response['X-OnTask-Rows']),
+            workflow.nrows)
+        self.assertEqual(
+            int(response['X-OnTask-Columns']),
+            workflow.ncols)
+
     def test_table_try_JSON_overwrite(self):
         # Upload a table and try to overwrite an existing one (should fail)
 
@@ -2,6 +2,7 @@
 
 """Test the views for the scheduler pages."""
 import os
+from unittest import mock
 
 from django.conf import settings
 from rest_framework import status
@@ -73,3 +74,20 @@ class TableTestStatView(tests.OnTaskTestCase):
             {'pk': col.id},
             is_ajax=True)
         self.assertTrue(status.is_success(resp.status_code))
+
+    def test_stats_row_cached(self):
+        """Test that the row stats reuse the summaries of the table."""
+        resp = self.get_response('table:stat_table')
+        self.assertTrue(status.is_success(resp.status_code))
+
+        # The page for a row does not load the table
+        r_val = pandas.get_table_row_by_index(self.workflow, None, 1)
+        with mock.patch.object(pandas, 'load_table') as load_table:
+            resp = self.get_response(
+                'table:stat_table',
+                req_params={
+                    'key': 'email',
+                    'val': r_val['email']})
+            load_table.assert_not_called()
+        self.assertTrue(status.is_success(resp.status_code))
+        self.assertIn('Your value', str(resp.content))
@@ -1,15 +1,19 @@
 # -*- coding: utf-8 -*-
 
 """Test the views for the scheduler pages."""
+import json
 import os
 
 from django.conf import settings
 from django.urls import reverse
+import pandas as pd
+from pytz import timezone
 from rest_framework import status
 
 from ontask import tests
 from ontask.dataops import pandas
 from ontask.table import views
+from ontask.table.services import display
 
 
 class TableTestViewTableDisplay(tests.OnTaskTestCase):
@@ -110,3 +114,66 @@ class TableTestViewTableDisplay(tests.OnTaskTestCase):
                 'val': r_val['email']},
             is_ajax=True)
         self.assertTrue(status.is_success(resp.status_code))
+
+    def test_display_pages(self):
+        """Test that the pages of the table are obtained with the SQL query."""
+        nrows = self.workflow.nrows
+        rows = []
+        for start in range(0, nrows, 2):
+            resp = self.get_response(
+                'table:display_ss',
+                method='POST',
+                req_params={
+                    'draw': '1',
+                    'start': str(start),
+                    'length': '2',
+                    'order[0][column]': '1',
+                    'order[0][dir]': 'asc',
+                    'search[value]': ''},
+                is_ajax=True)
+            self.assertTrue(status.is_success(resp.status_code))
+            content = json.loads(resp.content)
+            self.assertEqual(content['recordsFiltered'], nrows)
+            self.assertTrue(len(content['data']) <= 2)
+            rows += [row['email'] for row in content['data']]
+
+        # All the rows appear once
+        self.assertEqual(len(rows), nrows)
+        self.assertEqual(len(set(rows)), nrows)
+
+    def test_display_row_ops(self):
+        """Test the operations and datetimes rendered once per page."""
+        resp = self.get_response('table:display')
+        self.assertTrue(status.is_success(resp.status_code))
+        self.assertIn(display.ROW_OPS_KEY_VALUE, str(resp.content))
+
+        resp = self.get_response(
+            'table:display_ss',
+            method='POST',
+            req_params={
+                'draw': '1',
+                'start': '0',
+                'length': '-1',
+                'order[0][column]': '1',
+                'order[0][dir]': 'asc',
+                'search[value]': ''},
+            is_ajax=True)
+        self.assertTrue(status.is_success(resp.status_code))
+        content = json.loads(resp.content)
+
+        # The operations column has only the key value
+        key_name = self.workflow.columns.filter(is_key=True).first().name
+        for row in content['data']:
+            self.assertEqual(row['Operations'], row[key_name])
+
+        # Datetimes are formatted in the time zone by the query
+        df = pandas.load_table(self.workflow.get_data_frame_table_name())
+        expected = {
+            key_value: dt_value.astimezone(timezone(
+                settings.TIME_ZONE,
+            )).strftime('%Y-%m-%d %H:%M:%S  %z')
+            for key_value, dt_value in zip(df[key_name], df['when'])
+            if not pd.isnull(dt_value)}
+        for row in content['data']:
+            if row[key_name] in expected:
+                self.assertEqual(row['when'], expected[row[key_name]])
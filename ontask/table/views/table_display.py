@@ -121,8 +121,7 @@ def display_view_ss(
         request,
         workflow,
         view.columns.all(),
-        view.formula,
-        view.id)
+        view.formula)
 
 
 @user_passes_test(is_instructor)
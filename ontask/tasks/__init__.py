@@ -2,6 +2,7 @@
 
 """Import packages and initialize the task_execute_factory."""
 
+from ontask.tasks.condition_counts import update_condition_counts
 from ontask.tasks.execute_factory import (
     execute_operation, task_execute_factory,
 )
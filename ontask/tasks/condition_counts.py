@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""Recalculate the number of rows selected by the conditions."""
+import time
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.core.cache import cache
+
+from ontask import models
+from ontask.core import (
+    ONTASK_CONDITION_COUNT_PENDING, ONTASK_CONDITION_COUNT_REQUESTED,
+)
+from ontask.dataops import sql
+
+CELERY_LOGGER = get_task_logger('celery_execution')
+
+
+def _update_action_counts(action: models.Action, table_name: str):
+    """Recount the rows selected by the conditions of the action.
+
+    Only the counts (and rows_all_false) are written, so changes made to the
+    objects by other requests while the task runs are not overwritten.
+
+    :param action: Action with the conditions to count
+    :param table_name: Name of the table with the workflow data
+    :return: Nothing. The counts are updated in the DB.
+    """
+    filter_formula = None
+    reset_all_false = False
+    for cond in action.conditions.all():
+        formula = cond.formula
+        if filter_formula:
+            # Conjunction with the formula of the filter
+            formula = {
+                'condition': 'AND',
+                'not': False,
+                'rules': [filter_formula, cond.formula],
+                'valid': True,
+            }
+
+        new_count = sql.get_num_rows(table_name, formula)
+        if cond.is_filter:
+            filter_formula = cond.formula
+
+        if new_count != cond.n_rows_selected:
+            models.Condition.objects.filter(pk=cond.pk).update(
+                n_rows_selected=new_count)
+            reset_all_false = True
+
+    if reset_all_false:
+        models.Action.objects.filter(pk=action.pk).update(
+            rows_all_false=None)
+
+
+@shared_task
+def update_condition_counts(workflow_id: int):
+    """Recount the rows selected by all the conditions in the workflow.
+
+    The count is postponed until there are no requests for
+    CONDITION_COUNT_DELAY seconds, or the first pending request is older than
+    CONDITION_COUNT_MAX_DELAY seconds.
+
+    :param workflow_id: Id of the workflow to process
+    :return: Nothing. The counts are updated in the DB.
+    """
+    now = time.time()
+    first_request = cache.get(
+        ONTASK_CONDITION_COUNT_PENDING.format(workflow_id),
+        now)
+    last_request = cache.get(
+        ONTASK_CONDITION_COUNT_REQUESTED.format(workflow_id),
+        now)
+    wait_time = min(
+        last_request + settings.CONDITION_COUNT_DELAY,
+        first_request + settings.CONDITION_COUNT_MAX_DELAY) - now
+    if wait_time > 0 and not settings.CELERY_TASK_ALWAYS_EAGER:
+        # Changes are still arriving (eager tasks cannot be postponed)
+        update_condition_counts.apply_async(
+            (workflow_id,),
+            countdown=wait_time)
+        return
+
+    # Requests received from now on need a new count
+    cache.delete(ONTASK_CONDITION_COUNT_PENDING.format(workflow_id))
+
+    workflow = models.Workflow.objects.filter(pk=workflow_id).first()
+    if not workflow or not workflow.has_table():
+        return
+
+    CELERY_LOGGER.info(
+        'Recalculating condition counts in workflow %s',
+        str(workflow_id))
+    table_name = workflow.get_data_frame_table_name()
+    for action in workflow.actions.all():
+        _update_action_counts(action, table_name)
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
 """Tags to include URLS and other auxiliary HTML resources."""
+import hashlib
 import json
+from typing import List
 
 from django import template
 from django.conf import settings
@@ -10,12 +12,15 @@ from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
 import ontask
-from ontask import models
+from ontask import core, models
 from ontask.action import evaluate
 from ontask.dataops import sql
 
 register = template.Library()
 
+# Name of the column lists in the data cache (see ot_insert_column_list)
+COLUMN_LIST_NAME = 'column_list_{0}_{1}'
+
 
 # Tag to get ontask_version
 @register.simple_tag
@@ -142,15 +147,49 @@ def ontask_datetimepicker_js() -> str:
            + '>').format(settings.STATIC_URL))
 
 
+def _get_column_list(action: models.Action, column_name: str) -> List[str]:
+    """Get the values of the column in the rows selected by the action.
+
+    The values are stored in the action object, so they are obtained once for
+    all the rows rendered with the object (an execution). They are also
+    stored in the data cache of the workflow (for the requests serving the
+    action), so they are discarded when the table changes.
+
+    :param action: Action being rendered
+    :param column_name: Column to obtain
+    :return: List of values (as strings)
+    """
+    column_lists = getattr(action, '_column_lists', None)
+    if column_lists is None:
+        column_lists = {}
+        action._column_lists = column_lists
+    column_values = column_lists.get(column_name)
+    if column_values is not None:
+        return column_values
+
+    filter_formula = action.get_filter_formula()
+    column_values = core.get_or_set_data_cache(
+        action.workflow,
+        COLUMN_LIST_NAME.format(
+            action.id,
+            hashlib.md5(json.dumps(
+                [column_name, filter_formula],
+                sort_keys=True).encode()).hexdigest()),
+        lambda: [
+            str(citem[0]) for citem in sql.get_rows(
+                action.workflow.get_data_frame_table_name(),
+                column_names=[column_name],
+                filter_formula=filter_formula)])
+
+    column_lists[column_name] = column_values
+    return column_values
+
+
 @register.simple_tag(takes_context=True)
 def ot_insert_column_list(context, column_name) -> str:
     """Insert in the text a column list."""
     action = context['ONTASK_ACTION_CONTEXT_VARIABLE___']
-    column_values = [
-        str(citem[0]) for citem in sql.get_rows(
-            action.workflow.get_data_frame_table_name(),
-            column_names=[column_name],
-            filter_formula=action.get_filter_formula())]
+    column_values = _get_column_list(action, column_name)
     if action.action_type == models.Action.JSON_LIST:
         return mark_safe(json.dumps(column_values))
 
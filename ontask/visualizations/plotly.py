@@ -7,7 +7,6 @@ import json
 
 from django.utils.translation import ugettext as _
 
-from ontask.dataops import pandas
 from ontask.visualizations import VisHandler
 
 
@@ -63,153 +62,117 @@ class PlotlyHandler(VisHandler):
         return self.html_content
 
 
-class PlotlyBoxPlot(PlotlyHandler):
-    """Create a boxplot with a given data frame column."""
+class PlotlySummaryHandler(PlotlyHandler):
+    """Visualization drawn from the summary of a column.
 
-    def __init__(self, data, *args, **kwargs):
+    The data is the dictionary returned by sql.get_column_summary (or
+    pandas.get_column_summary), so the visualization is created without the
+    values in the column.
+    """
 
+    def __init__(self, data, *args, **kwargs):
+        """Create the HTML content with the traces and the layout."""
         super().__init__(data, *args, **kwargs)
 
-        self.format_dict['id'] = 'boxplot-id'
         # Transfer the keys to the formatting dictionary
         for key, value in list(kwargs.pop('context', {}).items()):
             self.format_dict[key] = value
 
-        data = []
-        for column in self.data.columns:
-            data.append(
-                {'y': list(self.data[column].dropna()),
-                 'name': column,
-                 'type': 'box'}
-            )
+        traces = self.get_traces()
 
-        # If an individual value has been given, add the annotation and the
-        # layout to the rendering.
         if self.format_dict.get('individual_value') is not None:
-            self.layout['annotations'] = [{
-                'bgcolor': 'white',
-                'x': 0,
-                'y': self.format_dict['individual_value'],
-                'ax': 0,
-                'ay': 0,
-                'xref': 'x',
-                'yref': 'y',
-                'text': self.format_dict.get(
-                    'individual_text',
-                    _('Your value'))
-            }]
-
-            # Get the two custom values from the given parameters.
-            self.layout['annotations'][0]['y'] = \
-                self.format_dict['individual_value']
-            self.layout['annotations'][0]['text'] = \
-                self.format_dict.get('individual_text', _('Your value'))
-
-        # Redefine the layout
-        self.format_dict['layout'] = json.dumps(self.layout)
-
-        self.format_dict['data'] = json.dumps(data)
+            self.layout['annotations'] = [self.get_annotation(
+                self.format_dict['individual_value'],
+                self.format_dict.get('individual_text', _('Your value')))]
 
         self.html_content = ''
         if self.format_dict.get('title'):
             self.html_content = self.format_dict['title']
 
-        self.html_content += self.html_skel.format(**self.format_dict)
+        self.html_content += self.html_skel.format(
+            style=self.format_dict['style'],
+            id=self.format_dict.get('id', self.get_id()),
+            data=json.dumps(traces),
+            layout=json.dumps(self.layout))
+
+    @abstractmethod
+    def get_traces(self):
+        """Return the list of Plotly traces."""
 
-        # If a title is given, place it in front of the widget
+    @abstractmethod
+    def get_annotation(self, individual_value, text):
+        """Return the annotation marking an individual value."""
+
+
+class PlotlySummaryBoxPlot(PlotlySummaryHandler):
+    """Create a boxplot with the quartiles of a column."""
+
+    def get_traces(self):
+        """Return the box with the precomputed values."""
+        return [dict(
+            {key: [value] for key, value in self.data['boxplot'].items()},
+            name=self.data['name'],
+            type='box')]
+
+    def get_annotation(self, individual_value, text):
+        """Mark the value in the y axis."""
+        return {
+            'bgcolor': 'white',
+            'x': 0,
+            'y': individual_value,
+            'ax': 0,
+            'ay': 0,
+            'xref': 'x',
+            'yref': 'y',
+            'text': text}
 
     def get_id(self):
         """Return the name of this handler.
 
         :return: string with the name
         """
-        return self.format_dict['id']
-
+        return 'boxplot-id'
 
-class PlotlyColumnHistogram(PlotlyHandler):
-    """Create a histogram."""
 
-    def _create_dictionaries(self, data, *args, **kwargs):
-        """Create the dictionary needed for the rendering."""
-        del data, args
-        self.format_dict['id'] = 'histogram-id'
+class PlotlySummaryHistogram(PlotlySummaryHandler):
+    """Create a histogram with the bars of a column."""
 
+    def get_traces(self):
+        """Return the bars with the precomputed counts."""
         self.layout.update({
             'bargap': 0.01,
             'yaxis': {'title': 'Count'}})
 
-        # Transfer the keys to the formatting dictionary
-        for key, value in list(kwargs.pop('context', {}).items()):
-            self.format_dict[key] = value
-
-        data = []
-        column = self.data.columns[0]
-        column_dtype = pandas.datatype_names.get(
-            self.data[column].dtype.name)
-        data_list = self.data[column].dropna().tolist()
-        # Special case for bool and datetime. Turn into strings to be
-        # treated as such
+        histogram = self.data['histogram']
+        trace = {
+            'x': histogram['x'],
+            'y': histogram['y'],
+            'name': self.data['name'],
+            'type': 'bar'}
+        if histogram['width'] is not None:
+            trace['width'] = histogram['width']
+        return [trace]
+
+    def get_annotation(self, individual_value, text):
+        """Mark the value in the x axis."""
         if (
-            column_dtype == 'boolean' or column_dtype == 'datetime' or
-            column_dtype == 'string'
+            isinstance(individual_value, bool)
+            or not isinstance(individual_value, (int, float))
         ):
-            data_list = [str(x) for x in data_list]
-
-        data.append(
-            {'x': data_list,
-             'histnorm': '',
-             'name': column,
-             'type': 'histogram'}
-        )
-
-        self.format_dict['data'] = data
-
-        # If an individual value has been given, add the annotation and the
-        # layout to the rendering.
-        if self.format_dict.get('individual_value') is not None:
-            ival = self.format_dict['individual_value']
-            if column_dtype == 'boolean' or column_dtype == 'datetime':
-                ival = str(ival)
-
-            self.layout['annotations'] = [{
-                'bgcolor': 'white',
-                'x': ival,
-                'ax': 0,
-                'axref': 'pixel',
-                'y': 0,
-                'ay': -40,
-                'yref': 'paper',
-                'text': self.format_dict.get('individual_text', 'Your value')
-            }]
-
-        self.format_dict['layout'] = self.layout
-
-        self.html_content = ''
-        if self.format_dict.get('title'):
-            self.html_content = self.format_dict['title']
-
-        self.html_content += self.html_skel.format(**self.format_dict)
-
-    def __init__(self, data, *args, **kwargs):
-        """Create the new object."""
-        super().__init__(data, *args, **kwargs)
-
-        # Create the dictionaries with values
-        self._create_dictionaries(data, *args, **kwargs)
-
-        self.html_content = ''
-        if self.format_dict.get('title'):
-            self.html_content = self.format_dict['title']
-
-        self.html_content += self.html_skel.format(
-            style=self.format_dict['style'],
-            id=self.format_dict['id'],
-            data=json.dumps(self.format_dict['data']),
-            layout=json.dumps(self.format_dict['layout']))
+            individual_value = str(individual_value)
+        return {
+            'bgcolor': 'white',
+            'x': individual_value,
+            'ax': 0,
+            'axref': 'pixel',
+            'y': 0,
+            'ay': -40,
+            'yref': 'paper',
+            'text': text}
 
     def get_id(self):
         """Return the name of this handler.
 
         :return: string with the name
         """
-        return self.format_dict['id']
+        return 'histogram-id'
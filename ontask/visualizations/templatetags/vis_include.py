@@ -1,16 +1,23 @@
 # -*- coding: utf-8 -*-
 
 """functions to include the visualization code."""
+import hashlib
+import json
+
 from django import template
 from django.utils.safestring import mark_safe
 from django.utils.translation import ugettext_lazy as _
 
+from ontask import core
 from ontask.action import evaluate
-from ontask.dataops import pandas
+from ontask.dataops import sql
 from ontask.visualizations import plotly
 
 register = template.Library()
 
+# Name of the column summaries in the data cache
+VISUALIZATION_SUMMARY_NAME = 'visualization_summary_{0}'
+
 
 def vis_html_content(context, column_name):
     """Create the HTML visualization code."""
@@ -21,7 +28,8 @@ def vis_html_content(context, column_name):
     workflow = action.workflow
 
     # Check if the column is correct
-    if not workflow.columns.filter(name=column_name).exists():
+    column = workflow.columns.filter(name=column_name).first()
+    if not column:
         raise Exception(_('Column {0} does not exist').format(column_name))
 
     # Get the visualization number to generate unique IDs
@@ -41,20 +49,33 @@ def vis_html_content(context, column_name):
     if ivalue is not None:
         viz_ctx['individual_value'] = ivalue
 
-    # Get the data from the data frame
-    df = pandas.get_subframe(
-        workflow.get_data_frame_table_name(),
-        action.get_filter_formula(),
-        [column_name])
+    # Get the summary of the column in the selected rows (calculated in the
+    # DB once per version of the data)
+    filter_formula = action.get_filter_formula()
+    summary = core.get_or_set_data_cache(
+        workflow,
+        VISUALIZATION_SUMMARY_NAME.format(hashlib.md5(json.dumps(
+            [column_name, filter_formula],
+            sort_keys=True).encode()).hexdigest()),
+        lambda: sql.get_column_summary(
+            workflow.get_data_frame_table_name(),
+            column_name,
+            column.data_type,
+            filter_formula))
+    if not summary:
+        # No values, draw an empty histogram
+        summary = {
+            'name': column_name,
+            'histogram': {'x': [], 'y': [], 'width': None}}
 
     # Get the visualisation
-    viz = plotly.PlotlyColumnHistogram(data=df, context=viz_ctx)
+    viz = plotly.PlotlySummaryHistogram(data=summary, context=viz_ctx)
 
     prefix = ''
     if viz_number == 0:
         prefix = ''.join([
             '<script src="{0}"></script>'.format(x)
-            for x in plotly.PlotlyColumnHistogram.get_engine_scripts()
+            for x in plotly.PlotlySummaryHistogram.get_engine_scripts()
         ])
 
     # Update viz number
@@ -60,10 +60,12 @@ class ColumnBasicForm(forms.ModelForm):
         """Check that the name is legal and the categories have right value."""
         form_data = super().clean()
 
-        # Load the data frame from the DB for various checks and leave it in
-        # the form for future use
-        self.data_frame = pandas.load_table(
-            self.workflow.get_data_frame_table_name())
+        # Load the column from the DB (if it exists) for various checks and
+        # leave it in the form for future use
+        if self.instance.name:
+            self.data_frame = pandas.load_table(
+                self.workflow.get_data_frame_table_name(),
+                columns=[self.instance.name])
 
         # Column name must be a legal variable name
         if 'name' in self.changed_data:
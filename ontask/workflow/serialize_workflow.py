@@ -220,6 +220,7 @@ class WorkflowExportSerializer(serializers.ModelSerializer):
             'created',
             'modified',
             'data_frame_table_name',
+            'data_version',
             'session_key',
             'shared',
             'star',
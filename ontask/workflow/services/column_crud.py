@@ -2,42 +2,21 @@
 
 """Functions to manipulate column CRUD ops."""
 import copy
-import random
 from typing import Any, List, Optional
 
 from django.contrib.auth import get_user_model
 from django.utils.translation import ugettext_lazy as _
-import pandas as pd
 
 from ontask import create_new_name, models
 from ontask.dataops import pandas, sql
+from ontask.dataops.services import schedule_condition_counts
 from ontask.workflow import services
 
-_op_distrib = {
-    'sum': lambda operand: operand.sum(axis=1, skipna=False),
-    'prod': lambda operand: operand.prod(axis=1, skipna=False),
-    'max': lambda operand: operand.max(axis=1, skipna=False),
-    'min': lambda operand: operand.min(axis=1, skipna=False),
-    'mean': lambda operand: operand.mean(axis=1, skipna=False),
-    'median': lambda operand: operand.median(axis=1, skipna=False),
-    'std': lambda operand: operand.std(axis=1, skipna=False),
-    'all': lambda operand: operand.all(axis=1, skipna=False),
-    'any': lambda operand: operand.any(axis=1, skipna=False),
-}
-
-
-def _partition(list_in: List[Any], num: int) -> List[List[Any]]:
-    """Partitions the list in num lists.
-
-    Given a list and n, returns a list with n lists, and inside each of them a
-    set of elements from the shuffled list. All lists are of the same size
-
-    :param list_in: List of elements to partition
-    :param num: Number of partitions
-    :return: List of lists with shuffled elements partitioned
-    """
-    random.shuffle(list_in)
-    return [list_in[idx::num] for idx in range(num)]
+# Operations in formula columns with the same data type as the operands
+# (integer if all of them are integer). The rest produce double, except the
+# boolean operations.
+_op_keep_type = ['sum', 'prod', 'max', 'min']
+_op_boolean = ['all', 'any']
 
 
 def add_column_to_workflow(
@@ -121,33 +100,35 @@ def add_formula_column(
     column.workflow = workflow
     column.is_key = False
 
-    # Save the instance
-    column.save()
-
-    # Update the data frame
-    df = pandas.load_table(workflow.get_data_frame_table_name())
-
-    # Add the column with the appropriate computation
-    cnames = [col.name for col in selected_columns]
-    df[column.name] = _op_distrib[operation](df[cnames])
-
     # Populate the column type
-    column.data_type = pandas.datatype_names.get(
-        df[column.name].dtype.name)
+    if operation in _op_boolean:
+        column.data_type = 'boolean'
+    elif operation in _op_keep_type and all(
+        col.data_type == 'integer' for col in selected_columns
+    ):
+        column.data_type = 'integer'
+    else:
+        column.data_type = 'double'
 
     # Update the positions of the appropriate columns
     workflow.reposition_columns(workflow.ncols + 1, column.position)
     column.save()
     workflow.refresh_from_db()
 
-    # Store the df to DB
+    # Add the column computed by the DB
     try:
-        pandas.store_dataframe(df, workflow)
+        sql.add_formula_column_to_db(
+            workflow.get_data_frame_table_name(),
+            column.name,
+            column.data_type,
+            operation,
+            [col.name for col in selected_columns])
     except Exception as exc:
         raise services.OnTaskWorkflowAddColumn(
             message=_('Unable to add column: {0}').format(str(exc)),
             to_delete=[column])
 
+    workflow.set_query_builder_ops()
     workflow.ncols = workflow.columns.count()
     workflow.save()
     column.log(user, models.Log.COLUMN_ADD_FORMULA)
@@ -157,14 +138,12 @@ def add_random_column(
     user,
     workflow: models.Workflow,
     column: models.Column,
-    data_frame: pd.DataFrame,
 ):
     """Add the formula column to the workflow.
 
     :param user: User making the request
     :param workflow: Workflow to add the column
     :param column: Column being added
-    :param data_frame: Data frame of the current workflow
     :return: Column is added to the workflow
     """
     # Save the column object attached to the form and add additional fields
@@ -183,35 +162,25 @@ def add_random_column(
     except (ValueError, TypeError, IndexError):
         pass
 
-    column.save()
-
-    # Empty new column
-    new_column = [None] * workflow.nrows
-    # Create the random partitions
-    partitions = _partition(
-        [idx for idx in range(workflow.nrows)],
-        len(column.categories))
-
-    # Assign values to partitions
-    for idx, indexes in enumerate(partitions):
-        for col_idx in indexes:
-            new_column[col_idx] = column.categories[idx]
-
-    # Assign the new column to the data frame
-    data_frame[column.name] = new_column
-
     # Update the positions of the appropriate columns
     workflow.reposition_columns(workflow.ncols + 1, column.position)
+    column.save()
     workflow.refresh_from_db()
 
-    # Store the df to DB
+    # Distribute the values randomly in the DB
     try:
-        pandas.store_dataframe(data_frame, workflow)
+        sql.add_random_column_to_db(
+            workflow.get_data_frame_table_name(),
+            column.name,
+            column.data_type,
+            column.categories,
+            workflow.columns.filter(is_key=True).first().name)
     except Exception as exc:
         raise services.OnTaskWorkflowStoreError(
             message=_('Unable to add the column: {0}').format(str(exc)),
             to_delete=[column])
 
+    workflow.set_query_builder_ops()
     workflow.ncols = workflow.columns.count()
     workflow.save()
 
@@ -325,11 +294,10 @@ def delete_column(
         # Formula has the name of the deleted column. Delete it
         condition.delete()
 
-    # Traverse the actions for which the filter has been deleted and reassess
-    #  all their conditions
-    # TODO: Explore how to do this asynchronously (or lazy)
-    for act in actions_without_filters:
-        act.update_n_rows_selected()
+    # Reassess the conditions of the actions for which the filter has been
+    # deleted
+    if actions_without_filters:
+        schedule_condition_counts(workflow)
 
     # If a column disappears, the views that contain only that column need to
     # disappear as well as they are no longer relevant.
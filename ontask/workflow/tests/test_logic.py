@@ -12,7 +12,8 @@ from django.utils.six import BytesIO
 from rest_framework import status
 from rest_framework.parsers import JSONParser
 
-from ontask import models, tests
+from ontask import core, models, tests
+from ontask.dataops import sql
 from ontask.tests.compare import compare_workflows
 from ontask.workflow.services.import_export import (
     do_export_workflow, do_export_workflow_parse, do_import_workflow_parse,
@@ -210,3 +211,51 @@ class WorkflowDelete(tests.OnTaskTestCase):
         self.assertTrue(status.is_success(resp.status_code))
         self.assertTrue(models.Workflow.objects.count() == 0)
         self.workflow = None
+
+
+class WorkflowDataVersion(tests.OnTaskTestCase):
+    """Test the data version and the data cache."""
+
+    fixtures = ['simple_workflow_export']
+    filename = os.path.join(
+        settings.BASE_DIR(),
+        'ontask',
+        'fixtures',
+        'simple_workflow_export.sql'
+    )
+
+    def test_data_version(self):
+        """Test that the version increases and the cache is refreshed."""
+        workflow = models.Workflow.objects.get(name='wflow1')
+        table_name = workflow.get_data_frame_table_name()
+        version = core.get_data_version(workflow)
+
+        values = []
+        nrows = core.get_or_set_data_cache(
+            workflow,
+            'nrows',
+            lambda: values.append(1) or sql.get_num_rows(table_name))
+        self.assertEqual(
+            core.get_or_set_data_cache(
+                workflow,
+                'nrows',
+                lambda: values.append(1) or sql.get_num_rows(table_name)),
+            nrows)
+        self.assertEqual(len(values), 1)
+
+        # Modifying the table increases the version
+        sql.add_column_to_db(table_name, 'new column', 'integer')
+        self.assertEqual(core.get_data_version(workflow), version + 1)
+
+        # Saving an outdated object does not decrease the version
+        stale_workflow = models.Workflow.objects.get(pk=workflow.pk)
+        sql.df_drop_column(table_name, 'new column')
+        stale_workflow.save()
+        self.assertEqual(core.get_data_version(workflow), version + 2)
+
+        # The value is calculated again
+        core.get_or_set_data_cache(
+            workflow,
+            'nrows',
+            lambda: values.append(1) or sql.get_num_rows(table_name))
+        self.assertEqual(len(values), 2)
@@ -4,6 +4,7 @@
 import os
 
 from django.conf import settings
+import numpy as np
 from rest_framework import status
 
 from ontask import models, tests
@@ -136,6 +137,31 @@ class WorkflowTestViewColumnCrud(tests.OnTaskTestCase):
         self.assertTrue(
             df['FORMULA COLUMN'].equals(df['Q01'] + df['Q02']))
 
+    def test_formula_column_operations(self):
+        """Test that the formula columns computed in the DB match pandas."""
+        for operation in ['prod', 'max', 'min', 'mean', 'median', 'std']:
+            resp = self.get_response(
+                'workflow:formula_column_add',
+                method='POST',
+                req_params={
+                    'name': operation,
+                    'description_text': '',
+                    'data_type': 'double',
+                    'position': '0',
+                    'columns': ['12', '13'],
+                    'op_type': operation},
+                is_ajax=True)
+            self.assertTrue(status.is_success(resp.status_code))
+
+        df = pandas.load_table(self.workflow.get_data_frame_table_name())
+        operands = df[['Q01', 'Q02']]
+        for operation in ['prod', 'max', 'min', 'mean', 'median', 'std']:
+            expected = getattr(operands, operation)(axis=1, skipna=False)
+            self.assertTrue(np.allclose(
+                df[operation].astype(float),
+                expected.astype(float),
+                equal_nan=True))
+
     def test_random_column_add(self):
         """Test adding a random column."""
         # GET the form
@@ -158,6 +184,10 @@ class WorkflowTestViewColumnCrud(tests.OnTaskTestCase):
         df = pandas.load_table(self.workflow.get_data_frame_table_name())
         self.assertTrue(all(0 < num < 13 for num in df['RANDOM COLUMN']))
 
+        # The values are distributed in partitions of the same size
+        counts = df['RANDOM COLUMN'].value_counts()
+        self.assertTrue(counts.max() - counts.min() <= 1)
+
     def test_column_clone(self):
         """Test adding a random column."""
         column = self.workflow.columns.get(name='Q01')
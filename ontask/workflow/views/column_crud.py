@@ -242,8 +242,7 @@ def random_column_add(
             services.add_random_column(
                 request.user,
                 workflow,
-                column,
-                form.data_frame)
+                column)
             form.save_m2m()
         except services.OnTaskWorkflowIntegerLowerThanOne as exc:
             form.add_error(exc.field_name, str(exc))
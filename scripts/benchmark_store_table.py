@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""Compare the time to store a table with COPY and with INSERT statements."""
+import getopt
+import shlex
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from ontask import OnTaskSharedState
+from ontask.dataops import pandas, sql
+
+___doc___ = """Benchmark of store_table. Execute with -h for help"""
+
+# Table used in the benchmark (removed at the end)
+BENCHMARK_TABLE = '__ONTASK_BENCHMARK_TABLE'
+
+
+def create_data_frame(nrows: int) -> pd.DataFrame:
+    """Create a data frame with columns of all the OnTask types.
+
+    :param nrows: Number of rows
+    :return: Data frame (10% of the non-key values are empty)
+    """
+    generator = np.random.default_rng(0)
+    empty = generator.random(nrows) < 0.1
+    data_frame = pd.DataFrame({
+        'key': np.arange(nrows),
+        'email': ['student{0}@bogus.com'.format(idx) for idx in range(nrows)],
+        'text': np.where(empty, None, 'Some text\twith\nspecial characters'),
+        'score': np.where(empty, np.nan, generator.random(nrows) * 10),
+        'passed': generator.random(nrows) < 0.5,
+        'when': pd.Timestamp('2020-01-01', tz='UTC') + pd.to_timedelta(
+            generator.integers(0, 10 ** 7, nrows),
+            unit='s'),
+    })
+    data_frame.loc[empty, 'when'] = pd.NaT
+    return data_frame
+
+
+def run(*script_args):
+    """
+    Script to measure the time to store tables of several sizes with
+    store_table (COPY) and with DataFrame.to_sql with INSERT statements.
+    Invocation example:
+
+    python manage.py runscript benchmark_store_table \
+           --script-args "-n 10000,100000,1000000"
+
+    :param script_args: Arguments given to the script.
+            -n <list> comma separated number of rows (def. 10k, 100k, 1M)
+            -c measure only COPY (INSERT is very slow for large tables)
+    :return: The times are printed
+    """
+
+    # Parse the arguments
+    argv = []
+    if script_args:
+        argv = shlex.split(script_args[0])
+
+    # Default values for the arguments
+    sizes = [10000, 100000, 1000000]
+    only_copy = False
+
+    # Parse options
+    try:
+        opts, __ = getopt.getopt(argv, "n:ch")
+    except getopt.GetoptError as e:
+        print(e.msg)
+        print(run.__doc__)
+        sys.exit(2)
+
+    # Store option values
+    for optstr, value in opts:
+        if optstr == "-n":
+            sizes = [int(size) for size in value.split(',')]
+        elif optstr == "-c":
+            only_copy = True
+        elif optstr == "-h":
+            print(run.__doc__)
+            return
+
+    print('{0:>10} {1:>10} {2:>10}'.format('Rows', 'COPY', 'INSERT'))
+    for nrows in sizes:
+        data_frame = create_data_frame(nrows)
+
+        start = time.perf_counter()
+        pandas.store_table(data_frame, BENCHMARK_TABLE)
+        copy_time = time.perf_counter() - start
+
+        insert_time = None
+        if not only_copy:
+            start = time.perf_counter()
+            data_frame.to_sql(
+                BENCHMARK_TABLE,
+                OnTaskSharedState.engine,
+                if_exists='replace',
+                index=False)
+            insert_time = time.perf_counter() - start
+
+        print('{0:>10} {1:>9.2f}s {2:>10}'.format(
+            nrows,
+            copy_time,
+            '-' if insert_time is None else '{0:.2f}s'.format(insert_time)))
+
+    sql.delete_table(BENCHMARK_TABLE)
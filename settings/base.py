@@ -139,6 +139,12 @@ EXECUTE_ACTION_JSON_TRANSFER = env.bool(
     'EXECUTE_ACTION_JSON_TRANSFER',
     default=False)
 
+# Number of rows fetched at a time from the DB when executing actions
+EXECUTE_ACTION_ITERSIZE = env.int('EXECUTE_ACTION_ITERSIZE', default=2000)
+
+# Number of processes rendering the content of an action (1 = no processes)
+EXECUTE_ACTION_PROCESSES = env.int('EXECUTE_ACTION_PROCESSES', default=1)
+
 # CACHE
 REDIS_URL = env.cache(
     'REDIS_URL',
@@ -148,6 +154,9 @@ REDIS_URL = env.cache(
             + '&key_prefix=ontask'
 )
 
+# Trigram index to search the tables (requires the pg_trgm extension)
+SEARCH_INDEX = env.bool('SEARCH_INDEX', default=False)
+
 # Login page
 SHOW_HOME_FOOTER_IMAGE = env.bool('SHOW_HOME_FOOTER_IMAGE', default=False)
 
@@ -499,6 +508,9 @@ DATAOPS_CONTENT_TYPES = '["text/csv", "application/json", ' \
                         '"application/vnd.ms-excel"]'
 DATAOPS_MAX_UPLOAD_SIZE = env.int('DATAOPS_MAX_UPLOAD_SIZE', default=209715200)
 
+# Number of rows given at a time to the plugins that process chunks
+DATAOPS_PLUGIN_CHUNK_SIZE = env.int('DATAOPS_PLUGIN_CHUNK_SIZE', default=10000)
+
 # Raise because default of 1000 is too short
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
 
@@ -554,6 +566,17 @@ CELERY_BEAT_SCHEDULE = {
 }
 CELERY_TASK_ALWAYS_EAGER = ONTASK_TESTING
 
+# Maximum number of values derived from the data of a workflow (statistics,
+# column lists, etc.) kept in the cache
+DATA_CACHE_SIZE = env.int('DATA_CACHE_SIZE', default=64)
+
+# Seconds without changes in a workflow before the rows selected by its
+# conditions are counted again (the count is delayed at most MAX_DELAY)
+CONDITION_COUNT_DELAY = env.float('CONDITION_COUNT_DELAY', default=5.0)
+CONDITION_COUNT_MAX_DELAY = env.float(
+    'CONDITION_COUNT_MAX_DELAY',
+    default=60.0)
+
 ###############################################################################
 #
 # Email sever configuration
@@ -578,6 +601,14 @@ EMAIL_USE_SSL = env.bool('EMAIL_USE_SSL', default=False)
 EMAIL_BURST = env.int('EMAIL_BURST', default=0)
 # Pause between bursts (in seconds)
 EMAIL_BURST_PAUSE = env.int('EMAIL_BURST_PAUSE', default=0)
+# Number of threads (each with its SMTP connection) sending emails
+EMAIL_SEND_THREADS = env.int('EMAIL_SEND_THREADS', default=1)
+# Number of times a message is re-sent after an error
+EMAIL_RETRIES = env.int('EMAIL_RETRIES', default=2)
+# Seconds to wait before the first retry (doubled for every retry)
+EMAIL_RETRY_BACKOFF = env.float('EMAIL_RETRY_BACKOFF', default=1.0)
+# Number of recipients stored at a time as delivered (to resume executions)
+EMAIL_CHECKPOINT_SIZE = env.int('EMAIL_CHECKPOINT_SIZE', default=100)
 
 # Additional email related variables
 EMAIL_ACTION_NOTIFICATION_TEMPLATE = """